@@ -0,0 +1,155 @@
+# benchmarks/bench_equipment_polymorphic.py
+"""
+Бенчмарк загрузки оборудования разных видов (Equipment и подкласс ControlCabinet).
+
+Постранично (keyset по name, id) читает весь синтетический каталог и собирает схемы
+EquipmentRead / ControlCabinetRead тремя способами:
+- lazy: select(Equipment), колонки control_cabinets догружаются отдельным запросом на каждый шкаф;
+- with_polymorphic: один запрос с LEFT OUTER JOIN control_cabinets;
+- selectin_polymorphic: запрос к equipment и один запрос WHERE id IN (...) на подкласс (как в /equipment/items).
+
+Для каждого способа выводит медианное время полного прохода и число SQL-запросов.
+
+Запускать только на отдельной (тестовой) базе:
+    python -m benchmarks.bench_equipment_polymorphic --items 20000 --cabinet-share 0.3
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+
+from sqlalchemy import select, insert, delete, tuple_
+from sqlalchemy.orm import selectin_polymorphic, with_polymorphic
+
+from database import async_session_maker, on_async_engine_created
+from models import Equipment, ControlCabinet, ControlCabinetMaterial, Ip
+from routers.equipment_router import EQUIPMENT_SUBCLASSES, to_equipment_read
+from utils.instrumentation import RequestStats, current_request_stats, install_sqlalchemy_hooks
+
+BENCH_PREFIX = "bench"
+BATCH_SIZE = 5000
+
+
+async def seed(items: int, cabinet_share: float, seed_value: int = 42) -> None:
+    """Оборудование и шкафы вперемешку по имени, чтобы на каждой странице были оба вида"""
+    rnd = random.Random(seed_value)
+    async with async_session_maker() as session:
+        material = ControlCabinetMaterial(name=f"{BENCH_PREFIX}-material")
+        ip = Ip(name=f"{BENCH_PREFIX}-ip")
+        session.add_all([material, ip])
+        await session.flush()
+
+        plain, cabinets = [], []
+        for number in range(items):
+            row = {"name": f"{BENCH_PREFIX}-equipment-{number:07d}", "price": rnd.randint(100, 500_000),
+                   "relevance": True}
+            if rnd.random() < cabinet_share:
+                cabinets.append({**row, "discriminator": "control_cabinet",
+                                 "material_id": material.id, "ip_id": ip.id,
+                                 "height": rnd.choice((400, 600, 800, 1800, 2000)),
+                                 "width": rnd.choice((300, 400, 600, 800)),
+                                 "depth": rnd.choice((200, 250, 400, 600))})
+            else:
+                plain.append({**row, "discriminator": "equipment"})
+        for start in range(0, len(plain), BATCH_SIZE):
+            await session.execute(insert(Equipment), plain[start:start + BATCH_SIZE])
+        # ORM bulk insert подкласса заполняет обе таблицы (equipment и control_cabinets)
+        for start in range(0, len(cabinets), BATCH_SIZE):
+            await session.execute(insert(ControlCabinet), cabinets[start:start + BATCH_SIZE])
+        await session.commit()
+
+
+async def drop() -> None:
+    """Удалить всё, что добавил seed()"""
+    async with async_session_maker() as session:
+        bench_equipment = select(Equipment.id).where(Equipment.name.like(f"{BENCH_PREFIX}-equipment-%"))
+        await session.execute(delete(ControlCabinet.__table__).where(
+            ControlCabinet.__table__.c.id.in_(bench_equipment)))
+        await session.execute(delete(Equipment).where(Equipment.name.like(f"{BENCH_PREFIX}-equipment-%")))
+        await session.execute(delete(ControlCabinetMaterial).where(
+            ControlCabinetMaterial.name == f"{BENCH_PREFIX}-material"))
+        await session.execute(delete(Ip).where(Ip.name == f"{BENCH_PREFIX}-ip"))
+        await session.commit()
+
+
+def build_query(strategy: str):
+    if strategy == "with_polymorphic":
+        equipment = with_polymorphic(Equipment, EQUIPMENT_SUBCLASSES)
+        return select(equipment), equipment
+    if strategy == "selectin_polymorphic":
+        return select(Equipment).options(selectin_polymorphic(Equipment, EQUIPMENT_SUBCLASSES)), Equipment
+    return select(Equipment), Equipment
+
+
+async def read_catalog(strategy: str, page_size: int) -> int:
+    """Пройти весь синтетический каталог страницами и собрать схемы; возвращает число позиций"""
+    query, entity = build_query(strategy)
+    query = query.where(entity.name.like(f"{BENCH_PREFIX}-equipment-%"))
+    total = 0
+    after = None
+    async with async_session_maker() as session:
+        while True:
+            page_query = query
+            if after is not None:
+                page_query = page_query.where(tuple_(entity.name, entity.id) > tuple_(*after))
+            result = await session.execute(page_query.order_by(entity.name, entity.id).limit(page_size))
+            page = result.scalars().all()
+            if not page:
+                break
+            # Синхронный контекст: в способе lazy обращение к колонкам шкафа выполняет догружающий запрос
+            await session.run_sync(lambda _: [to_equipment_read(item) for item in page])
+            total += len(page)
+            after = (page[-1].name, page[-1].id)
+            session.expunge_all()
+    return total
+
+
+async def measure(strategy: str, page_size: int, repeat: int) -> dict:
+    wall, statements = [], []
+    items = 0
+    for _ in range(repeat):
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        started = time.perf_counter()
+        try:
+            items = await read_catalog(strategy, page_size)
+        finally:
+            current_request_stats.reset(token)
+        wall.append(time.perf_counter() - started)
+        statements.append(stats.statements)
+    return {
+        "strategy": strategy,
+        "items": items,
+        "repeat": repeat,
+        "wall_median_ms": round(statistics.median(wall) * 1000, 3),
+        "statements": statistics.median(statements),
+        "db_time_ms_last": round(stats.db_time * 1000, 3),
+    }
+
+
+async def main(items: int, cabinet_share: float, page_size: int, repeat: int, keep: bool) -> None:
+    on_async_engine_created(install_sqlalchemy_hooks)
+    if items:
+        await seed(items, cabinet_share)
+    try:
+        await read_catalog("selectin_polymorphic", page_size)  # прогрев пула соединений и кэша запросов
+        results = [await measure(strategy, page_size, repeat)
+                   for strategy in ("lazy", "with_polymorphic", "selectin_polymorphic")]
+        print(json.dumps({"items": items, "cabinet_share": cabinet_share, "page_size": page_size,
+                          "results": results}, ensure_ascii=False, indent=2))
+    finally:
+        if items and not keep:
+            await drop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк полиморфной загрузки оборудования")
+    parser.add_argument("--items", type=int, default=20_000, help="Сколько синтетических позиций добавить")
+    parser.add_argument("--cabinet-share", type=float, default=0.3, help="Доля шкафов среди позиций")
+    parser.add_argument("--page-size", type=int, default=50, help="Размер страницы")
+    parser.add_argument("--repeat", type=int, default=5, help="Количество повторов каждого замера")
+    parser.add_argument("--keep", action="store_true", help="Не удалять синтетические данные после замера")
+    args = parser.parse_args()
+    asyncio.run(main(args.items, args.cabinet_share, args.page_size, args.repeat, args.keep))
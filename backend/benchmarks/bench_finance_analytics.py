@@ -0,0 +1,167 @@
+# benchmarks/bench_finance_analytics.py
+"""
+Бенчмарк финансовой аналитики по заказам.
+
+Сравнивает:
+- один агрегирующий запрос с GROUPING SETS (/analytics/finance);
+- выгрузку всех заказов и суммирование в Python (то, что пришлось бы делать фронтенду через /get_all/orders);
+- повторный запрос, попадающий в кэш.
+
+Запускать только на отдельной (тестовой) базе, скрипт добавляет в неё заказы:
+    python -m benchmarks.bench_finance_analytics --orders 100000
+"""
+import argparse
+import asyncio
+import json
+import random
+import statistics
+import time
+from collections import defaultdict
+from datetime import datetime
+
+from sqlalchemy import select, insert, delete, func
+
+from database import async_session_maker
+from models import Order, OrderStatus, Counterparty, CounterpartyForm
+from routers.analytics_router import build_finance_query, build_finance_response
+from utils.cache import finance_cache
+from utils.data_versions import ORDERS, read_version
+
+BENCH_PREFIX = "bench"
+
+
+async def seed_orders(count: int, seed: int = 42) -> None:
+    """Добавить count синтетических заказов (с единственным заказчиком-заглушкой)"""
+    rnd = random.Random(seed)
+    async with async_session_maker() as session:
+        form = (await session.execute(
+            select(CounterpartyForm).where(CounterpartyForm.name == BENCH_PREFIX)
+        )).scalar_one_or_none()
+        if form is None:
+            form = CounterpartyForm(name=BENCH_PREFIX)
+            session.add(form)
+            await session.flush()
+
+        customers = []
+        for i in range(50):
+            name = f"{BENCH_PREFIX}-customer-{i}"
+            customer = (await session.execute(
+                select(Counterparty).where(Counterparty.name == name)
+            )).scalar_one_or_none()
+            if customer is None:
+                customer = Counterparty(name=name, form_id=form.id)
+                session.add(customer)
+                await session.flush()
+            customers.append(customer.id)
+
+        existing_statuses = set((await session.execute(select(OrderStatus.id))).scalars().all())
+        for status_id in range(1, 9):
+            if status_id not in existing_statuses:
+                session.add(OrderStatus(id=status_id, name=f"{BENCH_PREFIX}-status-{status_id}"))
+        await session.flush()
+
+        rows = []
+        for n in range(count):
+            year = 1900 + n // 999
+            month = rnd.randint(1, 12)
+            rows.append({
+                "serial": f"{n % 999 + 1:03d}-{month:02d}-{year}",
+                "name": f"{BENCH_PREFIX}-order-{n}",
+                "customer_id": rnd.choice(customers),
+                "status_id": rnd.randint(1, 8),
+                "start_moment": datetime(year, month, 1),
+                "materials_cost": rnd.randint(0, 500_000),
+                "materials_cost_fact": rnd.randint(0, 500_000),
+                "materials_paid": rnd.random() < 0.5,
+                "products_cost": rnd.randint(0, 1_000_000),
+                "products_cost_fact": rnd.randint(0, 1_000_000),
+                "products_paid": rnd.random() < 0.5,
+                "work_cost": rnd.randint(0, 300_000),
+                "work_cost_fact": rnd.randint(0, 300_000),
+                "work_paid": rnd.random() < 0.5,
+                "debt": rnd.randint(0, 200_000),
+                "debt_fact": rnd.randint(0, 200_000),
+                "debt_paid": rnd.random() < 0.5,
+            })
+            if len(rows) == 5000:
+                await session.execute(insert(Order), rows)
+                rows = []
+        if rows:
+            await session.execute(insert(Order), rows)
+        await session.commit()
+
+
+async def drop_orders() -> None:
+    """Удалить заказы, добавленные бенчмарком"""
+    async with async_session_maker() as session:
+        await session.execute(delete(Order).where(Order.name.like(f"{BENCH_PREFIX}-order-%")))
+        await session.commit()
+
+
+async def aggregate_in_sql() -> None:
+    async with async_session_maker() as session:
+        result = await session.execute(build_finance_query())
+        build_finance_response(result.all())
+
+
+async def aggregate_in_python() -> None:
+    async with async_session_maker() as session:
+        orders = (await session.execute(select(Order))).scalars().all()
+        totals = defaultdict(lambda: defaultdict(int))
+        for order in orders:
+            month = order.start_moment.replace(day=1) if order.start_moment else None
+            for key in (("status", order.status_id), ("customer", order.customer_id), ("month", month), ("total",)):
+                for field in ("materials_cost", "products_cost", "work_cost", "debt"):
+                    totals[key][field] += getattr(order, field) or 0
+
+
+async def aggregate_cached() -> None:
+    async with async_session_maker() as session:
+        key = (await read_version(session, ORDERS), True)
+        if finance_cache.get(key) is None:
+            result = await session.execute(build_finance_query())
+            finance_cache.set(key, build_finance_response(result.all()))
+
+
+async def measure(name: str, func_, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        started = time.perf_counter()
+        await func_()
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "name": name,
+        "repeat": repeat,
+        "min_ms": round(timings[0], 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+
+async def main(orders: int, repeat: int, keep: bool) -> None:
+    if orders:
+        await seed_orders(orders)
+    try:
+        async with async_session_maker() as session:
+            total = (await session.execute(select(func.count(Order.serial)))).scalar_one()
+
+        finance_cache.invalidate()
+        results = [
+            await measure("sql_grouping_sets", aggregate_in_sql, repeat),
+            await measure("python_fetch_all", aggregate_in_python, max(1, repeat // 5)),
+            await measure("cached", aggregate_cached, repeat),
+        ]
+        print(json.dumps({"orders_in_db": total, "results": results}, ensure_ascii=False, indent=2))
+    finally:
+        if orders and not keep:
+            await drop_orders()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк /analytics/finance")
+    parser.add_argument("--orders", type=int, default=100_000, help="Сколько синтетических заказов добавить")
+    parser.add_argument("--repeat", type=int, default=20, help="Количество повторов каждого замера")
+    parser.add_argument("--keep", action="store_true", help="Не удалять синтетические заказы после замера")
+    args = parser.parse_args()
+    asyncio.run(main(args.orders, args.repeat, args.keep))
@@ -0,0 +1,95 @@
+# benchmarks/bench_list_hydration.py
+"""
+Бенчмарк списков: ORM-объекты против выборки колонок.
+
+Для заказов и задач сравнивает:
+- orm: select(Model) -> ORM-объекты (identity map, инструментирование атрибутов) -> словари;
+- columns: select(Model.col1, Model.col2, ...) -> строки -> словари (как в /get_all/*).
+
+Считает время на строку: полное (wall) и процессорное (CPU) время процесса,
+то есть то, что тратит сам сервер, без ожидания базы.
+
+Запускать только на отдельной (тестовой) базе:
+    python -m benchmarks.bench_list_hydration --orders 20000
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+
+from sqlalchemy import select, func
+
+from benchmarks.seed_dataset import DatasetConfig, seed, drop
+from database import async_session_maker
+from models import Order, Task
+
+ORDER_FIELDS = ["serial", "name", "customer_id", "priority", "status_id", "start_moment", "deadline_moment",
+                "end_moment", "materials_cost", "materials_paid", "products_cost", "products_paid",
+                "work_cost", "work_paid", "debt", "debt_paid"]
+TASK_FIELDS = ["id", "name", "description", "status_id", "payment_status_id", "executor_uuid", "planned_duration",
+               "actual_duration", "creation_moment", "start_moment", "deadline_moment", "end_moment", "price",
+               "order_serial", "parent_task_id", "root_task_id"]
+
+
+async def load_orm(model, fields) -> int:
+    async with async_session_maker() as session:
+        result = await session.execute(select(model))
+        items = [{field: getattr(item, field) for field in fields} for item in result.scalars().all()]
+    return len(items)
+
+
+async def load_columns(model, fields) -> int:
+    async with async_session_maker() as session:
+        result = await session.execute(select(*(getattr(model, field) for field in fields)))
+        items = [dict(row) for row in result.mappings()]
+    return len(items)
+
+
+async def measure(name: str, func_, repeat: int) -> dict:
+    wall, cpu = [], []
+    rows = 0
+    for _ in range(repeat):
+        wall_started, cpu_started = time.perf_counter(), time.process_time()
+        rows = await func_()
+        wall.append(time.perf_counter() - wall_started)
+        cpu.append(time.process_time() - cpu_started)
+    wall_median, cpu_median = statistics.median(wall), statistics.median(cpu)
+    return {
+        "name": name,
+        "rows": rows,
+        "repeat": repeat,
+        "wall_median_ms": round(wall_median * 1000, 3),
+        "cpu_median_ms": round(cpu_median * 1000, 3),
+        "cpu_per_row_us": round(cpu_median / rows * 1_000_000, 3) if rows else None,
+    }
+
+
+async def main(orders: int, repeat: int, keep: bool) -> None:
+    if orders:
+        await seed(DatasetConfig(orders=orders, comments_per_order=0, timings_per_task=0, boxes=0))
+    try:
+        async with async_session_maker() as session:
+            total_orders = (await session.execute(select(func.count(Order.serial)))).scalar_one()
+            total_tasks = (await session.execute(select(func.count(Task.id)))).scalar_one()
+
+        results = []
+        for model, fields in ((Order, ORDER_FIELDS), (Task, TASK_FIELDS)):
+            label = model.__tablename__
+            await load_columns(model, fields)  # прогрев пула соединений и кэша запросов
+            results.append(await measure(f"{label}_orm", lambda: load_orm(model, fields), repeat))
+            results.append(await measure(f"{label}_columns", lambda: load_columns(model, fields), repeat))
+        print(json.dumps({"orders_in_db": total_orders, "tasks_in_db": total_tasks, "results": results},
+                         ensure_ascii=False, indent=2))
+    finally:
+        if orders and not keep:
+            await drop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк ORM-объектов против выборки колонок")
+    parser.add_argument("--orders", type=int, default=20_000, help="Сколько синтетических заказов добавить")
+    parser.add_argument("--repeat", type=int, default=10, help="Количество повторов каждого замера")
+    parser.add_argument("--keep", action="store_true", help="Не удалять синтетические данные после замера")
+    args = parser.parse_args()
+    asyncio.run(main(args.orders, args.repeat, args.keep))
@@ -0,0 +1,89 @@
+# benchmarks/bench_order_list_rtt.py
+"""
+Бенчмарк списка заказов при большом RTT до базы.
+
+Сравнивает:
+- multi_statement: прежняя схема /order/read - запрос количества, страница заказов
+  и цепочка selectinload (заказчик -> форма собственности, работы), 4 обращения к базе;
+- single_statement: текущий read_orders - проверка ETag (max(updated_at) по индексу) и один запрос
+  с join, json_agg и count(*) OVER ().
+
+Между приложением и базой поднимается latency_proxy с заданными задержками.
+Нужны данные в базе (например, python -m benchmarks.seed_dataset --orders 5000):
+    python -m benchmarks.bench_order_list_rtt --rtt-ms 0 5 20 50 --limit 100
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+from sqlalchemy import select, func
+from sqlalchemy.ext.asyncio import create_async_engine, async_sessionmaker, AsyncSession
+from sqlalchemy.orm import selectinload
+from starlette.requests import Request
+
+from benchmarks.latency_proxy import start_proxy
+from config import DB_HOST, DB_PORT
+from database import DATABASE_URL_ASYNC
+from models import Order, Counterparty
+from routers.order_router import read_orders, get_serial_sort_expressions
+
+
+async def multi_statement(session: AsyncSession, limit: int) -> int:
+    await session.execute(select(func.count(func.distinct(Order.serial))))
+    result = await session.execute(
+        select(Order)
+        .options(selectinload(Order.customer).selectinload(Counterparty.form), selectinload(Order.works))
+        .order_by(*get_serial_sort_expressions())
+        .limit(limit)
+    )
+    return len(result.scalars().unique().all())
+
+
+async def single_statement(session: AsyncSession, limit: int) -> int:
+    response = await read_orders(
+        Request({"type": "http", "query_string": b"", "headers": []}), skip=0, limit=limit, show_ended=True,
+        status_id=None, search_serial=None, search_customer=None, search_priority=None, search_name=None, sort_field="serial",
+        sort_direction="asc", filter_status=None, no_priority=False, search_works=None, session=session,
+    )
+    return len(response.body)
+
+
+async def measure(session_maker, name: str, func_, limit: int, repeat: int) -> dict:
+    timings = []
+    for _ in range(repeat):
+        # Новая сессия на каждый замер, как в FastAPI-зависимости get_async_db
+        async with session_maker() as session:
+            started = time.perf_counter()
+            await func_(session, limit)
+            timings.append((time.perf_counter() - started) * 1000)
+    return {"name": name, "median_ms": round(statistics.median(timings), 3), "max_ms": round(max(timings), 3)}
+
+
+async def main(rtts, limit: int, repeat: int) -> None:
+    results = []
+    for rtt in rtts:
+        proxy = await start_proxy("127.0.0.1", 0, DB_HOST, int(DB_PORT), rtt)
+        port = proxy.sockets[0].getsockname()[1]
+        engine = create_async_engine(DATABASE_URL_ASYNC.replace(f"@{DB_HOST}:{DB_PORT}/", f"@127.0.0.1:{port}/"))
+        session_maker = async_sessionmaker(engine, class_=AsyncSession, expire_on_commit=False)
+        try:
+            # Прогрев: соединение в пуле и кэш скомпилированных запросов
+            await measure(session_maker, "warmup", multi_statement, limit, 1)
+            await measure(session_maker, "warmup", single_statement, limit, 1)
+            for name, func_ in (("multi_statement", multi_statement), ("single_statement", single_statement)):
+                results.append({"rtt_ms": rtt, **await measure(session_maker, name, func_, limit, repeat)})
+        finally:
+            await engine.dispose()
+            proxy.close()
+            await proxy.wait_closed()
+    print(json.dumps({"limit": limit, "results": results}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк /order/read при большом RTT до базы")
+    parser.add_argument("--rtt-ms", type=float, nargs="+", default=[0, 5, 20, 50], help="Задержки туда-обратно, мс")
+    parser.add_argument("--limit", type=int, default=100, help="Размер страницы")
+    parser.add_argument("--repeat", type=int, default=20, help="Количество повторов каждого замера")
+    args = parser.parse_args()
+    asyncio.run(main(args.rtt_ms, args.limit, args.repeat))
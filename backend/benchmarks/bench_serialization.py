@@ -0,0 +1,142 @@
+# benchmarks/bench_serialization.py
+"""
+Бенчмарк сериализации ответов (без базы данных, только CPU).
+
+Сравнивает для типовых объёмов ответов:
+- /order/read?limit=100: старый путь (модель -> повторная валидация по response_model ->
+  JSONResponse) и новый (ModelResponse, один model_dump_json);
+- /get_all/tasks: старый путь (jsonable_encoder -> JSONResponse) и новый (ORJSONResponse).
+
+Запуск:
+    python -m benchmarks.bench_serialization --tasks 10000 --repeat 20
+
+Сквозной замер тех же эндпоинтов с базой:
+    python -m benchmarks.load_test --only order_read_100 get_all_tasks
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import uuid
+from datetime import datetime, timedelta
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.routing import APIRoute, serialize_response
+from starlette.responses import JSONResponse
+
+from routers.order_router import router as order_router
+from schemas.order_schem import OrderRead, PaginatedOrderResponse
+from utils.responses import ORJSONResponse, ModelResponse
+
+
+def build_orders_page(count: int) -> PaginatedOrderResponse:
+    now = datetime(2025, 5, 1, 12, 30)
+    orders = [
+        OrderRead.model_validate({
+            "serial": f"{n + 1:03d}-05-2025",
+            "name": f"Заказ {n}",
+            "customer": f"ООО Заказчик {n % 50}",
+            "customer_id": n % 50,
+            "priority": n % 10 + 1,
+            "status_id": n % 8 + 1,
+            "start_moment": now,
+            "deadline_moment": now + timedelta(days=30),
+            "end_moment": None,
+            "materials_cost": 100_000 + n,
+            "materials_paid": False,
+            "products_cost": 200_000 + n,
+            "products_paid": True,
+            "work_cost": 50_000,
+            "work_paid": False,
+            "debt": 0,
+            "debt_paid": True,
+            "works": [{"id": w, "name": f"Работа {w}", "description": None, "active": True} for w in range(n % 3)],
+        })
+        for n in range(count)
+    ]
+    return PaginatedOrderResponse(total=5000, limit=count, skip=0, data=orders)
+
+
+def build_tasks_payload(count: int) -> dict:
+    now = datetime(2025, 5, 1, 12, 30)
+    executor = uuid.uuid4()
+    return {"tasks": [
+        {
+            "id": n,
+            "name": f"Задача {n}",
+            "description": "Описание задачи" if n % 2 else None,
+            "status_id": n % 5 + 1,
+            "payment_status_id": n % 4 + 1,
+            "executor_uuid": executor,
+            "planned_duration": str(timedelta(hours=n % 40)),
+            "actual_duration": None,
+            "creation_moment": now.isoformat(),
+            "start_moment": now.isoformat(),
+            "deadline_moment": (now + timedelta(days=7)).isoformat(),
+            "end_moment": None,
+            "price": 1000,
+            "order_serial": f"{n % 999 + 1:03d}-05-2025",
+            "parent_task_id": None,
+            "root_task_id": None,
+        }
+        for n in range(count)
+    ]}
+
+
+def order_read_route() -> APIRoute:
+    return next(route for route in order_router.routes if getattr(route, "path", "") == "/order/read")
+
+
+async def measure(name: str, func_, repeat: int) -> dict:
+    timings = []
+    size = 0
+    for _ in range(repeat):
+        started = time.perf_counter()
+        size = len(await func_())
+        timings.append((time.perf_counter() - started) * 1000)
+    timings.sort()
+    return {
+        "name": name,
+        "repeat": repeat,
+        "body_bytes": size,
+        "min_ms": round(timings[0], 3),
+        "median_ms": round(statistics.median(timings), 3),
+        "max_ms": round(timings[-1], 3),
+    }
+
+
+async def main(orders: int, tasks: int, repeat: int) -> None:
+    page = build_orders_page(orders)
+    tasks_payload = build_tasks_payload(tasks)
+    route = order_read_route()
+
+    async def orders_revalidated() -> bytes:
+        content = await serialize_response(field=route.response_field, response_content=page, is_coroutine=True)
+        return JSONResponse(content).body
+
+    async def orders_model_response() -> bytes:
+        return ModelResponse(page).body
+
+    async def tasks_jsonable_encoder() -> bytes:
+        return JSONResponse(jsonable_encoder(tasks_payload)).body
+
+    async def tasks_orjson() -> bytes:
+        return ORJSONResponse(tasks_payload).body
+
+    results = [
+        await measure(f"order_read_{orders}_revalidate", orders_revalidated, repeat),
+        await measure(f"order_read_{orders}_model_response", orders_model_response, repeat),
+        await measure(f"get_all_tasks_{tasks}_jsonable_encoder", tasks_jsonable_encoder, repeat),
+        await measure(f"get_all_tasks_{tasks}_orjson", tasks_orjson, repeat),
+    ]
+    print(json.dumps({"results": results}, ensure_ascii=False, indent=2))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк сериализации ответов")
+    parser.add_argument("--orders", type=int, default=100, help="Заказов на странице /order/read")
+    parser.add_argument("--tasks", type=int, default=10_000, help="Задач в ответе /get_all/tasks")
+    parser.add_argument("--repeat", type=int, default=20, help="Количество повторов каждого замера")
+    args = parser.parse_args()
+    asyncio.run(main(args.orders, args.tasks, args.repeat))
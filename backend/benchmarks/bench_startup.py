@@ -0,0 +1,78 @@
+# benchmarks/bench_startup.py
+"""
+Бенчмарк запуска приложения: импорт main, старт lifespan и первый запрос в свежем интерпретаторе.
+
+first_request_ms - время от начала импорта до ответа на первый запрос (GET /).
+Каждый замер - отдельный процесс python, поэтому кэш импортов не влияет на результат
+(байткод .pyc при этом используется, как и при обычном запуске). Для старта lifespan
+лента изменений переключается на шину внутри процесса, база не нужна.
+
+    python -m benchmarks.bench_startup --repeat 10
+    python -m benchmarks.bench_startup --max-import-ms 1500   # код возврата 1 при превышении
+
+Самые медленные модули при импорте:
+    python -X importtime -c "import main" 2> importtime.log
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+import httpx
+
+async def run_lifespan():
+    async with main.app.router.lifespan_context(main.app):
+        ready = time.perf_counter()
+        transport = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+            (await client.get("/")).raise_for_status()
+        return ready, time.perf_counter()
+
+ready, answered = asyncio.run(run_lifespan())
+print(json.dumps({"import_ms": (imported - started) * 1000, "lifespan_ms": (ready - imported) * 1000,
+                  "first_request_ms": (answered - started) * 1000,
+                  "openapi_ms": [value for labels, value in main.app_startup_duration.samples()
+                                 if labels["phase"] == "openapi"][0] * 1000}))
+"""
+
+
+def measure_once() -> dict:
+    env = {**os.environ, "CHANGE_FEED_BACKEND": "memory"}
+    output = subprocess.check_output([sys.executable, "-W", "ignore", "-c", PROBE], cwd=BACKEND_DIR, env=env,
+                                     text=True, stderr=subprocess.DEVNULL)
+    return json.loads(output.strip().splitlines()[-1])
+
+
+def main(repeat: int, max_import_ms: float | None) -> int:
+    samples = [measure_once() for _ in range(repeat)]
+    report = {
+        "repeat": repeat,
+        **{
+            f"{key}_median": round(statistics.median(sample[key] for sample in samples), 1)
+            for key in ("import_ms", "lifespan_ms", "openapi_ms", "first_request_ms")
+        },
+        "import_ms_max": round(max(sample["import_ms"] for sample in samples), 1),
+    }
+    print(json.dumps(report, ensure_ascii=False, indent=2))
+    if max_import_ms is not None and report["import_ms_median"] > max_import_ms:
+        print(f"Import of main is slower than {max_import_ms} ms", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Бенчмарк запуска приложения")
+    parser.add_argument("--repeat", type=int, default=10, help="Количество запусков")
+    parser.add_argument("--max-import-ms", type=float, help="Порог медианы импорта main, мс")
+    args = parser.parse_args()
+    sys.exit(main(args.repeat, args.max_import_ms))
@@ -0,0 +1,81 @@
+# benchmarks/latency_proxy.py
+"""
+TCP-прокси с искусственной задержкой для имитации удалённой базы данных (большой RTT).
+
+Каждый пакет в обе стороны доставляется с задержкой rtt/2, пропускная способность не ограничивается,
+так что разница между "один запрос" и "несколько запросов подряд" видна в чистом виде.
+
+Отдельным процессом:
+    python -m benchmarks.latency_proxy --listen-port 6543 --target-host localhost --target-port 5432 --rtt-ms 20
+затем подключаться к базе через localhost:6543 (DB_HOST=localhost DB_PORT=6543).
+"""
+import argparse
+import asyncio
+import time
+
+
+async def _pipe(reader: asyncio.StreamReader, writer: asyncio.StreamWriter, delay: float) -> None:
+    """Пересылает данные из reader в writer, каждый кусок с задержкой delay секунд"""
+    queue: asyncio.Queue = asyncio.Queue()
+
+    async def deliver():
+        while True:
+            deliver_at, data = await queue.get()
+            wait = deliver_at - time.monotonic()
+            if wait > 0:
+                await asyncio.sleep(wait)
+            if data is None:
+                break
+            writer.write(data)
+            await writer.drain()
+
+    deliver_task = asyncio.create_task(deliver())
+    try:
+        while True:
+            data = await reader.read(65536)
+            queue.put_nowait((time.monotonic() + delay, data or None))
+            if not data:
+                break
+        await deliver_task
+    except (ConnectionError, asyncio.CancelledError):
+        deliver_task.cancel()
+    finally:
+        writer.close()
+
+
+async def start_proxy(listen_host: str, listen_port: int, target_host: str, target_port: int,
+                      rtt_ms: float) -> asyncio.AbstractServer:
+    """Запустить прокси в текущем цикле событий. listen_port=0 - выбрать свободный порт"""
+    delay = rtt_ms / 2000
+
+    async def handle(client_reader, client_writer):
+        try:
+            server_reader, server_writer = await asyncio.open_connection(target_host, target_port)
+        except OSError:
+            client_writer.close()
+            return
+        await asyncio.gather(
+            _pipe(client_reader, server_writer, delay),
+            _pipe(server_reader, client_writer, delay),
+            return_exceptions=True,
+        )
+
+    return await asyncio.start_server(handle, listen_host, listen_port)
+
+
+async def main(args) -> None:
+    server = await start_proxy(args.listen_host, args.listen_port, args.target_host, args.target_port, args.rtt_ms)
+    print(f"Proxy {args.listen_host}:{args.listen_port} -> {args.target_host}:{args.target_port}, "
+          f"RTT +{args.rtt_ms} ms")
+    async with server:
+        await server.serve_forever()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="TCP-прокси с задержкой")
+    parser.add_argument("--listen-host", default="127.0.0.1")
+    parser.add_argument("--listen-port", type=int, default=6543)
+    parser.add_argument("--target-host", default="localhost")
+    parser.add_argument("--target-port", type=int, default=5432)
+    parser.add_argument("--rtt-ms", type=float, default=20, help="Добавляемая задержка туда-обратно, мс")
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,219 @@
+# benchmarks/load_test.py
+"""
+Нагрузочный тест горячих эндпоинтов API.
+
+Два режима:
+- asgi: приложение вызывается в том же процессе через httpx.ASGITransport (без сети и uvicorn),
+  удобно для сравнения изменений в коде;
+- http: запросы по сети к запущенному серверу (uvicorn, docker), ближе к боевой нагрузке.
+
+Перед запуском нужны данные и пользователь bench:
+    python -m benchmarks.seed_dataset --orders 5000
+    python -m benchmarks.load_test --mode asgi --concurrency 8 --requests 400
+    python -m benchmarks.load_test --mode http --base-url http://localhost:8000 --output results/run.json
+
+Результат (пропускная способность и перцентили задержки по каждому сценарию) печатается
+и сохраняется в JSON, чтобы запуски можно было сравнивать между собой.
+"""
+import argparse
+import asyncio
+import json
+import platform
+import random
+import subprocess
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Callable, Dict, List, Optional
+
+import httpx
+
+from benchmarks.seed_dataset import BENCH_USERNAME, BENCH_PASSWORD
+
+RESULTS_DIR = Path(__file__).parent / "results"
+
+GET_ALL_ENTITIES = ["orders", "people", "counterparties", "tasks", "timings", "order_comments", "box_accounting"]
+
+
+@dataclass
+class Scenario:
+    """Сценарий нагрузки: имя и функция, которая собирает очередной запрос"""
+    name: str
+    build_request: Callable[[random.Random], Dict]
+
+
+def percentile(sorted_values: List[float], q: float) -> float:
+    """Перцентиль q (0..100) по отсортированному списку, линейная интерполяция"""
+    if not sorted_values:
+        return 0.0
+    position = (len(sorted_values) - 1) * q / 100
+    lower = int(position)
+    upper = min(lower + 1, len(sorted_values) - 1)
+    return sorted_values[lower] + (sorted_values[upper] - sorted_values[lower]) * (position - lower)
+
+
+def build_scenarios(serials: List[str]) -> List[Scenario]:
+    def pick_serial(rnd: random.Random) -> str:
+        return rnd.choice(serials) if serials else "000-00-0000"
+
+    return [
+        Scenario("order_read", lambda rnd: {
+            "method": "GET", "url": "/order/read",
+            "params": {"skip": rnd.randint(0, 50) * 10, "limit": 10, "show_ended": rnd.random() < 0.5},
+        }),
+        Scenario("order_read_100", lambda rnd: {
+            "method": "GET", "url": "/order/read", "params": {"skip": 0, "limit": 100},
+        }),
+        Scenario("order_detail", lambda rnd: {
+            "method": "GET", "url": f"/order/detail/{pick_serial(rnd)}",
+        }),
+        Scenario("tasks_read", lambda rnd: {
+            "method": "GET", "url": "/tasks/read",
+            "params": {"skip": rnd.randint(0, 50) * 10, "limit": 10,
+                       "sort_field": rnd.choice(["id", "deadline_moment", "status"])},
+        }),
+        Scenario("box_accounting_read", lambda rnd: {
+            "method": "GET", "url": "/box-accounting/read/", "params": {"page": rnd.randint(1, 20), "size": 20},
+        }),
+        *[
+            Scenario(f"get_all_{entity}", lambda rnd, entity=entity: {"method": "GET", "url": f"/get_all/{entity}"})
+            for entity in GET_ALL_ENTITIES
+        ],
+        Scenario("jwt_login", lambda rnd: {
+            "method": "POST", "url": "/jwt/login/", "data": {"username": BENCH_USERNAME, "password": BENCH_PASSWORD},
+            "authenticated": False,
+        }),
+    ]
+
+
+def make_client(mode: str, base_url: str, concurrency: int) -> httpx.AsyncClient:
+    if mode == "asgi":
+        from main import app
+        transport = httpx.ASGITransport(app=app)
+        return httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60)
+    limits = httpx.Limits(max_connections=concurrency, max_keepalive_connections=concurrency)
+    return httpx.AsyncClient(base_url=base_url, limits=limits, timeout=60)
+
+
+async def login(client: httpx.AsyncClient) -> str:
+    response = await client.post("/jwt/login/", data={"username": BENCH_USERNAME, "password": BENCH_PASSWORD})
+    response.raise_for_status()
+    token = response.cookies.get("access_token")
+    if not token:
+        raise RuntimeError("Login response has no access_token cookie")
+    return token
+
+
+async def run_scenario(client: httpx.AsyncClient, scenario: Scenario, token: str, concurrency: int,
+                       requests: int, warmup: int, seed: int) -> dict:
+    """Выполнить requests запросов сценария в concurrency параллельных потоках"""
+    rnd = random.Random(seed)
+    auth_cookie = {"Cookie": f"access_token={token}"}
+
+    async def send(request: Dict) -> tuple:
+        request = dict(request)
+        headers = {} if request.pop("authenticated", True) is False else auth_cookie
+        started = time.perf_counter()
+        try:
+            response = await client.request(headers=headers, **request)
+            status = response.status_code
+            await response.aread()
+        except httpx.HTTPError:
+            status = 0
+        return time.perf_counter() - started, status
+
+    for _ in range(warmup):
+        await send(scenario.build_request(rnd))
+
+    queue = [scenario.build_request(rnd) for _ in range(requests)]
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+
+    async def worker():
+        while queue:
+            latency, status = await send(queue.pop())
+            latencies.append(latency)
+            statuses[status] = statuses.get(status, 0) + 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - started
+
+    latencies.sort()
+    errors = sum(count for status, count in statuses.items() if status == 0 or status >= 400)
+    return {
+        "scenario": scenario.name,
+        "requests": len(latencies),
+        "errors": errors,
+        "statuses": {str(status): count for status, count in sorted(statuses.items())},
+        "elapsed_s": round(elapsed, 3),
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        "latency_ms": {
+            "min": round(latencies[0] * 1000, 3) if latencies else 0.0,
+            "p50": round(percentile(latencies, 50) * 1000, 3),
+            "p95": round(percentile(latencies, 95) * 1000, 3),
+            "p99": round(percentile(latencies, 99) * 1000, 3),
+            "max": round(latencies[-1] * 1000, 3) if latencies else 0.0,
+        },
+    }
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       stderr=subprocess.DEVNULL).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+async def main(args) -> dict:
+    async with make_client(args.mode, args.base_url, args.concurrency) as client:
+        token = await login(client)
+        orders = await client.get("/order/read", params={"limit": 100},
+                                  headers={"Cookie": f"access_token={token}"})
+        serials = [order["serial"] for order in orders.json().get("data", [])] if orders.is_success else []
+
+        scenarios = build_scenarios(serials)
+        if args.only:
+            scenarios = [scenario for scenario in scenarios if scenario.name in args.only]
+
+        results = []
+        for scenario in scenarios:
+            # Логин упирается в bcrypt, много запросов не нужно
+            requests = max(1, args.requests // 10) if scenario.name == "jwt_login" else args.requests
+            result = await run_scenario(client, scenario, token, args.concurrency, requests, args.warmup, args.seed)
+            print(f"{result['scenario']:<28} {result['throughput_rps']:>9} rps  "
+                  f"p50 {result['latency_ms']['p50']:>9} ms  p95 {result['latency_ms']['p95']:>9} ms  "
+                  f"p99 {result['latency_ms']['p99']:>9} ms  errors {result['errors']}")
+            results.append(result)
+
+    return {
+        "started_at": datetime.now().isoformat(timespec="seconds"),
+        "git_revision": git_revision(),
+        "python": platform.python_version(),
+        "mode": args.mode,
+        "base_url": args.base_url if args.mode == "http" else None,
+        "concurrency": args.concurrency,
+        "requests_per_scenario": args.requests,
+        "results": results,
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Нагрузочный тест API КИС3")
+    parser.add_argument("--mode", choices=["asgi", "http"], default="asgi")
+    parser.add_argument("--base-url", default="http://localhost:8000", help="Адрес сервера для режима http")
+    parser.add_argument("--concurrency", type=int, default=8, help="Количество параллельных клиентов")
+    parser.add_argument("--requests", type=int, default=400, help="Запросов на сценарий")
+    parser.add_argument("--warmup", type=int, default=10, help="Прогревочных запросов на сценарий (не учитываются)")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--only", nargs="*", help="Запустить только указанные сценарии")
+    parser.add_argument("--output", type=Path, help="Файл для JSON с результатами (по умолчанию benchmarks/results/)")
+    args = parser.parse_args()
+
+    report = asyncio.run(main(args))
+    output = args.output or RESULTS_DIR / f"{datetime.now():%Y%m%d-%H%M%S}-{args.mode}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(report, ensure_ascii=False, indent=2), encoding="utf-8")
+    print(f"Saved to {output}")
@@ -0,0 +1,323 @@
+# benchmarks/seed_dataset.py
+"""
+Наполнение локальной базы синтетическими данными КИС3 для нагрузочных тестов.
+
+Генерирует людей, заказчиков, работы, заказы, задачи (с подзадачами), тайминги,
+комментарии и учёт шкафов. Распределения подобраны "как в жизни":
+большая часть заказов завершена, у заказа обычно несколько задач и немного комментариев,
+длительность таймингов распределена логнормально.
+Колонки, которые в приложении ведут записи (сводка заказов и Task.actual_duration),
+после вставки пересчитываются теми же функциями, что и после импорта.
+
+Все данные помечаются префиксом BENCH_PREFIX и удаляются командой --drop.
+Номера заказов продолжают нумерацию существующих заказов каждого года, а id задач назначает
+последовательность tasks, поэтому набор можно добавить в базу с настоящими данными.
+Запускать только на отдельной (тестовой) базе:
+    python -m benchmarks.seed_dataset --orders 5000 --people 80
+    python -m benchmarks.seed_dataset --drop
+"""
+import argparse
+import asyncio
+import json
+import random
+from dataclasses import dataclass, asdict
+from datetime import datetime, timedelta
+
+from sqlalchemy import select, insert, delete, func, Integer
+
+from auth.utils import get_password_hash
+from database import async_session_maker
+from models import Order, OrderStatus, Counterparty, CounterpartyForm, Person, Work, Task, TaskStatus, \
+    TaskPaymentStatus, Timing, OrderComment, BoxAccounting, User, order_work
+from utils.order_tracking import refresh_order_summaries_sync
+from utils.task_durations import verify_actual_durations
+
+BENCH_PREFIX = "bench"
+
+# Пользователь для /jwt/login/ и для всех запросов нагрузочного теста
+BENCH_USERNAME = "bench"
+BENCH_PASSWORD = "bench-password"
+BENCH_EMAIL = "bench@example.com"
+
+# Веса статусов заказов: большая часть уже выполнена, заметная доля в работе
+ORDER_STATUS_WEIGHTS = {1: 2, 2: 5, 3: 15, 4: 5, 5: 45, 6: 15, 7: 8, 8: 5}
+TASK_STATUS_NAMES = {1: "Не начата", 2: "В работе", 3: "На паузе", 4: "Завершена", 5: "Отменена"}
+PAYMENT_STATUS_NAMES = {1: "Нет оплаты", 2: "Возможна", 3: "Начислена", 4: "Оплачена"}
+
+BATCH_SIZE = 5000
+# Номер заказа внутри года - три цифры (NNN-MM-YYYY, см. routers.order_router.generate_order_serial)
+MAX_ORDERS_PER_YEAR = 999
+
+
+@dataclass
+class DatasetConfig:
+    """Размеры синтетического набора данных"""
+    people: int = 60
+    customers: int = 200
+    works: int = 12
+    orders: int = 5000
+    tasks_per_order: float = 6.0  # среднее, распределение геометрическое
+    timings_per_task: float = 3.0  # среднее
+    comments_per_order: float = 4.0  # среднее
+    boxes: int = 3000
+    years: int = 8  # на сколько лет назад раскидать заказы
+    seed: int = 42
+
+
+def _geometric(rnd: random.Random, mean: float) -> int:
+    """Целое >= 0 с геометрическим распределением и заданным средним"""
+    if mean <= 0:
+        return 0
+    p = 1 / (mean + 1)
+    count = 0
+    while rnd.random() > p:
+        count += 1
+    return count
+
+
+async def _insert_batches(session, table, rows: list) -> None:
+    for start in range(0, len(rows), BATCH_SIZE):
+        await session.execute(insert(table), rows[start:start + BATCH_SIZE])
+
+
+async def _insert_returning_ids(session, model, rows: list) -> list:
+    """Вставить строки пачками, вернуть назначенные последовательностью id в порядке строк"""
+    statement = insert(model).returning(model.id, sort_by_parameter_order=True)
+    ids = []
+    for start in range(0, len(rows), BATCH_SIZE):
+        ids.extend((await session.execute(statement, rows[start:start + BATCH_SIZE])).scalars().all())
+    return ids
+
+
+async def _last_order_numbers(session) -> dict:
+    """Наибольший номер заказа по годам среди номеров вида NNN-MM-YYYY"""
+    year = func.right(Order.serial, 4).cast(Integer)
+    number = func.substring(Order.serial, 1, 3).cast(Integer)
+    result = await session.execute(
+        select(year, func.max(number)).where(Order.serial.regexp_match(r"^\d{3}-\d{2}-\d{4}$")).group_by(year)
+    )
+    return dict(result.all())
+
+
+async def _ensure_dictionaries(session) -> None:
+    """Статусы заказов, задач и оплаты, без которых не вставить данные"""
+    for model, names in (
+            (OrderStatus, {status_id: f"{BENCH_PREFIX}-status-{status_id}" for status_id in ORDER_STATUS_WEIGHTS}),
+            (TaskStatus, TASK_STATUS_NAMES),
+            (TaskPaymentStatus, PAYMENT_STATUS_NAMES),
+    ):
+        existing = set((await session.execute(select(model.id))).scalars().all())
+        for status_id, name in names.items():
+            if status_id not in existing:
+                session.add(model(id=status_id, name=name))
+    await session.flush()
+
+
+async def seed(config: DatasetConfig) -> dict:
+    """Добавить синтетический набор данных, вернуть количество созданных записей"""
+    rnd = random.Random(config.seed)
+    now = datetime.now().replace(microsecond=0)
+    counts = {}
+
+    async with async_session_maker() as session:
+        await _ensure_dictionaries(session)
+
+        # Пользователь для логина
+        user = (await session.execute(select(User).where(User.username == BENCH_USERNAME))).scalar_one_or_none()
+        if user is None:
+            user = User(username=BENCH_USERNAME, email=BENCH_EMAIL,
+                        hashed_password=get_password_hash(BENCH_PASSWORD))
+            session.add(user)
+            await session.flush()
+        user_has_person = (await session.execute(
+            select(Person.uuid).where(Person.user_id == user.id)
+        )).first() is not None
+
+        # Заказчики
+        form = CounterpartyForm(name=f"{BENCH_PREFIX}-form")
+        session.add(form)
+        await session.flush()
+        customer_ids = list((await session.execute(
+            insert(Counterparty).returning(Counterparty.id),
+            [{"name": f"{BENCH_PREFIX}-customer-{i}", "form_id": form.id} for i in range(config.customers)]
+        )).scalars().all())
+        # Несколько крупных заказчиков дают большую часть заказов (распределение Парето)
+        customer_weights = [1 / (rank + 1) ** 1.1 for rank in range(len(customer_ids))]
+
+        # Люди: сотрудники, первый из них привязан к пользователю bench
+        people_rows = []
+        for i in range(config.people):
+            people_rows.append({
+                "name": rnd.choice(["Иван", "Пётр", "Анна", "Мария", "Олег", "Елена", "Сергей", "Ольга"]),
+                "patronymic": rnd.choice([None, "Иванович", "Петрович", "Сергеевна", "Олеговна"]),
+                "surname": f"{BENCH_PREFIX.capitalize()}{i}",
+                "note": BENCH_PREFIX,
+                "active": rnd.random() < 0.85,
+                "can_be_scheme_developer": rnd.random() < 0.3,
+                "can_be_assembler": rnd.random() < 0.4,
+                "can_be_programmer": rnd.random() < 0.3,
+                "can_be_tester": rnd.random() < 0.3,
+                "user_id": user.id if i == 0 and not user_has_person else None,
+            })
+        person_uuids = list((await session.execute(
+            insert(Person).returning(Person.uuid), people_rows
+        )).scalars().all())
+        counts["people"] = len(person_uuids)
+
+        work_ids = list((await session.execute(
+            insert(Work).returning(Work.id),
+            [{"name": f"{BENCH_PREFIX}-work-{i}"} for i in range(config.works)]
+        )).scalars().all())
+
+        # Заказы: NNN-MM-YYYY, номер по порядку внутри года после уже существующих заказов
+        order_rows, order_works_rows = [], []
+        per_year = await _last_order_numbers(session)
+        start_year = now.year - config.years + 1
+        for n in range(config.orders):
+            start_moment = now - timedelta(days=rnd.uniform(0, 365 * config.years))
+            year = max(start_moment.year, start_year)
+            per_year[year] = per_year.get(year, 0) + 1
+            if per_year[year] > MAX_ORDERS_PER_YEAR:
+                raise ValueError(f"More than {MAX_ORDERS_PER_YEAR} orders in {year}: reduce --orders or raise --years")
+            serial = f"{per_year[year]:03d}-{start_moment.month:02d}-{year}"
+            status_id = rnd.choices(list(ORDER_STATUS_WEIGHTS), weights=list(ORDER_STATUS_WEIGHTS.values()))[0]
+            order_rows.append({
+                "serial": serial,
+                "name": f"{BENCH_PREFIX}-order-{n}",
+                "customer_id": rnd.choices(customer_ids, weights=customer_weights)[0],
+                "priority": rnd.randint(1, 10) if rnd.random() < 0.6 else None,
+                "status_id": status_id,
+                "start_moment": start_moment,
+                "deadline_moment": start_moment + timedelta(days=rnd.randint(14, 180)),
+                "end_moment": start_moment + timedelta(days=rnd.randint(7, 200)) if status_id in (5, 6) else None,
+                "materials_cost": rnd.randint(0, 500_000),
+                "products_cost": rnd.randint(0, 1_000_000),
+                "work_cost": rnd.randint(0, 300_000),
+                "debt": rnd.randint(0, 200_000),
+            })
+            for work_id in rnd.sample(work_ids, k=min(len(work_ids), 1 + _geometric(rnd, 1.0))):
+                order_works_rows.append({"order_serial": serial, "work_id": work_id})
+        await _insert_batches(session, Order, order_rows)
+        await _insert_batches(session, order_work, order_works_rows)
+        counts["orders"] = len(order_rows)
+
+        # Задачи: корневые задачи заказа и подзадачи у части из них (к первой задаче заказа).
+        # Сначала вставляются задачи без родителя, затем подзадачи с их id
+        root_rows, subtask_rows, subtask_roots = [], [], []
+        for order in order_rows:
+            order_done = order["status_id"] in (5, 6)
+            root_index = None
+            for t in range(_geometric(rnd, config.tasks_per_order)):
+                is_subtask = root_index is not None and rnd.random() < 0.4
+                planned = timedelta(hours=round(rnd.lognormvariate(1.5, 0.8), 1))
+                row = {
+                    "name": f"{BENCH_PREFIX}-task-{t}",
+                    "description": "Описание задачи " * rnd.randint(0, 5) or None,
+                    "status_id": 4 if order_done else rnd.choices([1, 2, 3, 4, 5], weights=[20, 30, 10, 35, 5])[0],
+                    "payment_status_id": rnd.randint(1, 4),
+                    "executor_uuid": rnd.choice(person_uuids) if rnd.random() < 0.9 else None,
+                    "planned_duration": planned,
+                    "creation_moment": order["start_moment"],
+                    "start_moment": order["start_moment"] + timedelta(days=rnd.randint(0, 10)),
+                    "deadline_moment": order["deadline_moment"],
+                    "order_serial": order["serial"],
+                }
+                if is_subtask:
+                    subtask_rows.append(row)
+                    subtask_roots.append(root_index)
+                else:
+                    if root_index is None:
+                        root_index = len(root_rows)
+                    root_rows.append(row)
+        for row, task_id in zip(root_rows, await _insert_returning_ids(session, Task, root_rows)):
+            row["id"] = task_id
+        for row, root_index in zip(subtask_rows, subtask_roots):
+            row["parent_task_id"] = row["root_task_id"] = root_rows[root_index]["id"]
+        for row, task_id in zip(subtask_rows, await _insert_returning_ids(session, Task, subtask_rows)):
+            row["id"] = task_id
+        task_rows = root_rows + subtask_rows
+        counts["tasks"] = len(task_rows)
+
+        # Тайминги: несколько записей на задачу, длительность логнормальная
+        timing_rows = []
+        for task in task_rows:
+            for _ in range(_geometric(rnd, config.timings_per_task)):
+                minutes = max(5, int(rnd.lognormvariate(4.2, 0.7)))
+                timing_rows.append({
+                    "order_serial": task["order_serial"],
+                    "task_id": task["id"],
+                    "executor_id": task["executor_uuid"],
+                    "time": timedelta(minutes=minutes),
+                    "timing_date": (task["start_moment"] + timedelta(days=rnd.randint(0, 60))).date(),
+                })
+        await _insert_batches(session, Timing, timing_rows)
+        counts["timings"] = len(timing_rows)
+
+        # Комментарии к заказам
+        comment_rows = []
+        for order in order_rows:
+            for _ in range(_geometric(rnd, config.comments_per_order)):
+                comment_rows.append({
+                    "order_id": order["serial"],
+                    "moment_of_creation": order["start_moment"] + timedelta(hours=rnd.randint(0, 24 * 120)),
+                    "text": f"{BENCH_PREFIX}: " + "Текст комментария. " * rnd.randint(1, 12),
+                    "person_uuid": rnd.choice(person_uuids),
+                })
+        await _insert_batches(session, OrderComment, comment_rows)
+        counts["comments"] = len(comment_rows)
+
+        # Учёт шкафов
+        next_box = ((await session.execute(select(func.max(BoxAccounting.serial_num)))).scalar() or 0) + 1
+        box_rows = []
+        for i in range(config.boxes):
+            box_rows.append({
+                "serial_num": next_box + i,
+                "name": f"{BENCH_PREFIX}-box-{i}",
+                "order_id": rnd.choice(order_rows)["serial"],
+                "scheme_developer_id": rnd.choice(person_uuids),
+                "assembler_id": rnd.choice(person_uuids),
+                "programmer_id": rnd.choice(person_uuids) if rnd.random() < 0.7 else None,
+                "tester_id": rnd.choice(person_uuids),
+            })
+        await _insert_batches(session, BoxAccounting, box_rows)
+        counts["boxes"] = len(box_rows)
+
+        # Сводка заказов для /order/read (число задач и комментариев, время, последняя активность)
+        await session.run_sync(refresh_order_summaries_sync, [order["serial"] for order in order_rows])
+        await session.commit()
+
+        # actual_duration задач и их предков по вставленным таймингам (исправления фиксируются там же)
+        counts["tasks_with_fixed_duration"] = len(await verify_actual_durations(session, fix=True))
+    return counts
+
+
+async def drop() -> None:
+    """Удалить всё, что добавил seed() (пользователь bench остаётся)"""
+    async with async_session_maker() as session:
+        bench_orders = select(Order.serial).where(Order.name.like(f"{BENCH_PREFIX}-order-%"))
+        await session.execute(delete(Timing).where(Timing.order_serial.in_(bench_orders)))
+        await session.execute(delete(OrderComment).where(OrderComment.order_id.in_(bench_orders)))
+        await session.execute(delete(BoxAccounting).where(BoxAccounting.name.like(f"{BENCH_PREFIX}-box-%")))
+        await session.execute(delete(Task).where(Task.order_serial.in_(bench_orders)))
+        await session.execute(delete(order_work).where(order_work.c.order_serial.in_(bench_orders)))
+        await session.execute(delete(Order).where(Order.name.like(f"{BENCH_PREFIX}-order-%")))
+        await session.execute(delete(Work).where(Work.name.like(f"{BENCH_PREFIX}-work-%")))
+        await session.execute(delete(Person).where(Person.note == BENCH_PREFIX))
+        await session.execute(delete(Counterparty).where(Counterparty.name.like(f"{BENCH_PREFIX}-customer-%")))
+        await session.execute(delete(CounterpartyForm).where(CounterpartyForm.name == f"{BENCH_PREFIX}-form"))
+        await session.commit()
+
+
+if __name__ == "__main__":
+    defaults = DatasetConfig()
+    parser = argparse.ArgumentParser(description="Синтетический набор данных для нагрузочных тестов")
+    parser.add_argument("--drop", action="store_true", help="Удалить ранее добавленные данные и выйти")
+    for field, value in asdict(defaults).items():
+        parser.add_argument(f"--{field.replace('_', '-')}", type=type(value), default=value)
+    args = parser.parse_args()
+
+    if args.drop:
+        asyncio.run(drop())
+    else:
+        dataset = DatasetConfig(**{field: getattr(args, field) for field in asdict(defaults)})
+        print(json.dumps(asyncio.run(seed(dataset)), indent=2))
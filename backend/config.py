@@ -31,6 +31,26 @@ class Settings(BaseSettings):
     api_v1_prefix: str = ""
     auth_jwt: AuthJWT = AuthJWT()
 
+    # Вывод всех SQL-запросов в лог (echo движка SQLAlchemy)
+    db_echo: bool = False
+    # Предупреждать в логе о запросах, повторённых за один HTTP-запрос n_plus_one_threshold и более раз
+    debug_n_plus_one: bool = False
+    n_plus_one_threshold: int = 5
+    # Шина ленты изменений (/changes/stream): "postgres" (LISTEN/NOTIFY) или "memory" (внутри процесса)
+    change_feed_backend: str = "postgres"
+    # Роутеры, которые не нужны рабочим воркерам: /test и /import (импорт из КИС2)
+    enable_test_router: bool = True
+    enable_import_router: bool = True
+    # Базовая валюта (Currency.name): в неё пересчитываются цены оборудования, её курс всегда 1
+    base_currency: str = "RUB"
+    # Время жизни кэша /person/workload в секундах, 0 - без кэша
+    workload_cache_seconds: int = 30
+    # На сколько месяцев вперёд создавать секции timings (python -m utils.timing_partitions по расписанию)
+    timing_partitions_months_ahead: int = 3
+    # Общий токен для /metrics (Prometheus передаёт его в заголовке Authorization: Bearer <токен>);
+    # пустой - /metrics отвечает 404
+    metrics_token: str = ""
+
 
 # Создаем экземпляр настроек
 settings = Settings()
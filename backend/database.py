@@ -5,16 +5,14 @@
 # Для запуска в консоли:
 # .venv\Scripts\python.exe D:\MyProgGit\KIS3_v2r2\backend\database.py
 
-from config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER
-from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine, async_sessionmaker
-from sqlalchemy.orm import sessionmaker
+from config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER, settings
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, create_async_engine, async_sessionmaker
+from sqlalchemy.engine import Engine
+from sqlalchemy.orm import Session, sessionmaker
 from sqlalchemy import create_engine, text
 import asyncio
 from colorama import init, Fore
-from typing import List
-
-# Инициализируем colorama
-init(autoreset=True)
+from typing import Callable, List, Optional
 
 # Формируем URL для подключения к базе данных
 from urllib.parse import quote_plus
@@ -22,13 +20,64 @@ from urllib.parse import quote_plus
 DATABASE_URL_ASYNC = f"postgresql+asyncpg://{DB_USER}:{quote_plus(DB_PASS)}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 DATABASE_URL_SYNC = f"postgresql://{DB_USER}:{quote_plus(DB_PASS)}@{DB_HOST}:{DB_PORT}/{DB_NAME}"
 
-# Создаем асинхронный движок и сессию
-async_engine = create_async_engine(DATABASE_URL_ASYNC, echo=True)
-async_session_maker = async_sessionmaker(async_engine, class_=AsyncSession, expire_on_commit=False)
+# Движки создаются при первом обращении, а не при импорте модуля:
+# синхронный движок (и psycopg2) нужен только импорту из КИС2 и скриптам, воркеры API его не загружают
+_async_engine: Optional[AsyncEngine] = None
+_async_session_factory: Optional[async_sessionmaker] = None
+_sync_engine: Optional[Engine] = None
+_sync_session_factory: Optional[sessionmaker] = None
+# Что сделать с асинхронным движком сразу после создания (например, подключить подсчёт SQL-запросов)
+_async_engine_hooks: List[Callable[[AsyncEngine], None]] = []
+
+
+def on_async_engine_created(hook: Callable[[AsyncEngine], None]) -> None:
+    """Вызвать hook для асинхронного движка: сразу, если он уже создан, и при каждом следующем создании"""
+    _async_engine_hooks.append(hook)
+    if _async_engine is not None:
+        hook(_async_engine)
+
+
+def get_async_engine() -> AsyncEngine:
+    """Асинхронный движок (создаётся при первом вызове)"""
+    global _async_engine, _async_session_factory
+    if _async_engine is None:
+        _async_engine = create_async_engine(DATABASE_URL_ASYNC, echo=settings.db_echo)
+        _async_session_factory = async_sessionmaker(_async_engine, class_=AsyncSession, expire_on_commit=False)
+        for hook in _async_engine_hooks:
+            hook(_async_engine)
+    return _async_engine
+
+
+def async_session_maker() -> AsyncSession:
+    """Новая асинхронная сессия (как вызов async_sessionmaker)"""
+    get_async_engine()
+    return _async_session_factory()
+
+
+def get_sync_engine() -> Engine:
+    """Синхронный движок (создаётся при первом вызове)"""
+    global _sync_engine, _sync_session_factory
+    if _sync_engine is None:
+        _sync_engine = create_engine(DATABASE_URL_SYNC, echo=False)
+        _sync_session_factory = sessionmaker(bind=_sync_engine)
+    return _sync_engine
+
+
+def SyncSession() -> Session:  # noqa: N802 - имя сохранено с тех пор, когда здесь был sessionmaker
+    """Новая синхронная сессия"""
+    get_sync_engine()
+    return _sync_session_factory()
+
 
-# Создаем синхронный движок и сессию
-sync_engine = create_engine(DATABASE_URL_SYNC, echo=False)
-SyncSession = sessionmaker(bind=sync_engine)
+async def dispose_engines() -> None:
+    """Закрыть пулы соединений созданных движков (при остановке приложения)"""
+    global _async_engine, _async_session_factory, _sync_engine, _sync_session_factory
+    if _async_engine is not None:
+        await _async_engine.dispose()
+        _async_engine, _async_session_factory = None, None
+    if _sync_engine is not None:
+        _sync_engine.dispose()
+        _sync_engine, _sync_session_factory = None, None
 
 
 # Зависимость для получения асинхронной сессии базы данных (для FastAPI)
@@ -87,7 +136,7 @@ async def get_table_names(schema='public', print_results=True) -> List[str]:
 def test_sync_connection() -> bool:
     """Проверка подключения к базе данных (синхронно)"""
     try:
-        with sync_engine.connect() as conn:
+        with get_sync_engine().connect() as conn:
             result = conn.execute(text("SELECT 1")).scalar()
             print(Fore.GREEN + "Синхронное подключение к базе данных успешно установлено.")
             print(f"Результат тестового запроса: {result}")
@@ -133,6 +182,8 @@ async def async_main():
 # Основная функция с поддержкой как асинхронных, так и синхронных операций
 def main():
     """Основная функция для демонстрации работы модуля"""
+    # Инициализируем colorama (цветной вывод в консоли Windows)
+    init(autoreset=True)
     print(Fore.CYAN + "=== Тестирование СИНХРОННЫХ функций работы с БД ===")
     if test_sync_connection():
         get_sync_table_names()
@@ -2,9 +2,15 @@
 """
 главный файл
 """
+import time
+
+# Начало импорта приложения: отсюда считается app_startup_seconds{phase="import"}
+_IMPORT_STARTED = time.perf_counter()
+
 import asyncio
 import logging
 from contextlib import asynccontextmanager
+from typing import Optional
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.responses import HTMLResponse
@@ -13,8 +19,6 @@ from sqlalchemy import text  # Импортируем text для запроса
 import uvicorn
 from auth import jwt_auth
 
-from routers.test_views import router as test_router
-from routers.import_router import router as import_router
 from routers.box_accountig_router import router as box_accountig_router
 from routers.get_all_router import router as get_all_router
 from routers.order_router import router as order_router
@@ -23,9 +27,23 @@ from routers.counterparty_router import router as counterparty_router
 from routers.work_router import router as work_router
 from routers.comments_router import router as comments_router
 from routers.task_router import router as task_router
+from routers.analytics_router import router as analytics_router
+from routers.metrics_router import router as metrics_router
+from routers.changes_router import router as changes_router
+from routers.equipment_router import router as equipment_router
+from routers.pricing_router import router as pricing_router
+from routers.offers_router import router as offers_router
+from routers.timesheet_router import router as timesheet_router
+from routers.timing_router import router as timing_router
 
 # Импортируем фабрику сессий из вашего модуля database
-from database import async_session_maker
+from config import settings
+from database import async_session_maker, on_async_engine_created, dispose_engines
+from utils.instrumentation import install_sqlalchemy_hooks, RequestMetricsMiddleware
+from utils.responses import ORJSONResponse
+from utils.metrics import monitor_event_loop_lag, app_startup_duration
+from utils.route_audit import audit_routes
+from utils.change_feed import change_bus
 
 # --- Конфигурация логирования ---
 # настроим базовый логгер для вывода информации о фоновой задаче
@@ -72,21 +90,33 @@ async def keep_db_connection_alive(interval_seconds: int = 60):
 
 @asynccontextmanager
 # async def lifespan(app: FastAPI): # <-- Можно и так, если не мешает предупреждение линтера
-async def lifespan(_: FastAPI): # <-- Вот так, чтобы показать, что app не используется
+async def lifespan(application: FastAPI):
     """
     Менеджер жизненного цикла FastAPI для запуска и остановки фоновых задач.
     """
+    startup_started = time.perf_counter()
+    # Дубликаты маршрутов и заранее собранная схема OpenAPI
+    audit_routes(application)
     logger.info("Application startup: Initializing keep-alive task...")
     # Запускаем задачу поддержания соединения с БД в фоне.
     # Устанавливаем интервал, например, 55 секунд (чуть меньше стандартных таймаутов)
     keep_alive_task = asyncio.create_task(keep_db_connection_alive(interval_seconds=55))
+    # Замер задержки цикла событий для /metrics
+    loop_lag_task = asyncio.create_task(monitor_event_loop_lag(interval_seconds=0.5))
+    # Лента изменений для /changes/stream (LISTEN на отдельном соединении)
+    await change_bus.start()
+    app_startup_duration.set(time.perf_counter() - startup_started, phase="lifespan")
+    logger.info(f"Application startup took {time.perf_counter() - startup_started:.3f}s")
 
     yield  # Приложение работает здесь
 
     # Код после yield выполняется при остановке приложения
     logger.info("Application shutdown: Stopping keep-alive task...")
     # Отправляем сигнал отмены задаче
+    await change_bus.stop()
     keep_alive_task.cancel()
+    loop_lag_task.cancel()
+    await asyncio.gather(loop_lag_task, return_exceptions=True)
     try:
         # Ждем завершения задачи (она должна обработать CancelledError)
         await keep_alive_task
@@ -96,41 +126,14 @@ async def lifespan(_: FastAPI): # <-- Вот так, чтобы показать
     except Exception as e:
         # Логируем непредвиденные ошибки при остановке задачи
         logger.error(f"Error stopping keep-alive task: {e}", exc_info=True)
+    # Закрываем соединения пулов движков, созданных за время работы
+    await dispose_engines()
     logger.info("Application shutdown complete.")
 
 
 # --- Конец фоновой задачи ---
 
 
-# Создаем приложение FastAPI с lifespan менеджером
-app = FastAPI(root_path="/api", lifespan=lifespan)
-
-
-app.include_router(comments_router)
-app.include_router(import_router)
-app.include_router(test_router)
-app.include_router(jwt_auth.router)
-app.include_router(box_accountig_router)
-app.include_router(get_all_router)
-app.include_router(order_router)
-app.include_router(people_router)
-app.include_router(counterparty_router)
-app.include_router(work_router)
-app.include_router(task_router)
-
-# Настройка CORS
-app.add_middleware(
-    CORSMiddleware,  # type: ignore[misc]
-    allow_origins=["https://sibplc-kis3.ru", "http://localhost:3000", "http://localhost:80", "http://localhost",
-                   'http://localhost:8000', 'http://localhost:5173', 'http://localhost:5174', 'http://localhost:5175',
-                   'http://localhost:5176'],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-) # type: ignore
-
-
-@app.get("/")
 def home():
     """Домашняя страница"""
     html_content = "<h2>FastAPI is the best backend framework</h2>"
@@ -138,6 +141,74 @@ def home():
     return HTMLResponse(content=html_content)
 
 
+def create_app(enable_test_router: Optional[bool] = None, enable_import_router: Optional[bool] = None) -> FastAPI:
+    """
+    Собрать приложение FastAPI.
+
+    Параметры:
+    - enable_test_router: подключать /test (по умолчанию settings.enable_test_router)
+    - enable_import_router: подключать /import (по умолчанию settings.enable_import_router)
+
+    Возвращает: приложение с роутерами, middleware и lifespan
+    """
+    if enable_test_router is None:
+        enable_test_router = settings.enable_test_router
+    if enable_import_router is None:
+        enable_import_router = settings.enable_import_router
+
+    # Создаем приложение FastAPI с lifespan менеджером
+    application = FastAPI(root_path="/api", lifespan=lifespan, default_response_class=ORJSONResponse)
+
+    # Подсчёт SQL-запросов и времени на каждый HTTP-запрос (заголовок Server-Timing и гистограммы)
+    application.add_middleware(RequestMetricsMiddleware)  # type: ignore[arg-type]
+
+    application.include_router(comments_router)
+    # Импорт из КИС2 и тестовые эндпоинты в рабочих воркерах не нужны, их модули импортируем только при включении
+    if enable_import_router:
+        from routers.import_router import router as import_router
+        application.include_router(import_router)
+    if enable_test_router:
+        from routers.test_views import router as test_router
+        application.include_router(test_router)
+    application.include_router(jwt_auth.router)
+    application.include_router(box_accountig_router)
+    application.include_router(get_all_router)
+    application.include_router(order_router)
+    application.include_router(people_router)
+    application.include_router(counterparty_router)
+    application.include_router(work_router)
+    application.include_router(task_router)
+    application.include_router(analytics_router)
+    application.include_router(metrics_router)
+    application.include_router(changes_router)
+    application.include_router(equipment_router)
+    application.include_router(pricing_router)
+    application.include_router(offers_router)
+    application.include_router(timesheet_router)
+    application.include_router(timing_router)
+
+    # Настройка CORS
+    application.add_middleware(
+        CORSMiddleware,  # type: ignore[misc]
+        allow_origins=["https://sibplc-kis3.ru", "http://localhost:3000", "http://localhost:80", "http://localhost",
+                       'http://localhost:8000', 'http://localhost:5173', 'http://localhost:5174',
+                       'http://localhost:5175', 'http://localhost:5176'],
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )  # type: ignore
+
+    application.get("/")(home)
+    return application
+
+
+# Хуки движка ставятся при его создании (движок создаётся при первом запросе к базе)
+on_async_engine_created(install_sqlalchemy_hooks)
+app = create_app()
+
+app_startup_duration.set(time.perf_counter() - _IMPORT_STARTED, phase="import")
+
+
 # для автоматического перезапуска приложения при изменении кода
 if __name__ == "__main__":
     # Используйте эту команду для запуска с Uvicorn.
@@ -0,0 +1,97 @@
+"""partition timings by month
+
+Revision ID: a8d35e1f6b92
+Revises: f2b84d6e0c17
+Create Date: 2025-06-12 11:02:54.184377
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'a8d35e1f6b92'
+down_revision: Union[str, None] = 'f2b84d6e0c17'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Секции на месяцы вперёд при миграции; дальше их создаёт utils.timing_partitions
+MONTHS_AHEAD = 12
+
+
+def upgrade() -> None:
+    op.drop_index('ix_timings_executor_id_timing_date', table_name='timings', postgresql_include=['time'])
+    op.execute('ALTER TABLE timings RENAME TO timings_unpartitioned')
+    op.execute('ALTER INDEX timings_pkey RENAME TO timings_unpartitioned_pkey')
+
+    # PRIMARY KEY секционированной таблицы должен включать timing_date, а она может быть NULL
+    op.execute("""
+        CREATE TABLE timings (
+            id integer NOT NULL DEFAULT nextval('timings_id_seq'::regclass),
+            order_serial varchar(16) NOT NULL REFERENCES orders (serial),
+            task_id integer NOT NULL REFERENCES tasks (id),
+            executor_id uuid REFERENCES people (uuid),
+            time interval NOT NULL,
+            timing_date date,
+            CONSTRAINT uq_timings_id_timing_date UNIQUE (id, timing_date)
+        ) PARTITION BY RANGE (timing_date)
+    """)
+    op.execute('ALTER SEQUENCE timings_id_seq OWNED BY timings.id')
+    # Строки без даты и за пределами помесячных секций
+    op.execute('CREATE TABLE timings_default PARTITION OF timings DEFAULT')
+    # Помесячные секции от первого тайминга (но не старше 15 лет) до MONTHS_AHEAD месяцев вперёд
+    op.execute(f"""
+        DO $$
+        DECLARE
+            month date;
+        BEGIN
+            FOR month IN
+                SELECT generate_series(
+                    date_trunc('month', greatest(
+                        coalesce((SELECT min(timing_date) FROM timings_unpartitioned), current_date),
+                        current_date - interval '15 years')),
+                    date_trunc('month', current_date) + interval '{MONTHS_AHEAD} months',
+                    interval '1 month')::date
+            LOOP
+                EXECUTE format('CREATE TABLE %I PARTITION OF timings FOR VALUES FROM (%L) TO (%L)',
+                               'timings_' || to_char(month, 'YYYY_MM'), month, (month + interval '1 month')::date);
+            END LOOP;
+        END $$
+    """)
+    op.execute("""
+        INSERT INTO timings (id, order_serial, task_id, executor_id, time, timing_date)
+        SELECT id, order_serial, task_id, executor_id, time, timing_date FROM timings_unpartitioned
+    """)
+    op.execute('DROP TABLE timings_unpartitioned')
+
+    # Индексы секционированной таблицы создаются во всех секциях
+    op.create_index('ix_timings_executor_id_timing_date', 'timings', ['executor_id', 'timing_date'], unique=False,
+                    postgresql_include=['time', 'task_id', 'order_serial'])
+    op.create_index('ix_timings_order_serial', 'timings', ['order_serial'], unique=False)
+    op.create_index('ix_timings_task_id', 'timings', ['task_id'], unique=False)
+    op.execute('ANALYZE timings')
+
+
+def downgrade() -> None:
+    op.execute('ALTER TABLE timings RENAME TO timings_partitioned')
+    op.execute("""
+        CREATE TABLE timings (
+            id integer NOT NULL DEFAULT nextval('timings_id_seq'::regclass),
+            order_serial varchar(16) NOT NULL REFERENCES orders (serial),
+            task_id integer NOT NULL REFERENCES tasks (id),
+            executor_id uuid REFERENCES people (uuid),
+            time interval NOT NULL,
+            timing_date date,
+            CONSTRAINT timings_pkey PRIMARY KEY (id)
+        )
+    """)
+    op.execute("""
+        INSERT INTO timings (id, order_serial, task_id, executor_id, time, timing_date)
+        SELECT id, order_serial, task_id, executor_id, time, timing_date FROM timings_partitioned
+    """)
+    op.execute('ALTER SEQUENCE timings_id_seq OWNED BY timings.id')
+    # Вместе с секционированной таблицей удаляются все секции и их индексы
+    op.execute('DROP TABLE timings_partitioned')
+    op.create_index('ix_timings_executor_id_timing_date', 'timings', ['executor_id', 'timing_date'], unique=False,
+                    postgresql_include=['time'])
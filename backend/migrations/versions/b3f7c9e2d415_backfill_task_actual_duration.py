@@ -0,0 +1,45 @@
+"""backfill task actual_duration
+
+Revision ID: b3f7c9e2d415
+Revises: a8d35e1f6b92
+Create Date: 2025-06-16 11:05:48.219354
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'b3f7c9e2d415'
+down_revision: Union[str, None] = 'a8d35e1f6b92'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # actual_duration = время таймингов задачи и всех её подзадач; дальше поддерживается
+    # инкрементально (utils.task_durations), здесь - начальные значения
+    op.execute("UPDATE tasks SET actual_duration = NULL WHERE actual_duration IS NOT NULL")
+    op.execute("""
+        WITH RECURSIVE own AS (
+            SELECT task_id, sum(time) AS delta FROM timings GROUP BY task_id
+        ), ancestors(id, delta, depth) AS (
+            SELECT task_id, delta, 0 FROM own
+            UNION ALL
+            SELECT tasks.parent_task_id, ancestors.delta, ancestors.depth + 1
+            FROM ancestors JOIN tasks ON tasks.id = ancestors.id
+            WHERE tasks.parent_task_id IS NOT NULL AND ancestors.depth < 32
+        ), totals AS (
+            SELECT id, NULLIF(sum(delta), INTERVAL '0') AS total FROM ancestors GROUP BY id
+        )
+        UPDATE tasks SET actual_duration = totals.total
+        FROM totals
+        WHERE tasks.id = totals.id
+    """)
+
+
+def downgrade() -> None:
+    # Значения actual_duration остаются: до этой ревизии колонку ничто не поддерживало
+    pass
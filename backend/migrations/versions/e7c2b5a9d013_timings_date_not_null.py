@@ -0,0 +1,41 @@
+"""timings date not null
+
+Revision ID: e7c2b5a9d013
+Revises: c9e4a7b1f362
+Create Date: 2025-06-20 10:37:15.480262
+
+"""
+from typing import Sequence, Union
+
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision: str = 'e7c2b5a9d013'
+down_revision: Union[str, None] = 'c9e4a7b1f362'
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Тайминги без даты: завершение, начало или создание задачи, начало заказа, иначе день миграции
+    # (однократно; импорт из КИС2 берёт дату задачи или заказа, а без них пропускает тайминг).
+    # Строки переезжают в секции своих месяцев
+    op.execute("""
+        UPDATE timings SET timing_date = coalesce(
+            CAST(coalesce(tasks.end_moment, tasks.start_moment, tasks.creation_moment, orders.start_moment) AS date),
+            current_date)
+        FROM tasks LEFT JOIN orders ON orders.serial = tasks.order_serial
+        WHERE tasks.id = timings.task_id AND timings.timing_date IS NULL
+    """)
+    op.alter_column('timings', 'timing_date', existing_type=sa.Date(), nullable=False)
+    # С обязательной датой вместо UNIQUE (id, timing_date) - полноценный первичный ключ
+    op.drop_constraint('uq_timings_id_timing_date', 'timings', type_='unique')
+    op.create_primary_key('timings_pkey', 'timings', ['id', 'timing_date'])
+
+
+def downgrade() -> None:
+    op.drop_constraint('timings_pkey', 'timings', type_='primary')
+    op.create_unique_constraint('uq_timings_id_timing_date', 'timings', ['id', 'timing_date'])
+    op.alter_column('timings', 'timing_date', existing_type=sa.Date(), nullable=True)
@@ -3,7 +3,8 @@
 Модуль для работы с базой данных через SQLAlchemy
 """
 
-from sqlalchemy import MetaData, Integer, String, ForeignKey, Date, Boolean, Text, DateTime, Table
+from sqlalchemy import MetaData, Integer, String, ForeignKey, Date, Boolean, Text, DateTime, Table, Index, func
+from sqlalchemy import Numeric, UniqueConstraint, text, BigInteger
 from sqlalchemy.ext.asyncio import AsyncAttrs
 from sqlalchemy.orm import validates
 from sqlalchemy.orm import DeclarativeBase
@@ -21,6 +22,7 @@ from typing import List
 from datetime import date, UTC
 from datetime import datetime
 from datetime import timedelta
+from decimal import Decimal
 
 # Переменная, которая хранит информацию о таблицах
 metadata = MetaData()
@@ -64,11 +66,37 @@ class Currency(Base):
 
     # Отношения
     equipments: Mapped[List["Equipment"]] = relationship(back_populates="currency")
+    rates: Mapped[List["CurrencyRate"]] = relationship(back_populates="currency")
 
     def __repr__(self) -> str:
         return f"Currency(id={self.id!r}, name={self.name!r})"
 
 
+class CurrencyRate(Base):
+    """
+    Курс валюты на дату: сколько единиц базовой валюты (settings.base_currency) стоит одна единица валюты.
+    Для пересчёта цены на дату берётся последний курс не позже этой даты.
+    """
+    __tablename__ = 'currency_rates'
+    __table_args__ = (
+        # Один курс на валюту и дату; индекс ограничения используется для поиска последнего курса
+        UniqueConstraint("currency_id", "rate_date", name="uq_currency_rates_currency_id_rate_date"),
+    )
+
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    currency_id: Mapped[int] = mapped_column(ForeignKey('currencies.id'), nullable=False)
+    rate_date: Mapped[date] = mapped_column(Date, nullable=False)  # Дата, с которой действует курс
+    rate: Mapped[Decimal] = mapped_column(Numeric(18, 6), nullable=False)  # Единиц базовой валюты за единицу
+    # Время последнего изменения курса (версия курсов для кэша прайс-листа - utils.data_versions.RATES)
+    updated_at: Mapped[datetime] = mapped_column(DateTime, default=datetime.now, server_default=func.now())
+
+    # Отношения
+    currency: Mapped["Currency"] = relationship(back_populates="rates")
+
+    def __repr__(self) -> str:
+        return f"CurrencyRate(currency_id={self.currency_id!r}, rate_date={self.rate_date!r}, rate={self.rate!r})"
+
+
 class City(Base):
     """Города"""
     __tablename__ = 'cities'
@@ -272,6 +300,21 @@ class Order(Base):
     debt_fact: Mapped[int | None] = mapped_column(Integer, nullable=True)  # Задолженность нам
     debt_paid: Mapped[bool] = mapped_column(Boolean, default=False)  # Задолженность оплачена
 
+    # Версия для условных GET (ETag): увеличивается при изменении заказа, его комментариев, задач и таймингов
+    version: Mapped[int] = mapped_column(Integer, nullable=False, default=1, server_default="1")
+    updated_at: Mapped[datetime] = mapped_column(DateTime, nullable=False, default=datetime.now,
+                                                 server_default=func.now(), index=True)  # Последнее изменение
+
+    # Сводка для списка заказов, пересчитывается записями задач, комментариев и таймингов
+    # (utils.order_tracking.refresh_order_summaries)
+    task_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    open_task_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0,
+                                                 server_default="0")  # Не завершены и не отменены
+    comment_count: Mapped[int] = mapped_column(Integer, nullable=False, default=0, server_default="0")
+    logged_time: Mapped[Optional[timedelta]] = mapped_column(Interval, nullable=True)  # Сумма таймингов
+    # Последний комментарий или дата последнего тайминга
+    last_activity_at: Mapped[Optional[datetime]] = mapped_column(DateTime, nullable=True)
+
     @validates('priority')
     def validate_priority(self, key, value):  # noqa
         if value is not None:
@@ -323,6 +366,11 @@ class OrderComment(Base):
     # relations
     order: Mapped["Order"] = relationship(back_populates="comments")
 
+    __table_args__ = (
+        # Лента комментариев заказа: keyset-пагинация по (moment_of_creation, id)
+        Index("ix_comments_on_orders_order_id_moment_id", "order_id", "moment_of_creation", "id"),
+    )
+
 
 class TaskStatus(Base):
     """
@@ -444,6 +492,15 @@ class Task(Base):
         foreign_keys="[Task.root_task_id]"  # Используем строковое представление
     )
 
+    __table_args__ = (
+        # Сводка заказа (utils.order_tracking): число задач и открытых задач заказа
+        Index("ix_tasks_order_serial_status_id", "order_serial", "status_id"),
+        # Нагрузка исполнителей (/person/workload): открытые задачи (не завершены и не отменены) по исполнителю
+        Index("ix_tasks_open_executor_uuid", "executor_uuid",
+              postgresql_include=["planned_duration", "deadline_moment"],
+              postgresql_where=text("status_id NOT IN (4, 5)")),
+    )
+
     def __repr__(self) -> str:
         return f"Task(id={self.id!r}, name={self.name!r})"
 
@@ -476,11 +533,12 @@ class Equipment(Base):
     # Артикул, код поставщика
     vendor_code: Mapped[Optional[str]] = mapped_column(String(32), nullable=True, unique=True)
     description: Mapped[Optional[str]] = mapped_column(Text, nullable=True)  # Описание
-    type_id: Mapped[Optional[int]] = mapped_column(ForeignKey('equipment_types.id'), nullable=True)  # Тип оборудования
+    type_id: Mapped[Optional[int]] = mapped_column(ForeignKey('equipment_types.id'), nullable=True,
+                                                   index=True)  # Тип оборудования
 
     # Производитель
-    manufacturer_id: Mapped[Optional[int]] = mapped_column(ForeignKey('manufacturers.id'), nullable=True)
-    price: Mapped[Optional[int]] = mapped_column(Integer, nullable=True)  # Цена
+    manufacturer_id: Mapped[Optional[int]] = mapped_column(ForeignKey('manufacturers.id'), nullable=True, index=True)
+    price: Mapped[Optional[int]] = mapped_column(Integer, nullable=True, index=True)  # Цена
     currency_id: Mapped[Optional[int]] = mapped_column(ForeignKey('currencies.id'), nullable=True)  # Валюта
     relevance: Mapped[bool] = mapped_column(Boolean, default=True)  # Актуальность
     price_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)  # Дата обновления цены
@@ -504,6 +562,15 @@ class Equipment(Base):
         return f"Equipment(id={self.id!r}, name={self.name!r}, model={self.model!r})"
 
 
+# Индексы поиска по каталогу оборудования (/equipment/search):
+# триграммные (pg_trgm) - для поиска подстроки и префикса без учёта регистра,
+# (name, id) - для keyset-пагинации в порядке сортировки по имени
+for _column in (Equipment.name, Equipment.model, Equipment.vendor_code):
+    Index(f"ix_equipment_{_column.key}_trgm", func.lower(_column).label(f"{_column.key}_lower"),
+          postgresql_using="gin", postgresql_ops={f"{_column.key}_lower": "gin_trgm_ops"})
+Index("ix_equipment_name_id", Equipment.name, Equipment.id)
+
+
 class ControlCabinetMaterial(Base):
     __tablename__ = 'control_cabinet_materials'
 
@@ -560,7 +627,7 @@ class Timing(Base):
     task_id: Mapped[int] = mapped_column(ForeignKey('tasks.id'), nullable=False)  # Задача
     executor_id: Mapped[Optional[int]] = mapped_column(ForeignKey('people.uuid'), nullable=True)  # Исполнитель
     time: Mapped[timedelta] = mapped_column(Interval, nullable=False)  # Потраченное время
-    timing_date: Mapped[Optional[date]] = mapped_column(Date, nullable=True)  # Дата тайминга
+    timing_date: Mapped[date] = mapped_column(Date, nullable=False)  # Дата тайминга (ключ секционирования)
 
     # Отношения
     order: Mapped["Order"] = relationship(back_populates="timings")
@@ -570,10 +637,38 @@ class Timing(Base):
         foreign_keys="[Timing.executor_id]"
     )
 
+    # Таблица секционирована по месяцам timing_date (секции timings_YYYY_MM создаёт utils.timing_partitions,
+    # строки за месяцы без секции попадают в timings_default). Первичный ключ секционированной таблицы обязан
+    # включать timing_date, поэтому в базе PRIMARY KEY (id, timing_date), а id остаётся первичным ключом
+    # только для ORM: его уникальность обеспечивает последовательность timings_id_seq (id не задаётся явно)
+    __table_args__ = (
+        # Табель и нагрузка исполнителей: время исполнителя за период без обращения к строкам таблицы
+        Index("ix_timings_executor_id_timing_date", "executor_id", "timing_date",
+              postgresql_include=["time", "task_id", "order_serial"]),
+        Index("ix_timings_order_serial", "order_serial"),
+        Index("ix_timings_task_id", "task_id"),
+        {"postgresql_partition_by": "RANGE (timing_date)"},
+    )
+
     def __repr__(self) -> str:
         return f"Timing(id={self.id!r}, order_serial={self.order_serial!r}, task_id={self.task_id!r})"
 
 
+class DataVersion(Base):
+    """
+    Счётчики версий данных для кэшей и ETag (см. utils.data_versions).
+    Счётчик увеличивается отдельной короткой транзакцией после commit записи данных
+    (utils.data_versions.commit_and_bump), поэтому сама запись не ждёт блокировку этой строки
+    """
+    __tablename__ = 'data_versions'
+
+    name: Mapped[str] = mapped_column(String(32), primary_key=True)  # Что версионируется: "equipment", ...
+    version: Mapped[int] = mapped_column(BigInteger, nullable=False, server_default="0")
+
+    def __repr__(self) -> str:
+        return f"DataVersion(name={self.name!r}, version={self.version!r})"
+
+
 class User(AsyncAttrs, Base):
     __tablename__ = "users"
 
@@ -0,0 +1,139 @@
+# routers/analytics_router.py
+"""
+Тут функции - роутеры для аналитики
+"""
+from fastapi import APIRouter, Depends, Query
+from sqlalchemy import select, func, tuple_, literal_column, BigInteger
+from sqlalchemy.ext.asyncio import AsyncSession
+from loguru import logger
+
+from auth.jwt_auth import get_current_auth_user
+from database import get_async_db
+from models import Order
+from models import User as UserModel
+from schemas.analytics_schem import FinanceAnalyticsResponse, FinanceTotals, FinanceByStatus, FinanceByCustomer, \
+    FinanceByMonth
+from utils.cache import finance_cache
+from utils.data_versions import ORDERS, read_version
+from utils.responses import ModelResponse
+
+router = APIRouter(
+    prefix="/analytics",
+    tags=["analytics"],
+)
+
+# Статусы завершённых заказов, как в /order/read
+COMPLETED_ORDER_STATUSES = [5, 6, 7]
+
+# Значения func.grouping(status_id, customer_id, month) для каждого набора группировки
+GROUPING_BY_STATUS = 0b011
+GROUPING_BY_CUSTOMER = 0b101
+GROUPING_BY_MONTH = 0b110
+GROUPING_TOTAL = 0b111
+
+
+def _sum(column, where=None):
+    """SUM(column) [FILTER (WHERE ...)], NULL заменяется нулём"""
+    aggregate = func.sum(column)
+    if where is not None:
+        aggregate = aggregate.filter(where)
+    return func.coalesce(aggregate, 0).cast(BigInteger)
+
+
+def build_finance_query(show_ended: bool = True):
+    """
+    Собирает запрос, который за один проход по таблице заказов считает итоги
+    по статусам, по заказчикам, по месяцам начала заказа и общий итог (GROUPING SETS).
+    """
+    month = func.date_trunc(literal_column("'month'"), Order.start_moment)
+
+    query = select(
+        func.grouping(Order.status_id, Order.customer_id, month).label("grouping_id"),
+        Order.status_id,
+        Order.customer_id,
+        month.label("month"),
+        func.count().label("orders_count"),
+        _sum(Order.materials_cost).label("materials_cost"),
+        _sum(Order.materials_cost_fact).label("materials_cost_fact"),
+        _sum(Order.materials_cost, Order.materials_paid.isnot(True)).label("materials_unpaid"),
+        _sum(Order.products_cost).label("products_cost"),
+        _sum(Order.products_cost_fact).label("products_cost_fact"),
+        _sum(Order.products_cost, Order.products_paid.isnot(True)).label("products_unpaid"),
+        _sum(Order.work_cost).label("work_cost"),
+        _sum(Order.work_cost_fact).label("work_cost_fact"),
+        _sum(Order.work_cost, Order.work_paid.isnot(True)).label("work_unpaid"),
+        _sum(Order.debt).label("debt"),
+        _sum(Order.debt_fact).label("debt_fact"),
+        _sum(Order.debt, Order.debt_paid.isnot(True)).label("debt_unpaid"),
+    ).group_by(
+        func.grouping_sets(
+            tuple_(Order.status_id),
+            tuple_(Order.customer_id),
+            tuple_(month),
+            tuple_(),
+        )
+    )
+
+    if not show_ended:
+        query = query.where(~Order.status_id.in_(COMPLETED_ORDER_STATUSES))
+
+    return query
+
+
+def build_finance_response(rows) -> FinanceAnalyticsResponse:
+    """Раскладывает строки GROUPING SETS по разделам ответа"""
+    total = FinanceTotals()
+    by_status, by_customer, by_month = [], [], []
+
+    for row in rows:
+        values = row._mapping
+        totals = {field: values[field] for field in FinanceTotals.model_fields}
+        if row.grouping_id == GROUPING_BY_STATUS:
+            by_status.append(FinanceByStatus(status_id=row.status_id, **totals))
+        elif row.grouping_id == GROUPING_BY_CUSTOMER:
+            by_customer.append(FinanceByCustomer(customer_id=row.customer_id, **totals))
+        elif row.grouping_id == GROUPING_BY_MONTH:
+            by_month.append(FinanceByMonth(month=row.month, **totals))
+        elif row.grouping_id == GROUPING_TOTAL:
+            total = FinanceTotals(**totals)
+
+    by_status.sort(key=lambda item: item.status_id)
+    by_customer.sort(key=lambda item: item.customer_id)
+    by_month.sort(key=lambda item: (item.month is not None, item.month))
+
+    return FinanceAnalyticsResponse(
+        total=total,
+        by_status=by_status,
+        by_customer=by_customer,
+        by_month=by_month
+    )
+
+
+@router.get("/finance", response_model=FinanceAnalyticsResponse)
+async def get_finance_analytics(
+        show_ended: bool = Query(True, description="Include completed orders (status 5, 6, 7)"),
+        session: AsyncSession = Depends(get_async_db),
+        current_user: UserModel = Depends(get_current_auth_user)
+):
+    """
+    Грубая финансовая аналитика по заказам: плановые и фактические суммы
+    на материалы, товары, работы и задолженность, а также неоплаченные остатки.
+
+    Параметры:
+    - show_ended: учитывать завершённые заказы (статусы 5, 6, 7)
+
+    Возвращает: общий итог и итоги по статусам, по заказчикам и по месяцам начала заказа.
+    Результат кэшируется с ключом по глобальной версии заказов, поэтому изменение заказов
+    в любом воркере сразу даёт новый ключ.
+    """
+    key = (await read_version(session, ORDERS), show_ended)
+    cached = finance_cache.get(key)
+    if cached is not None:
+        return ModelResponse(cached)
+
+    logger.debug(f"User {current_user.username} requesting finance analytics, show_ended={show_ended}")
+    result = await session.execute(build_finance_query(show_ended=show_ended))
+    response = build_finance_response(result.all())
+
+    finance_cache.set(key, response)
+    return ModelResponse(response)
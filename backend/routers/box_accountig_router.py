@@ -19,6 +19,7 @@ from models import User as UserModel
 from loguru import logger
 
 from schemas import PaginatedBoxAccounting, BoxAccountingResponse, BoxAccountingCreate
+from utils.responses import ModelResponse
 
 router = APIRouter(
     prefix="/box-accounting",
@@ -101,7 +102,7 @@ async def read_box_accounting(
         logger.info(
             f"Successfully retrieved {len(boxes)} box accounting records (page {page} of {total_pages})"
         )
-        return response
+        return ModelResponse(response)
 
     except HTTPException:
         raise
@@ -0,0 +1,73 @@
+# routers/changes_router.py
+"""
+Тут функции - роутеры для ленты изменений (Server-Sent Events)
+"""
+import asyncio
+from typing import Optional
+
+import orjson
+from fastapi import APIRouter, Depends, Query, HTTPException
+from starlette.responses import StreamingResponse
+
+from auth.jwt_auth import get_current_auth_user
+from models import User as UserModel
+from utils.change_feed import change_bus
+
+router = APIRouter(
+    prefix="/changes",
+    tags=["changes"],
+)
+
+ENTITIES = {"order", "task", "comment"}
+# Комментарий-пинг, чтобы прокси не закрывали простаивающее соединение
+HEARTBEAT_SECONDS = 15
+
+
+@router.get("/stream")
+async def stream_changes(
+        entities: Optional[str] = Query(None, description="Entities to follow (comma-separated): order,task,comment"),
+        order_serial: Optional[str] = Query(None, description="Follow only changes of this order"),
+        current_user: UserModel = Depends(get_current_auth_user)
+):
+    """
+    Поток изменений заказов, задач и комментариев в формате Server-Sent Events.
+
+    Первым приходит событие ready: всё, что изменилось до него (в том числе пока клиент
+    был отключён), нужно перечитать обычными запросами. Дальше на каждое изменение
+    приходит событие change с JSON {"entity", "action", "id", "order_serial"},
+    по которому клиент обновляет только затронутые данные.
+
+    Параметры:
+    - entities: какие сущности присылать (по умолчанию все)
+    - order_serial: присылать только изменения этого заказа
+
+    Возвращает: text/event-stream
+    """
+    wanted = ENTITIES
+    if entities:
+        wanted = {entity.strip() for entity in entities.split(",") if entity.strip()}
+        unknown = wanted - ENTITIES
+        if unknown:
+            raise HTTPException(status_code=400, detail=f"Unknown entities: {sorted(unknown)}")
+
+    async def event_stream():
+        async with change_bus.subscribe() as queue:
+            yield "event: ready\ndata: {}\n\n"
+            while True:
+                try:
+                    change = await asyncio.wait_for(queue.get(), timeout=HEARTBEAT_SECONDS)
+                except asyncio.TimeoutError:
+                    yield ": keep-alive\n\n"
+                    continue
+                if change.get("entity") not in wanted:
+                    continue
+                if order_serial and change.get("order_serial") != order_serial:
+                    continue
+                yield f"event: change\ndata: {orjson.dumps(change).decode('utf-8')}\n\n"
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        # X-Accel-Buffering: nginx не должен копить поток в буфере
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
@@ -1,18 +1,28 @@
 # comments_router.py
 from datetime import datetime
-from typing import Optional
-from fastapi import APIRouter, HTTPException, Depends
+from typing import Optional, List, Tuple
+from fastapi import APIRouter, HTTPException, Depends, Query, Body
+from sqlalchemy import insert, tuple_
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
 from models import OrderComment, Order  # Импортируем Person и Order для проверки существования
-from models import User
+from models import User, Person
 from database import get_async_db
 from pydantic import BaseModel, ConfigDict
 from sqlalchemy.orm import joinedload
+from loguru import logger
 from schemas.person_schem import PersonSchema
+from utils.order_tracking import touch_orders, refresh_order_summaries
+from utils.data_versions import commit_and_bump
+from utils.change_feed import publish_change, publish_changes, make_event
+from utils.responses import ModelResponse
+from utils.cursor import encode_cursor, decode_cursor
 
 router = APIRouter()
 
+# Максимум комментариев в одном запросе /comments/bulk_create
+BULK_CREATE_LIMIT = 1000
+
 
 # --- Pydantic Schemas ---
 
@@ -36,14 +46,31 @@ class CommentResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
 
+# Страница ленты комментариев заказа
+class CommentPage(BaseModel):
+    items: List[CommentResponse]
+    next_cursor: Optional[str] = None  # None - это последняя страница
+
+
+# --- Курсор ленты комментариев ---
+
+def encode_comment_cursor(moment_of_creation: Optional[datetime], comment_id: int) -> str:
+    """Курсор - последний отданный комментарий (moment_of_creation, id)"""
+    return encode_cursor({"m": moment_of_creation.isoformat() if moment_of_creation else None, "id": comment_id})
+
+
+def decode_comment_cursor(cursor: str) -> Tuple[Optional[datetime], int]:
+    """Разобрать курсор; при неверном формате - HTTP 400"""
+    payload = decode_cursor(cursor)
+    try:
+        moment = datetime.fromisoformat(payload["m"]) if payload["m"] is not None else None
+        return moment, int(payload["id"])
+    except (KeyError, TypeError, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
 # --- API Endpoint ---
 
-@router.post(
-    '/comments/create',
-    response_model=CommentResponse,
-    summary="Создать новый комментарий к заказу",
-    tags=["comments"]
-)
 @router.post(
     '/comments/create',
     response_model=CommentResponse,
@@ -86,7 +113,11 @@ async def create_comment(
 
     try:
         session.add(new_comment)
-        await session.commit()
+        await session.flush()  # Нужен id комментария для ленты изменений
+        await touch_orders(session, [comment_data.order_id])  # Карточка заказа изменилась
+        await refresh_order_summaries(session, [comment_data.order_id])
+        await publish_change(session, "comment", "created", new_comment.id, comment_data.order_id)
+        await commit_and_bump(session)
         await session.refresh(new_comment,
                               attribute_names=["moment_of_creation"])  # Явно указываем атрибуты для обновления
     except Exception as e:
@@ -104,3 +135,168 @@ async def create_comment(
     )
 
     return comment_response
+
+
+@router.post(
+    '/comments/bulk_create',
+    response_model=List[CommentResponse],
+    summary="Создать несколько комментариев одним запросом",
+    tags=["comments"]
+)
+async def bulk_create_comments(
+        comments_data: List[CommentCreate] = Body(..., description="Comments to create"),
+        session: AsyncSession = Depends(get_async_db)
+):
+    """
+    Создаёт пачку комментариев за одну транзакцию.
+
+    Авторы и заказы проверяются двумя запросами на всю пачку, комментарии вставляются
+    одним INSERT ... RETURNING. Если хотя бы один автор или заказ не найден, не создаётся ничего.
+
+    Параметры:
+    - comments_data: список объектов {order_id, text, user_id}, не больше BULK_CREATE_LIMIT
+
+    Возвращает: созданные комментарии в порядке запроса
+    """
+    if not comments_data:
+        return []
+    if len(comments_data) > BULK_CREATE_LIMIT:
+        raise HTTPException(status_code=400, detail=f"No more than {BULK_CREATE_LIMIT} comments per request")
+
+    # Авторы: User -> Person одним запросом
+    user_ids = {comment.user_id for comment in comments_data}
+    people_result = await session.execute(
+        select(Person).where(Person.user_id.in_(user_ids))
+    )
+    people_by_user = {person.user_id: person for person in people_result.scalars()}
+    missing_users = user_ids - people_by_user.keys()
+    if missing_users:
+        raise HTTPException(status_code=404,
+                            detail=f"No associated Person for user IDs {sorted(missing_users)}")
+
+    # Заказы одним запросом
+    order_ids = {comment.order_id for comment in comments_data}
+    orders_result = await session.execute(select(Order.serial).where(Order.serial.in_(order_ids)))
+    missing_orders = order_ids - set(orders_result.scalars().all())
+    if missing_orders:
+        raise HTTPException(status_code=404, detail=f"Orders not found: {sorted(missing_orders)}")
+
+    try:
+        insert_result = await session.execute(
+            insert(OrderComment)
+            .returning(OrderComment.id, OrderComment.moment_of_creation, sort_by_parameter_order=True),
+            [
+                {
+                    "order_id": comment.order_id,
+                    "text": comment.text,
+                    "person_uuid": people_by_user[comment.user_id].uuid,
+                }
+                for comment in comments_data
+            ]
+        )
+        inserted = insert_result.all()
+        await touch_orders(session, order_ids)  # Карточки заказов изменились
+        await refresh_order_summaries(session, order_ids)
+        await publish_changes(session, [
+            make_event("comment", "created", row.id, comment.order_id)
+            for row, comment in zip(inserted, comments_data)
+        ])
+        await commit_and_bump(session)
+    except Exception as e:
+        await session.rollback()
+        logger.exception(f"Error creating {len(comments_data)} comments: {e}")
+        raise HTTPException(status_code=500, detail="Could not save comments to the database")
+
+    return ModelResponse([
+        CommentResponse(
+            id=row.id,
+            order_id=comment.order_id,
+            moment_of_creation=row.moment_of_creation,
+            text=comment.text,
+            person=PersonSchema.model_validate(people_by_user[comment.user_id])
+        )
+        for row, comment in zip(inserted, comments_data)
+    ])
+
+
+@router.get(
+    '/order/{serial}/comments',
+    response_model=CommentPage,
+    summary="Комментарии заказа постранично",
+    tags=["comments"]
+)
+async def read_order_comments(
+        serial: str,
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+        limit: int = Query(50, ge=1, le=200, description="Number of comments per page"),
+        session: AsyncSession = Depends(get_async_db)
+):
+    """
+    Лента комментариев заказа, новые сверху, с keyset-пагинацией по (moment_of_creation, id).
+
+    Каждая страница - один проход по индексу (order_id, moment_of_creation, id) от курсора,
+    без OFFSET, поэтому глубина страницы не влияет на скорость. Комментарии без даты
+    (встречаются в импортированных из КИС2) идут в конце ленты.
+
+    Параметры:
+    - serial: серийный номер заказа
+    - cursor: next_cursor из предыдущей страницы (для первой страницы не передаётся)
+    - limit: размер страницы
+
+    Возвращает: комментарии с авторами и курсор следующей страницы
+    """
+    moment_cursor, id_cursor = decode_comment_cursor(cursor) if cursor else (None, None)
+
+    base_query = (
+        select(OrderComment, Person)
+        .join(Person, Person.uuid == OrderComment.person_uuid)
+        .where(OrderComment.order_id == serial)
+    )
+    rows = []
+    # Сначала комментарии с датой (пока курсор не дошёл до комментариев без даты)
+    if cursor is None or moment_cursor is not None:
+        dated_query = base_query.where(OrderComment.moment_of_creation.is_not(None))
+        if moment_cursor is not None:
+            dated_query = dated_query.where(
+                tuple_(OrderComment.moment_of_creation, OrderComment.id) < tuple_(moment_cursor, id_cursor)
+            )
+        dated_result = await session.execute(
+            dated_query
+            .order_by(OrderComment.moment_of_creation.desc(), OrderComment.id.desc())
+            .limit(limit + 1)
+        )
+        rows = dated_result.all()
+    # Затем комментарии без даты, по убыванию id
+    if len(rows) <= limit:
+        undated_query = base_query.where(OrderComment.moment_of_creation.is_(None))
+        if cursor is not None and moment_cursor is None:
+            undated_query = undated_query.where(OrderComment.id < id_cursor)
+        undated_result = await session.execute(
+            undated_query.order_by(OrderComment.id.desc()).limit(limit + 1 - len(rows))
+        )
+        rows += undated_result.all()
+
+    if not rows and cursor is None:
+        # Пустая первая страница: отличаем заказ без комментариев от несуществующего
+        if await session.get(Order, serial) is None:
+            raise HTTPException(status_code=404, detail=f"Order with serial {serial} not found")
+
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        last_comment = page[-1][0]
+        next_cursor = encode_comment_cursor(last_comment.moment_of_creation, last_comment.id)
+
+    return ModelResponse(CommentPage(
+        items=[
+            CommentResponse(
+                id=comment.id,
+                order_id=comment.order_id,
+                moment_of_creation=comment.moment_of_creation,
+                text=comment.text,
+                person=PersonSchema.model_validate(person)
+            )
+            for comment, person in page
+        ],
+        next_cursor=next_cursor
+    ))
@@ -0,0 +1,290 @@
+# routers/equipment_router.py
+"""
+Тут функции - роутеры для каталога оборудования
+"""
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, HTTPException
+from sqlalchemy import select, func, tuple_, or_, and_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import selectin_polymorphic, with_polymorphic
+from loguru import logger
+
+from auth.jwt_auth import get_current_auth_user
+from database import get_async_db
+from models import Equipment, EquipmentType, Manufacturer, Currency, ControlCabinet
+from models import User as UserModel
+from schemas.equipment_schem import EquipmentSearchResponse, EquipmentSearchItem, EquipmentFacets, FacetBucket, \
+    EquipmentRead, EquipmentPage, EquipmentDetails, EQUIPMENT_READ_SCHEMAS
+from utils.cursor import encode_cursor, decode_cursor
+from utils.responses import ModelResponse
+
+router = APIRouter(
+    prefix="/equipment",
+    tags=["equipment"],
+)
+
+# Колонки текстового поиска, для каждой есть триграммный индекс по lower(...)
+SEARCH_COLUMNS = (Equipment.name, Equipment.model, Equipment.vendor_code)
+
+# Значения func.grouping(type_id, manufacturer_id) для каждого набора группировки фасетов
+GROUPING_BY_TYPE = 0b01
+GROUPING_BY_MANUFACTURER = 0b10
+GROUPING_TOTAL = 0b11
+
+# Подклассы Equipment с собственной таблицей (joined table inheritance)
+EQUIPMENT_SUBCLASSES = (ControlCabinet,)
+
+
+def escape_like(value: str) -> str:
+    """Экранировать спецсимволы LIKE (escape-символ - обратная косая черта)"""
+    return value.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+
+
+def build_text_filter(q: str, match: str):
+    """Поиск подстроки (contains) или префикса (prefix) без учёта регистра в имени, модели и артикуле"""
+    escaped = escape_like(q.lower())
+    pattern = f"{escaped}%" if match == "prefix" else f"%{escaped}%"
+    return or_(*(func.lower(column).like(pattern, escape="\\") for column in SEARCH_COLUMNS))
+
+
+def _count(where=None):
+    """COUNT(*) [FILTER (WHERE ...)]"""
+    return func.count().filter(where) if where is not None else func.count()
+
+
+def build_facets_query(common_filters: list, type_filter, manufacturer_filter):
+    """
+    Фасеты по типам и производителям и общее количество одним запросом (GROUPING SETS).
+    Каждый фасет считается с фильтром другого фасета, но без своего (FILTER в агрегате).
+    """
+    facet_filters = [where for where in (type_filter, manufacturer_filter) if where is not None]
+    return (
+        select(
+            func.grouping(Equipment.type_id, Equipment.manufacturer_id).label("grouping_id"),
+            Equipment.type_id,
+            EquipmentType.name.label("type_name"),
+            Equipment.manufacturer_id,
+            Manufacturer.name.label("manufacturer_name"),
+            _count(manufacturer_filter).label("type_count"),
+            _count(type_filter).label("manufacturer_count"),
+            _count(and_(*facet_filters) if facet_filters else None).label("total"),
+        )
+        .outerjoin(EquipmentType, EquipmentType.id == Equipment.type_id)
+        .outerjoin(Manufacturer, Manufacturer.id == Equipment.manufacturer_id)
+        .where(*common_filters)
+        .group_by(
+            func.grouping_sets(
+                tuple_(Equipment.type_id, EquipmentType.name),
+                tuple_(Equipment.manufacturer_id, Manufacturer.name),
+                tuple_(),
+            )
+        )
+    )
+
+
+def select_equipment_polymorphic():
+    """
+    select(Equipment), который сразу загружает колонки подклассов.
+
+    Без этого объект ControlCabinet из запроса к Equipment догружает таблицу control_cabinets
+    отдельным запросом на каждую строку. selectin_polymorphic после основного запроса делает
+    по одному запросу WHERE id IN (...) на каждый подкласс, встретившийся на странице.
+    """
+    return select(Equipment).options(selectin_polymorphic(Equipment, EQUIPMENT_SUBCLASSES))
+
+
+def to_equipment_read(item: Equipment) -> EquipmentRead:
+    """Схема по фактическому типу оборудования (колонки подкласса должны быть загружены)"""
+    return EQUIPMENT_READ_SCHEMAS[item.discriminator].model_validate(item)
+
+
+def build_facets_response(rows):
+    """Раскладывает строки GROUPING SETS по фасетам; возвращает (total, facets)"""
+    total = 0
+    types, manufacturers = [], []
+    for row in rows:
+        if row.grouping_id == GROUPING_BY_TYPE and row.type_count:
+            types.append(FacetBucket(id=row.type_id, name=row.type_name, count=row.type_count))
+        elif row.grouping_id == GROUPING_BY_MANUFACTURER and row.manufacturer_count:
+            manufacturers.append(FacetBucket(id=row.manufacturer_id, name=row.manufacturer_name,
+                                             count=row.manufacturer_count))
+        elif row.grouping_id == GROUPING_TOTAL:
+            total = row.total
+    # Сначала самые частые значения
+    types.sort(key=lambda bucket: (-bucket.count, bucket.name or ""))
+    manufacturers.sort(key=lambda bucket: (-bucket.count, bucket.name or ""))
+    return total, EquipmentFacets(types=types, manufacturers=manufacturers)
+
+
+@router.get("/search", response_model=EquipmentSearchResponse)
+async def search_equipment(
+        q: Optional[str] = Query(None, min_length=1, max_length=64,
+                                 description="Text to search in name, model and vendor code"),
+        match: str = Query("contains", pattern="^(contains|prefix)$", description="'contains' or 'prefix'"),
+        type_id: Optional[List[int]] = Query(None, description="Equipment type IDs (repeat the parameter)"),
+        manufacturer_id: Optional[List[int]] = Query(None, description="Manufacturer IDs (repeat the parameter)"),
+        price_min: Optional[int] = Query(None, ge=0, description="Minimum price"),
+        price_max: Optional[int] = Query(None, ge=0, description="Maximum price"),
+        only_relevant: bool = Query(False, description="Only equipment marked as relevant"),
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+        limit: int = Query(50, ge=1, le=200, description="Number of items per page"),
+        session: AsyncSession = Depends(get_async_db),
+        current_user: UserModel = Depends(get_current_auth_user)
+):
+    """
+    Поиск по каталогу оборудования (включая шкафы автоматики) с фильтрами и фасетами.
+
+    Сортировка по имени, keyset-пагинация по (name, id): каждая страница - проход по индексу
+    от курсора без OFFSET. Текстовый поиск использует триграммные индексы.
+    На первой странице (без cursor) дополнительно возвращаются общее количество
+    и фасеты по типам и производителям - одним сгруппированным запросом.
+
+    Параметры:
+    - q, match: текст и режим поиска (подстрока или префикс) в имени, модели и артикуле
+    - type_id, manufacturer_id: фильтры по типам и производителям (несколько значений - ИЛИ)
+    - price_min, price_max: диапазон цены
+    - only_relevant: только актуальные позиции
+    - cursor, limit: курсор и размер страницы
+
+    Возвращает: страницу оборудования, курсор следующей страницы, на первой странице - total и facets
+    """
+    if price_min is not None and price_max is not None and price_min > price_max:
+        raise HTTPException(status_code=400, detail="price_min must not be greater than price_max")
+
+    common_filters = []
+    if q:
+        common_filters.append(build_text_filter(q, match))
+    if price_min is not None:
+        common_filters.append(Equipment.price >= price_min)
+    if price_max is not None:
+        common_filters.append(Equipment.price <= price_max)
+    if only_relevant:
+        common_filters.append(Equipment.relevance.is_(True))
+    type_filter = Equipment.type_id.in_(type_id) if type_id else None
+    manufacturer_filter = Equipment.manufacturer_id.in_(manufacturer_id) if manufacturer_id else None
+
+    query = (
+        select(
+            Equipment.id,
+            Equipment.name,
+            Equipment.model,
+            Equipment.vendor_code,
+            Equipment.description,
+            Equipment.type_id,
+            EquipmentType.name.label("type_name"),
+            Equipment.manufacturer_id,
+            Manufacturer.name.label("manufacturer_name"),
+            Equipment.price,
+            Equipment.currency_id,
+            Currency.name.label("currency_name"),
+            Equipment.relevance,
+            Equipment.price_date,
+            Equipment.discriminator,
+        )
+        .outerjoin(EquipmentType, EquipmentType.id == Equipment.type_id)
+        .outerjoin(Manufacturer, Manufacturer.id == Equipment.manufacturer_id)
+        .outerjoin(Currency, Currency.id == Equipment.currency_id)
+        .where(*common_filters, *[where for where in (type_filter, manufacturer_filter) if where is not None])
+    )
+    if cursor:
+        values = decode_cursor(cursor)
+        if not isinstance(values.get("name"), str) or not isinstance(values.get("id"), int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(Equipment.name, Equipment.id) > tuple_(values["name"], values["id"]))
+    query = query.order_by(Equipment.name, Equipment.id).limit(limit + 1)
+
+    result = await session.execute(query)
+    rows = result.mappings().all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor({"name": page[-1]["name"], "id": page[-1]["id"]})
+
+    total, facets = None, None
+    if cursor is None:
+        facets_result = await session.execute(build_facets_query(common_filters, type_filter, manufacturer_filter))
+        total, facets = build_facets_response(facets_result.all())
+
+    logger.debug(f"User {current_user.username} searched equipment q={q!r}: {len(page)} items, total={total}")
+    return ModelResponse(EquipmentSearchResponse(
+        items=[EquipmentSearchItem.model_validate(dict(row)) for row in page],
+        next_cursor=next_cursor,
+        total=total,
+        facets=facets,
+    ))
+
+
+@router.get("/items", response_model=EquipmentPage)
+async def list_equipment(
+        ids: Optional[List[int]] = Query(None, max_length=200, description="Equipment IDs (repeat the parameter)"),
+        discriminator: Optional[str] = Query(None, description="Only this kind: equipment, control_cabinet"),
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+        limit: int = Query(50, ge=1, le=200, description="Number of items per page"),
+        session: AsyncSession = Depends(get_async_db),
+        current_user: UserModel = Depends(get_current_auth_user)
+):
+    """
+    Страница оборудования со всеми колонками подклассов (для шкафов - материал, IP, габариты).
+
+    Основной запрос читает только таблицу equipment, колонки подклассов догружаются
+    одним запросом на подкласс для всей страницы (selectin_polymorphic), без запросов на строку.
+    Сортировка по имени, keyset-пагинация по (name, id), как в /equipment/search.
+
+    Параметры:
+    - ids: вернуть только эти позиции (например, найденные через /equipment/search)
+    - discriminator: только оборудование этого вида
+    - cursor, limit: курсор и размер страницы
+
+    Возвращает: страницу оборудования (поле discriminator определяет набор полей) и курсор следующей страницы
+    """
+    if discriminator is not None and discriminator not in EQUIPMENT_READ_SCHEMAS:
+        raise HTTPException(status_code=400, detail=f"Unknown discriminator: {discriminator}")
+
+    query = select_equipment_polymorphic()
+    if ids:
+        query = query.where(Equipment.id.in_(ids))
+    if discriminator is not None:
+        query = query.where(Equipment.discriminator == discriminator)
+    if cursor:
+        values = decode_cursor(cursor)
+        if not isinstance(values.get("name"), str) or not isinstance(values.get("id"), int):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(Equipment.name, Equipment.id) > tuple_(values["name"], values["id"]))
+    query = query.order_by(Equipment.name, Equipment.id).limit(limit + 1)
+
+    result = await session.execute(query)
+    items = result.scalars().all()
+    page = items[:limit]
+    next_cursor = None
+    if len(items) > limit:
+        next_cursor = encode_cursor({"name": page[-1].name, "id": page[-1].id})
+
+    logger.debug(f"User {current_user.username} listed equipment: {len(page)} items")
+    return ModelResponse(EquipmentPage(items=[to_equipment_read(item) for item in page], next_cursor=next_cursor))
+
+
+@router.get("/{equipment_id}", response_model=EquipmentDetails)
+async def get_equipment(
+        equipment_id: int,
+        session: AsyncSession = Depends(get_async_db),
+        current_user: UserModel = Depends(get_current_auth_user)
+):
+    """
+    Одна позиция оборудования со всеми колонками подкласса.
+
+    Для одной строки дешевле один запрос с LEFT OUTER JOIN таблиц подклассов (with_polymorphic),
+    чем отдельный догружающий запрос.
+
+    Параметры:
+    - equipment_id: ID оборудования
+
+    Возвращает: оборудование (поле discriminator определяет набор полей)
+    """
+    equipment = with_polymorphic(Equipment, EQUIPMENT_SUBCLASSES)
+    result = await session.execute(select(equipment).where(equipment.id == equipment_id))
+    item = result.scalars().one_or_none()
+    if item is None:
+        raise HTTPException(status_code=404, detail=f"Equipment with id {equipment_id} not found")
+    logger.debug(f"User {current_user.username} requested equipment {equipment_id}")
+    return ModelResponse(to_equipment_read(item))
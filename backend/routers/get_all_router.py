@@ -13,6 +13,7 @@ from loguru import logger
 from database import get_async_db
 from models import User as UserModel
 from auth.jwt_auth import get_current_auth_user
+from utils.responses import ORJSONResponse
 
 # Создаем роутер
 router = APIRouter(
@@ -40,19 +41,14 @@ async def _fetch_list(
     logger.debug(f"User {current_user.username} requesting all {list_name}")
 
     try:
-        # Выполняем запрос для получения всех записей
-        query = select(model)
+        # Выбираем только нужные колонки: строки сразу превращаются в словари,
+        # без создания ORM-объектов и identity map
+        query = select(*(getattr(model, field) for field in fields))
         result = await db.execute(query)
-        items = result.scalars().all()
-
-        # Преобразуем результат в список словарей
-        items_list = [
-            {field: getattr(item, field) for field in fields}
-            for item in items
-        ]
+        items_list = [dict(row) for row in result.mappings()]
 
         logger.info(f"Successfully retrieved {len(items_list)} {list_name} for user {current_user.username}")
-        return {list_name: items_list}
+        return ORJSONResponse({list_name: items_list})
 
     except Exception as e:
         logger.error(f"Error fetching {list_name}: {str(e)}")
@@ -190,28 +186,20 @@ async def get_all_counterparties(
 
         logger.debug(f"User {current_user.username} requesting all counterparties")
 
-        # Выполняем запрос для получения всех контрагентов
-        query = select(Counterparty)
+        # Выполняем запрос только по нужным колонкам
+        query = select(
+            Counterparty.id,
+            Counterparty.name,
+            Counterparty.note,
+            Counterparty.city_id,
+            Counterparty.form_id
+        )
         result = await db.execute(query)
-
-        # Получаем все записи
-        counterparties = result.scalars().all()
-
-        # Преобразуем результат в список словарей
-        counterparties_list = [
-            {
-                "id": counterparty.id,
-                "name": counterparty.name,
-                "note": counterparty.note,
-                "city_id": counterparty.city_id,
-                "form_id": counterparty.form_id
-            }
-            for counterparty in counterparties
-        ]
+        counterparties_list = [dict(row) for row in result.mappings()]
 
         logger.info(
             f"Successfully retrieved {len(counterparties_list)} counterparties for user {current_user.username}")
-        return {"counterparties_list": counterparties_list}
+        return ORJSONResponse({"counterparties_list": counterparties_list})
 
     except HTTPException:
         raise
@@ -243,32 +231,24 @@ async def get_all_people(
 
         logger.debug(f"User {current_user.username} requesting all people")
 
-        # Выполняем запрос для получения всех людей
-        query = select(Person)
+        # Выполняем запрос только по нужным колонкам
+        query = select(
+            Person.uuid,
+            Person.name,
+            Person.patronymic,
+            Person.surname,
+            Person.phone,
+            Person.email,
+            Person.counterparty_id,
+            Person.birth_date,
+            Person.active,
+            Person.note,
+        )
         result = await db.execute(query)
-
-        # Получаем все записи
-        people = result.scalars().all()
-
-        # Преобразуем результат в список словарей
-        people_list = [
-            {
-                "uuid": person.uuid,
-                "name": person.name,
-                "patronymic": person.patronymic,
-                "surname": person.surname,
-                "phone": person.phone,
-                "email": person.email,
-                "counterparty_id": person.counterparty_id,
-                "birth_date": person.birth_date,
-                "active": person.active,
-                "note": person.note,
-            }
-            for person in people
-        ]
+        people_list = [dict(row) for row in result.mappings()]
 
         logger.info(f"Successfully retrieved {len(people_list)} people for user {current_user.username}")
-        return {"people_list": people_list}
+        return ORJSONResponse({"people_list": people_list})
 
     except HTTPException:
         raise
@@ -336,34 +316,29 @@ async def get_all_orders(
 
         logger.debug(f"User {current_user.username} requesting all orders")
 
-        query = select(Order)
+        query = select(
+            Order.serial,
+            Order.name,
+            Order.customer_id,
+            Order.priority,
+            Order.status_id,
+            Order.start_moment,
+            Order.deadline_moment,
+            Order.end_moment,
+            Order.materials_cost,
+            Order.materials_paid,
+            Order.products_cost,
+            Order.products_paid,
+            Order.work_cost,
+            Order.work_paid,
+            Order.debt,
+            Order.debt_paid
+        )
         result = await db.execute(query)
-        orders = result.scalars().all()
-
-        orders_list = [
-            {
-                "serial": order.serial,
-                "name": order.name,
-                "customer_id": order.customer_id,
-                "priority": order.priority,
-                "status_id": order.status_id,
-                "start_moment": order.start_moment,
-                "deadline_moment": order.deadline_moment,
-                "end_moment": order.end_moment,
-                "materials_cost": order.materials_cost,
-                "materials_paid": order.materials_paid,
-                "products_cost": order.products_cost,
-                "products_paid": order.products_paid,
-                "work_cost": order.work_cost,
-                "work_paid": order.work_paid,
-                "debt": order.debt,
-                "debt_paid": order.debt_paid
-            }
-            for order in orders
-        ]
+        orders_list = [dict(row) for row in result.mappings()]
 
         logger.info(f"Successfully retrieved {len(orders_list)} orders for user {current_user.username}")
-        return {"orders": orders_list}
+        return ORJSONResponse({"orders": orders_list})
 
     except HTTPException:
         raise
@@ -420,9 +395,14 @@ async def get_all_order_comments(
 
         logger.debug(f"User {current_user.username} requesting all order comments")
 
-        query = select(OrderComment)
+        query = select(
+            OrderComment.id,
+            OrderComment.order_id,
+            OrderComment.moment_of_creation,
+            OrderComment.text,
+            OrderComment.person_uuid
+        )
         result = await db.execute(query)
-        comments = result.scalars().all()
 
         comments_list = [
             {
@@ -432,11 +412,11 @@ async def get_all_order_comments(
                 "text": comment.text,
                 "person_uuid": comment.person_uuid
             }
-            for comment in comments
+            for comment in result
         ]
 
         logger.info(f"Successfully retrieved {len(comments_list)} order comments for user {current_user.username}")
-        return {"order_comments": comments_list}
+        return ORJSONResponse({"order_comments": comments_list})
 
     except HTTPException:
         raise
@@ -500,7 +480,7 @@ async def get_all_control_cabinets(
         ]
 
         logger.info(f"Successfully retrieved {len(cabinets_list)} control cabinets for user {current_user.username}")
-        return {"control_cabinets": cabinets_list}
+        return ORJSONResponse({"control_cabinets": cabinets_list})
 
     except HTTPException:
         raise
@@ -532,14 +512,28 @@ async def get_all_tasks(
 
         logger.debug(f"User {current_user.username} requesting all tasks")
 
-        # Выполняем запрос для получения всех задач
-        query = select(Task).order_by(Task.id.desc())
+        # Выполняем запрос для получения всех задач, только нужные колонки
+        query = select(
+            Task.id,
+            Task.name,
+            Task.description,
+            Task.status_id,
+            Task.payment_status_id,
+            Task.executor_uuid,
+            Task.planned_duration,
+            Task.actual_duration,
+            Task.creation_moment,
+            Task.start_moment,
+            Task.deadline_moment,
+            Task.end_moment,
+            Task.price,
+            Task.order_serial,
+            Task.parent_task_id,
+            Task.root_task_id
+        ).order_by(Task.id.desc())
         result = await db.execute(query)
 
-        # Получаем все записи
-        tasks = result.scalars().all()
-
-        # Преобразуем результат в список словарей
+        # Преобразуем строки в список словарей
         tasks_list = [
             {
                 "id": task.id,
@@ -559,11 +553,11 @@ async def get_all_tasks(
                 "parent_task_id": task.parent_task_id,
                 "root_task_id": task.root_task_id
             }
-            for task in tasks
+            for task in result
         ]
 
         logger.info(f"Successfully retrieved {len(tasks_list)} tasks for user {current_user.username}")
-        return {"tasks": tasks_list}
+        return ORJSONResponse({"tasks": tasks_list})
 
     except HTTPException:
         raise
@@ -595,14 +589,18 @@ async def get_all_timings(
 
         logger.debug(f"User {current_user.username} requesting all timings")
 
-        # Выполняем запрос для получения всех тайминговых записей
-        query = select(Timing)
+        # Выполняем запрос для получения всех тайминговых записей, только нужные колонки
+        query = select(
+            Timing.id,
+            Timing.order_serial,
+            Timing.task_id,
+            Timing.executor_id,
+            Timing.time,
+            Timing.timing_date
+        )
         result = await db.execute(query)
 
-        # Получаем все записи
-        timings = result.scalars().all()
-
-        # Преобразуем результат в список словарей
+        # Преобразуем строки в список словарей
         timings_list = [
             {
                 "id": timing.id,
@@ -612,11 +610,11 @@ async def get_all_timings(
                 "time": str(timing.time) if timing.time else None,  # Преобразуем timedelta в строку
                 "timing_date": timing.timing_date.isoformat() if timing.timing_date else None
             }
-            for timing in timings
+            for timing in result
         ]
 
         logger.info(f"Successfully retrieved {len(timings_list)} timings for user {current_user.username}")
-        return {"timings": timings_list}
+        return ORJSONResponse({"timings": timings_list})
 
     except HTTPException:
         raise
@@ -3,11 +3,14 @@
 Тут функции - роутеры для импорта данных
 """
 from fastapi import APIRouter, HTTPException
-from typing import Callable
+from typing import Callable, Dict, Any
+import importlib
 import logging
 
-# Импортируем функцию для импорта стран
-from utils.import_data import *
+from utils.data_versions import EQUIPMENT, commit_and_bump_sync, mark_changed
+from utils.metrics import import_jobs
+from utils.order_tracking import touch_orders_sync, refresh_order_summaries_sync
+from database import SyncSession
 
 # Создаем логгер
 logger = logging.getLogger(__name__)
@@ -24,26 +27,46 @@ router = APIRouter(
 Универсальный роутер для импорта данных
 """
 
-# **Словарь с СИНХРОННЫМИ функциями импорта**
-IMPORT_FUNCTIONS: Dict[str, Callable[[], Dict[str, Any]]] = {
-    "countries": import_countries_from_kis2,
-    "cities": import_cities_from_kis2,
-    "currencies": import_currency_from_kis2,
-    "manufacturers": import_manufacturers_from_kis2,
-    "equipment_types": import_equipment_types_from_kis2,
-    "counterparty_forms": import_counterparty_forms_from_kis2,
-    "companies": import_companies_from_kis2,
-    "people": import_people_from_kis2,
-    "works": import_works_from_kis2,
-    "order_statuses": ensure_order_statuses_exist,
-    "orders": import_orders_from_kis2,
-    "order_comments": import_order_comments_from_kis2,
-    "boxes": import_boxes_from_kis2,
-    "box_accounting": import_box_accounting_from_kis2,
-    "tasks": import_tasks_from_kis2,
-    "timings": import_timings_from_kis2
+# **Словарь с именами СИНХРОННЫХ функций импорта из utils.import_data**
+IMPORT_FUNCTIONS: Dict[str, str] = {
+    "countries": "import_countries_from_kis2",
+    "cities": "import_cities_from_kis2",
+    "currencies": "import_currency_from_kis2",
+    "manufacturers": "import_manufacturers_from_kis2",
+    "equipment_types": "import_equipment_types_from_kis2",
+    "counterparty_forms": "import_counterparty_forms_from_kis2",
+    "companies": "import_companies_from_kis2",
+    "people": "import_people_from_kis2",
+    "works": "import_works_from_kis2",
+    "order_statuses": "ensure_order_statuses_exist",
+    "orders": "import_orders_from_kis2",
+    "order_comments": "import_order_comments_from_kis2",
+    "boxes": "import_boxes_from_kis2",
+    "box_accounting": "import_box_accounting_from_kis2",
+    "tasks": "import_tasks_from_kis2",
+    "timings": "import_timings_from_kis2",
 }
 
+# Сущности, которые видны в карточке заказа: после их импорта версии заказов устаревают
+ORDER_CONTENT_ENTITIES = {"orders", "order_comments", "tasks", "timings"}
+# Справочники, названия из которых выводятся в списке и карточке заказа (заказчик и его форма
+# собственности, исполнители и авторы комментариев, работы): сводка не меняется, но ETag устаревают
+ORDER_DISPLAY_ENTITIES = {"counterparty_forms", "companies", "people", "works"}
+
+# Сущности, которые видны в прайс-листе и КП (цена, валюта, название, тип, производитель):
+# после их импорта устаревают кэши utils.pricing и utils.offers во всех воркерах
+EQUIPMENT_ENTITIES = {"currencies", "manufacturers", "equipment_types", "boxes"}
+
+
+def get_import_function(entity: str) -> Callable[[], Dict[str, Any]]:
+    """
+    Функция импорта по имени сущности.
+    utils.import_data тянет kis2.DjangoRestAPI и requests, поэтому загружается при первом импорте,
+    а не при старте приложения.
+    """
+    import_data_module = importlib.import_module("utils.import_data")
+    return getattr(import_data_module, IMPORT_FUNCTIONS[entity])
+
 
 @router.post("/{entity}", response_model=Dict[str, Any])
 def import_data(entity: str):
@@ -59,8 +82,25 @@ def import_data(entity: str):
 
     try:
         # Вызываем нужную функцию импорта по имени
-        import_function = IMPORT_FUNCTIONS[entity]
-        result = import_function()
+        import_function = get_import_function(entity)
+        # Ход и итог импорта видны в /metrics
+        with import_jobs.track(entity) as job:
+            result = import_function()
+            job.finish(result)
+        if entity in ORDER_CONTENT_ENTITIES:
+            # Импорт не знает, какие заказы затронул, поэтому сбрасываем ETag и пересчитываем сводку у всех
+            with SyncSession() as session:
+                touch_orders_sync(session)
+                refresh_order_summaries_sync(session)
+                commit_and_bump_sync(session)
+        if entity in ORDER_DISPLAY_ENTITIES:
+            with SyncSession() as session:
+                touch_orders_sync(session)
+                commit_and_bump_sync(session)
+        if entity in EQUIPMENT_ENTITIES:
+            with SyncSession() as session:
+                mark_changed(session, EQUIPMENT)
+                commit_and_bump_sync(session)
         return result
 
     except Exception as e:
@@ -0,0 +1,94 @@
+# routers/metrics_router.py
+"""
+Тут функции - роутеры для метрик приложения в текстовом формате Prometheus
+"""
+import secrets
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, HTTPException, status
+from starlette.responses import PlainTextResponse
+
+from config import settings
+from database import get_async_engine
+from utils.cache import CACHES
+from utils.change_feed import change_bus
+from utils.metrics import render_prometheus
+
+router = APIRouter(
+    tags=["metrics"],
+)
+
+PROMETHEUS_CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def require_metrics_token(authorization: Optional[str] = Header(None)) -> None:
+    """
+    Проверяет токен settings.metrics_token из заголовка Authorization: Bearer <токен>.
+    Без настроенного токена метрики недоступны (404), с неверным токеном - 401
+    """
+    if not settings.metrics_token:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Not Found")
+    scheme, _, token = (authorization or "").partition(" ")
+    if scheme.lower() != "bearer" or not secrets.compare_digest(token.strip().encode(),
+                                                                 settings.metrics_token.encode()):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Not authenticated",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+def collect_db_pool_metrics() -> list:
+    """Состояние пула соединений асинхронного движка в момент запроса"""
+    pool = get_async_engine().pool
+    metrics = []
+    for name, description, getter in (
+            ("db_pool_size", "Размер пула соединений", "size"),
+            ("db_pool_checked_out", "Соединений выдано из пула", "checkedout"),
+            ("db_pool_checked_in", "Свободных соединений в пуле", "checkedin"),
+            ("db_pool_overflow", "Соединений сверх размера пула", "overflow"),
+    ):
+        # У NullPool и подобных пулов этих методов нет
+        if hasattr(pool, getter):
+            metrics.append((name, description, "gauge", [({}, getattr(pool, getter)())]))
+    return metrics
+
+
+def collect_cache_metrics() -> list:
+    """Попадания, промахи и доля попаданий для всех кэшей utils.cache"""
+    hits, misses, ratio, items = [], [], [], []
+    for cache in CACHES:
+        labels = {"cache": cache.name}
+        total = cache.hits + cache.misses
+        hits.append((labels, cache.hits))
+        misses.append((labels, cache.misses))
+        ratio.append((labels, cache.hits / total if total else 0.0))
+        items.append((labels, len(cache)))
+    return [
+        ("cache_hits_total", "Попаданий в кэш", "counter", hits),
+        ("cache_misses_total", "Промахов кэша", "counter", misses),
+        ("cache_hit_ratio", "Доля попаданий в кэш", "gauge", ratio),
+        ("cache_items", "Записей в кэше", "gauge", items),
+    ]
+
+
+def collect_change_feed_metrics() -> list:
+    """Подписчики ленты изменений и недоставленные им события"""
+    return [
+        ("change_feed_subscribers", "Открытых подписок на /changes/stream", "gauge", [({}, change_bus.subscribers)]),
+        ("change_feed_dropped_total", "Событий не доставлено из-за переполненной очереди подписчика", "counter",
+         [({}, change_bus.dropped)]),
+    ]
+
+
+@router.get("/metrics", response_class=PlainTextResponse, dependencies=[Depends(require_metrics_token)])
+async def get_metrics():
+    """
+    Метрики приложения для Prometheus (без внешних сервисов, всё считается в процессе).
+    Доступны только с токеном settings.metrics_token (см. require_metrics_token).
+
+    Возвращает: количество и длительность запросов по маршрутам, число SQL-запросов на маршрут,
+    состояние пула соединений, статистику кэшей, ленту изменений, ход заданий импорта и задержку цикла событий.
+    """
+    body = render_prometheus(collect_db_pool_metrics() + collect_cache_metrics() + collect_change_feed_metrics())
+    return PlainTextResponse(body, media_type=PROMETHEUS_CONTENT_TYPE)
@@ -0,0 +1,127 @@
+# routers/offers_router.py
+"""
+Тут функции - роутеры для расчёта коммерческих предложений
+"""
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Optional, Tuple
+
+import orjson
+from fastapi import APIRouter, Depends
+from sqlalchemy.ext.asyncio import AsyncSession
+from loguru import logger
+
+from auth.jwt_auth import get_current_auth_user
+from config import settings
+from database import get_async_db
+from models import User as UserModel
+from schemas.offer_schem import OfferRequest, OfferResponse
+from utils.offers import offer_cache, normalize_items, offer_hash, build_offer_query
+from utils.pricing import CENT, price_version
+from utils.responses import ModelResponse
+
+router = APIRouter(
+    prefix="/offers",
+    tags=["offers"],
+)
+
+
+def _optional_float(value: Optional[Decimal]) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def build_offer_response(key: str, as_of: date, quantities: Dict[int, Decimal], rows) -> dict:
+    """
+    Строки, группы по типу и производителю и итог из строк build_offer_query.
+    Собирается словарями в форме OfferResponse: на 500 строк создание моделей Pydantic
+    заметно дольше самого расчёта.
+    """
+    lines = []
+    groups: Dict[Tuple[Optional[int], Optional[int]], dict] = {}
+    total = Decimal(0)
+    unpriced = []
+    found = set()
+    for row in sorted(rows, key=lambda r: (r.type_name or "", r.manufacturer_name or "", r.name, r.id)):
+        found.add(row.id)
+        quantity = quantities[row.id]
+        base_total = None
+        if row.base_price is None:
+            unpriced.append(row.id)
+        else:
+            base_total = (row.base_price * quantity).quantize(CENT)
+            total += base_total
+
+        group = groups.setdefault((row.type_id, row.manufacturer_id), {
+            "type_id": row.type_id, "type_name": row.type_name,
+            "manufacturer_id": row.manufacturer_id, "manufacturer_name": row.manufacturer_name,
+            "lines": 0, "quantity": Decimal(0), "base_total": Decimal(0),
+        })
+        group["lines"] += 1
+        group["quantity"] += quantity
+        group["base_total"] += base_total or 0
+
+        cabinet = None
+        if row.height is not None:
+            cabinet = {"material": row.material, "ip": row.ip, "height": row.height, "width": row.width,
+                       "depth": row.depth}
+        lines.append({
+            "equipment_id": row.id, "name": row.name, "model": row.model, "vendor_code": row.vendor_code,
+            "type_id": row.type_id, "type_name": row.type_name,
+            "manufacturer_id": row.manufacturer_id, "manufacturer_name": row.manufacturer_name,
+            "quantity": float(quantity), "price": row.price, "currency": row.currency,
+            "rate": _optional_float(row.rate), "rate_date": row.rate_date,
+            "base_price": _optional_float(row.base_price), "base_total": _optional_float(base_total),
+            "cabinet": cabinet,
+        })
+
+    for group in groups.values():
+        group["quantity"] = float(group["quantity"])
+        group["base_total"] = float(group["base_total"])
+    return {
+        "offer_hash": key,
+        "as_of": as_of,
+        "base_currency": settings.base_currency,
+        "lines": lines,
+        # Самые дорогие группы первыми
+        "groups": sorted(groups.values(), key=lambda group: -group["base_total"]),
+        "total": float(total),
+        "unpriced": unpriced,
+        "unknown": [equipment_id for equipment_id in quantities if equipment_id not in found],
+    }
+
+
+@router.post("/compute", response_model=OfferResponse)
+async def compute_offer(
+        offer: OfferRequest,
+        session: AsyncSession = Depends(get_async_db),
+        current_user: UserModel = Depends(get_current_auth_user)
+):
+    """
+    Расчёт коммерческого предложения: цены позиций в базовой валюте, итоги по типам
+    и производителям, общий итог. Для корпусов шкафов - материал, IP и габариты.
+
+    Все позиции читаются одним запросом IN (...) с пересчётом по курсу на дату.
+    Ответ кэшируется по sha256 от состава (повторы позиций складываются, порядок не важен),
+    даты и версии цен (курсы и каталог оборудования): повторный расчёт той же спецификации -
+    один лёгкий запрос версии цен и готовые байты ответа. Заголовок X-Cache: hit или miss.
+
+    Параметры:
+    - offer: позиции оборудования с количеством и дата курсов
+
+    Возвращает: строки, группы, итог, позиции без цены или курса и отсутствующие в каталоге ID
+    """
+    as_of = offer.as_of or date.today()
+    quantities = normalize_items((item.equipment_id, item.quantity) for item in offer.items)
+    key = offer_hash(quantities, as_of, await price_version(session))
+
+    body = offer_cache.get(key)
+    cache_status = "hit"
+    if body is None:
+        cache_status = "miss"
+        result = await session.execute(build_offer_query(list(quantities), as_of))
+        body = orjson.dumps(build_offer_response(key, as_of, quantities, result.all()))
+        offer_cache.set(key, body)
+
+    logger.debug(f"User {current_user.username} computed offer {key[:12]} "
+                 f"({len(quantities)} items, cache {cache_status})")
+    return ModelResponse(body, headers={"X-Cache": cache_status})
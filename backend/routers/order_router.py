@@ -3,14 +3,15 @@ from fastapi import APIRouter, Depends, Query, Body
 from fastapi import HTTPException
 from fastapi import Request
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, case, cast, Integer, desc, asc
+from sqlalchemy import select, func, case, cast, Integer, desc, asc, literal_column, type_coerce
+from sqlalchemy.dialects.postgresql import JSON, aggregate_order_by
 from sqlalchemy.orm import selectinload
 from typing import List, Optional
 
 from database import get_async_db
 
 # Импортируем модели SQLAlchemy
-from models import Order, Counterparty, Person, OrderStatus, Work, order_work
+from models import Order, Counterparty, CounterpartyForm, OrderStatus, Work, order_work
 
 from schemas.order_schem import OrderSerial, OrderRead, PaginatedOrderResponse, OrderCommentSchema, OrderResponse, \
     OrderCreate, OrderUpdate
@@ -21,11 +22,20 @@ from schemas.person_schem import PersonSchema
 from schemas.work_schem import WorkSchema
 from schemas.task_schem import TaskRead
 from schemas.timing_schem import TimingSchema
+from utils.change_feed import publish_change
+from utils.data_versions import ORDERS, commit_and_bump, read_version
+from utils.people_directory import people_directory
+from utils.responses import ModelResponse
+from utils.order_tracking import touch_orders, order_etag, order_list_etag, etag_matches, etag_headers, \
+    not_modified
 from datetime import datetime
 
 from fastapi import status
 from sqlalchemy.sql import and_
 from uuid import UUID
+import logging
+
+logger = logging.getLogger(__name__)
 
 router = APIRouter(
     prefix="/order",
@@ -88,6 +98,78 @@ def get_serial_sort_expressions(ascending_order=True):
     ]
 
 
+# Колонки заказа, которые отдаются в списке заказов (поля OrderRead)
+ORDER_LIST_COLUMNS = (
+    Order.serial,
+    Order.name,
+    Order.customer_id,
+    Order.priority,
+    Order.status_id,
+    Order.start_moment,
+    Order.deadline_moment,
+    Order.end_moment,
+    Order.materials_cost,
+    Order.materials_cost_fact,
+    Order.materials_paid,
+    Order.products_cost,
+    Order.products_cost_fact,
+    Order.products_paid,
+    Order.work_cost,
+    Order.work_cost_fact,
+    Order.work_paid,
+    Order.debt,
+    Order.debt_fact,
+    Order.debt_paid,
+    # Сводка хранится в самом заказе (utils.order_tracking), агрегаты по задачам и комментариям не нужны
+    Order.task_count,
+    Order.open_task_count,
+    Order.comment_count,
+    Order.logged_time,
+    Order.last_activity_at,
+)
+
+# Сортировки по колонкам сводки заказа (пустые значения - в конце)
+SUMMARY_SORT_COLUMNS = {
+    "task_count": Order.task_count,
+    "open_task_count": Order.open_task_count,
+    "comment_count": Order.comment_count,
+    "logged_time": Order.logged_time,
+    "last_activity": Order.last_activity_at,
+}
+
+
+def format_customer_name(name: Optional[str], form_name: Optional[str]) -> str:
+    """Отображаемое имя заказчика: "<форма> <название>" """
+    if name is None:
+        return "Контрагент не указан"
+    return f"{form_name} {name}" if form_name else name
+
+
+def order_works_json():
+    """
+    Коррелированный подзапрос: работы заказа одним JSON-массивом (поля WorkSchema),
+    чтобы список заказов со всеми работами получался одним SQL-запросом.
+    """
+    work_object = func.json_build_object(
+        literal_column("'id'"), Work.id,
+        literal_column("'name'"), Work.name,
+        literal_column("'description'"), Work.description,
+        literal_column("'active'"), Work.active,
+    )
+    works = (
+        select(func.coalesce(
+            func.json_agg(aggregate_order_by(work_object, Work.id)),
+            literal_column("'[]'::json"),
+        ))
+        .select_from(order_work.join(Work, Work.id == order_work.c.work_id))
+        .where(order_work.c.order_serial == Order.serial)
+        .correlate(Order)
+        .scalar_subquery()
+    )
+    # Тип JSON нужен, чтобы драйвер вернул уже разобранный список словарей
+    return type_coerce(works, JSON)
+
+
 @router.get("/new-serial", response_model=OrderSerial)
 async def generate_new_order_serial(
         session: AsyncSession = Depends(get_async_db)
@@ -148,16 +230,33 @@ async def read_orders(
                                                description="Search by customer name (case-insensitive, partial match)"),
         search_priority: Optional[int] = Query(default=None, description="Search by exact priority value"),
         search_name: Optional[str] = Query(None, description="Search by order name (case-insensitive, partial match)"),
-        sort_field: str = Query("serial", description="Field to sort by: 'serial', 'priority', or 'status'"),
+        sort_field: str = Query("serial", description="Field to sort by: 'serial', 'priority', 'status', "
+                                                      "'task_count', 'open_task_count', 'comment_count', "
+                                                      "'logged_time' or 'last_activity'"),
         sort_direction: str = Query("asc", description="Sort order: 'asc' or 'desc'"),
         filter_status: Optional[int] = Query(None, description="Filter by specific status ID"),
         no_priority: bool = Query(False, description="Filter orders with no priority"),
         search_works: Optional[str] = Query(None, description="Filter by work IDs (comma-separated, e.g., 1,2,3)"),
         session: AsyncSession = Depends(get_async_db)
 ):
-    query = select(Order).options(
-        selectinload(Order.customer).selectinload(Counterparty.form),
-        selectinload(Order.works)
+    # Условный GET: если ни один заказ не менялся с прошлого запроса с теми же параметрами,
+    # отвечаем 304 после одного запроса глобальной версии заказов по первичному ключу
+    etag = order_list_etag(request, await read_version(session, ORDERS))
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
+    # Один запрос на страницу: только нужные колонки, заказчик и его форма собственности
+    # через outer join, работы - JSON-массивом из подзапроса, общее количество - оконной функцией
+    query = (
+        select(
+            *ORDER_LIST_COLUMNS,
+            Counterparty.name.label("customer_name"),
+            CounterpartyForm.name.label("customer_form_name"),
+            order_works_json().label("works"),
+            func.count().over().label("total_count"),
+        )
+        .outerjoin(Counterparty, Counterparty.id == Order.customer_id)
+        .outerjoin(CounterpartyForm, CounterpartyForm.id == Counterparty.form_id)
     )
     count_query = select(func.count(func.distinct(Order.serial)))
 
@@ -183,7 +282,6 @@ async def read_orders(
 
     # Остальные фильтры
     if search_customer:
-        query = query.join(Counterparty, Counterparty.id == Order.customer_id)
         count_query = count_query.join(Counterparty, Counterparty.id == Order.customer_id)
         query = query.where(Counterparty.name.ilike(f"%{search_customer}%"))
         count_query = count_query.where(Counterparty.name.ilike(f"%{search_customer}%"))
@@ -216,13 +314,6 @@ async def read_orders(
         query = query.where(Order.status_id == filter_status)
         count_query = count_query.where(Order.status_id == filter_status)
 
-    # Выполняем count_query для получения total
-    total_result = await session.execute(count_query)
-    total = total_result.scalar_one_or_none() or 0
-
-    # Логирование для отладки
-    print(f"Total orders: {total}, Query filters: {request.query_params}")
-
     # Применяем сортировку
     is_ascending_direction = sort_direction.lower() != "desc"
 
@@ -252,6 +343,13 @@ async def read_orders(
             primary_status_sort_expr,
             *secondary_serial_sort_asc
         )
+    elif sort_field.lower() in SUMMARY_SORT_COLUMNS:
+        summary_column = SUMMARY_SORT_COLUMNS[sort_field.lower()]
+        query = query.order_by(
+            summary_column.is_(None).asc(),
+            summary_column.asc() if is_ascending_direction else summary_column.desc(),
+            *get_serial_sort_expressions(ascending_order=True)
+        )
     else:
         query = query.order_by(*get_serial_sort_expressions(ascending_order=is_ascending_direction))
 
@@ -260,53 +358,41 @@ async def read_orders(
 
     # Выполняем основной запрос
     result = await session.execute(query)
-    orders_orm = result.scalars().unique().all()
+    rows = result.mappings().all()
+
+    if rows:
+        total = rows[0]["total_count"]
+    else:
+        # Пустая страница (skip за концом списка или ничего не найдено): окно ничего не вернуло,
+        # считаем отдельно
+        total_result = await session.execute(count_query)
+        total = total_result.scalar_one_or_none() or 0
 
-    # Логирование количества возвращённых записей
-    print(f"Returned orders: {len(orders_orm)}")
+    # Логирование для отладки
+    logger.debug(f"Total orders: {total}, returned: {len(rows)}, Query filters: {request.query_params}")
 
     orders_data_list = []
-    for order_orm_item in orders_orm:
-        customer_display_name = "Контрагент не указан"
-        if order_orm_item.customer:
-            if order_orm_item.customer.form:
-                customer_display_name = f"{order_orm_item.customer.form.name} {order_orm_item.customer.name}"
-            else:
-                customer_display_name = order_orm_item.customer.name
-
-        order_data = {
-            "serial": order_orm_item.serial,
-            "name": order_orm_item.name,
-            "customer": customer_display_name,
-            "customer_id": order_orm_item.customer_id,
-            "priority": order_orm_item.priority,
-            "status_id": order_orm_item.status_id,
-            "start_moment": order_orm_item.start_moment,
-            "deadline_moment": order_orm_item.deadline_moment,
-            "end_moment": order_orm_item.end_moment,
-            "materials_cost": order_orm_item.materials_cost,
-            "materials_paid": order_orm_item.materials_paid,
-            "products_cost": order_orm_item.products_cost,
-            "products_paid": order_orm_item.products_paid,
-            "work_cost": order_orm_item.work_cost,
-            "work_paid": order_orm_item.work_paid,
-            "debt": order_orm_item.debt,
-            "debt_paid": order_orm_item.debt_paid,
-            "works": order_orm_item.works,
-        }
+    for row in rows:
+        order_data = {column.key: row[column.key] for column in ORDER_LIST_COLUMNS}
+        order_data["customer"] = format_customer_name(row["customer_name"], row["customer_form_name"])
+        order_data["works"] = row["works"]
         orders_data_list.append(OrderRead.model_validate(order_data))
 
-    return PaginatedOrderResponse(
+    # Модели уже собраны и проверены, повторная валидация по response_model не нужна
+    return ModelResponse(PaginatedOrderResponse(
         total=total,
         limit=limit,
         skip=skip,
         data=orders_data_list
-    )
+    ), headers=etag_headers(etag))
 
 
 @router.get("/detail/{serial}", response_model=OrderDetailResponse)
 async def get_order_detail(
         serial: str,
+        request: Request,
+        include_comments: bool = Query(True, description="Include all comments (use /order/{serial}/comments "
+                                                          "for a paginated feed)"),
         session: AsyncSession = Depends(get_async_db)
 ):
     """
@@ -316,18 +402,31 @@ async def get_order_detail(
 
     Параметры:
     - serial: серийный номер заказа
+    - include_comments: отдавать все комментарии заказа; при False список comments пуст,
+      а комментарии читаются постранично через /order/{serial}/comments
 
     Возвращает: детальную информацию о заказе со всеми связями
+    (304 без тела, если If-None-Match совпадает с текущей версией заказа)
     """
+    # Условный GET: сначала только версия заказа по первичному ключу
+    version_result = await session.execute(select(Order.version).where(Order.serial == serial))
+    version = version_result.scalar_one_or_none()
+    if version is None:
+        raise HTTPException(status_code=404, detail=f"Заказ с номером {serial} не найден")
+    etag = order_etag(serial, version, include_comments)
+    if etag_matches(request, etag):
+        return not_modified(etag)
+
     # Запрос с жадной загрузкой всех необходимых связей, КРОМЕ Person для комментариев и исполнителей задач
-    # Мы загрузим Person для комментариев и исполнителей задач отдельными запросами после получения заказа
+    # Авторов комментариев и исполнителей задач берём из справочника людей (utils.people_directory)
     query = select(Order).where(Order.serial == serial).options(
         selectinload(Order.customer).selectinload(Counterparty.form),
         selectinload(Order.works),
-        selectinload(Order.comments),  # Загружаем комментарии как есть
         selectinload(Order.tasks),
         selectinload(Order.timings)
     )
+    if include_comments:
+        query = query.options(selectinload(Order.comments))  # Загружаем комментарии как есть
 
     # Выполняем запрос
     result = await session.execute(query)
@@ -346,18 +445,18 @@ async def get_order_detail(
         else:
             customer_display_name = order.customer.name
 
+    # Авторы комментариев и исполнители задач (с готовым ФИО) - из справочника людей в памяти, без запросов к базе
+    people = (await people_directory.snapshot(session)).by_uuid
+
     # 2. Обработка комментариев для получения данных автора
     formatted_comments = []
-    if order.comments:  # order.comments это список объектов CommentModel
+    if include_comments and order.comments:  # order.comments это список объектов CommentModel
         author_uuids = {comment.person_uuid for comment in order.comments if comment.person_uuid}
 
         authors_details_map = {}  # Будет хранить {uuid: PersonSchema_object}
-        if author_uuids:
-            person_query = select(Person).where(Person.uuid.in_(author_uuids))
-            person_results = await session.execute(person_query)
-            for person_model in person_results.scalars():
-                # Преобразуем модель SQLAlchemy Person в PersonSchema
-                authors_details_map[person_model.uuid] = PersonSchema.model_validate(person_model)
+        for author_uuid in author_uuids:
+            if author_uuid in people:
+                authors_details_map[author_uuid] = PersonSchema.model_validate(people[author_uuid])
 
         for comment_model in order.comments:  # comment_model это экземпляр модели SQLAlchemy Comment
             person_schema_obj = None
@@ -409,20 +508,6 @@ async def get_order_detail(
         # Сортируем задачи по id перед обработкой
         sorted_tasks = sorted(order.tasks, key=lambda task: task.id)
 
-        # Собираем уникальные UUID исполнителей задач
-        executor_uuids = {task.executor_uuid for task in sorted_tasks if task.executor_uuid}
-
-        executors_map = {}
-        if executor_uuids:
-            # Загружаем данные исполнителей одним запросом
-            person_query = select(Person).where(Person.uuid.in_(executor_uuids))
-            person_results = await session.execute(person_query)
-            # Создаем словарь {uuid: "Фамилия Имя Отчество"}
-            for person in person_results.scalars():
-                fio = f"{person.surname} {person.name}"
-                if person.patronymic:
-                    fio += f" {person.patronymic}"
-                executors_map[person.uuid] = fio
 
         # Формируем список задач с ФИО исполнителя
         for task in sorted_tasks:  # Используем отсортированный список
@@ -434,7 +519,7 @@ async def get_order_detail(
                 "description": task.description,
                 "status_id": task.status_id,
                 "payment_status_id": task.payment_status_id,
-                "executor": task.executor,  # Подставляем ФИО исполнителя
+                "executor": people.get(task.executor_uuid) if task.executor_uuid else None,
                 "planned_duration": task.planned_duration,
                 "actual_duration": task.actual_duration,
                 "creation_moment": task.creation_moment,
@@ -484,7 +569,9 @@ async def get_order_detail(
 
     # 6. Создаем и возвращаем объект Pydantic response_model
     # Pydantic сам проверит соответствие словаря order_data схеме OrderDetailResponse
-    return OrderDetailResponse.model_validate(order_data)
+    # ETag по версии из загруженного заказа: она соответствует отданным данным
+    return ModelResponse(OrderDetailResponse.model_validate(order_data),
+                         headers=etag_headers(order_etag(order.serial, order.version, include_comments)))
 
 
 @router.post("/create", response_model=OrderResponse, status_code=status.HTTP_201_CREATED)
@@ -569,8 +656,10 @@ async def create_order(
     # Сохраняем новый заказ
     session.add(new_order)
     await session.flush()  # Сохраняем заказ, но не коммитим транзакцию
+    await touch_orders(session, [new_order.serial])  # Новый заказ меняет список заказов
+    await publish_change(session, "order", "created", new_order.serial, new_order.serial)
 
-    await session.commit()
+    await commit_and_bump(session)
 
     # Явно обновляем объект заказа и загружаем необходимые для ответа связи
     # attribute_names гарантирует, что эти связи будут загружены одним запросом (или несколькими эффективными)
@@ -742,7 +831,9 @@ async def edit_order(
 
     # Сохраняем изменения
     session.add(order)
-    await session.commit()
+    await touch_orders(session, [order.serial])
+    await publish_change(session, "order", "updated", order.serial, order.serial)
+    await commit_and_bump(session)
 
     # Явно обновляем объект заказа для получения свежих данных
     await session.refresh(order, attribute_names=["customer", "works"])
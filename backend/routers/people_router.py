@@ -2,23 +2,31 @@
 """
 Тут функции - роутеры для работы с людьми (сотрудниками, представителями заказчиков и т.д.)
 """
+from datetime import date, datetime, timedelta
 from fastapi import APIRouter, Depends, Query
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, or_
+from sqlalchemy import select, func, extract, literal_column
 from typing import List, Optional
 from uuid import UUID
+from auth.jwt_auth import get_current_auth_user
+from config import settings
 from database import get_async_db
-from models import Person
-from schemas.person_schem import PersonCanBe, PersonResponse
+from models import Person, Task, Timing, User
+from schemas.person_schem import PersonCanBe, PersonResponse, PersonWorkload
 from sqlalchemy.sql import and_
-from models import User
 from schemas.person_schem import PersonSchema
+from utils.cache import InMemoryCache
+from utils.order_tracking import CLOSED_TASK_STATUSES
+from utils.people_directory import people_directory
 
 router = APIRouter(
     prefix="/person",
     tags=["person"],
 )
 
+# Нагрузка исполнителей по ключу (days, сегодняшняя дата)
+workload_cache = InMemoryCache("people_workload", ttl_seconds=settings.workload_cache_seconds, max_items=32)
+
 
 @router.get("/read", response_model=List[PersonCanBe])
 async def get_people(
@@ -43,46 +51,117 @@ async def get_people(
     - active: фильтр по активности
     - counterparty_id: фильтр по ID контрагента
 
-    Возвращает: список объектов Person
+    Возвращает: список людей в порядке ФИО (с готовым ФИО в поле fio)
+    """
+    # Фильтры считаются по битовым маскам снимка справочника, без запроса к базе
+    roles = {
+        "can_be_scheme_developer": can_be_scheme_developer,
+        "can_be_assembler": can_be_assembler,
+        "can_be_programmer": can_be_programmer,
+        "can_be_tester": can_be_tester,
+    }
+    snapshot = await people_directory.snapshot(session)
+    return snapshot.filter(
+        roles={role: required for role, required in roles.items() if required is not None},
+        any_role=can_be_any is True,
+        active=active,
+        counterparty_id=counterparty_id,
+    )
+
+
+def build_workload_query(since: date, now: datetime):
     """
-    query = select(Person)
-
-    # Применяем фильтр "можно использовать хотя бы в одной роли"
-    if can_be_any is True:
-        query = query.where(
-            or_(
-                Person.can_be_scheme_developer == True,
-                Person.can_be_assembler == True,
-                Person.can_be_programmer == True,
-                Person.can_be_tester == True
-            )
+    Открытые задачи, плановое время и время по таймингам с since по каждому исполнителю одним запросом:
+    два сгруппированных подзапроса (по частичному индексу открытых задач и индексу таймингов
+    по исполнителю и дате), соединённые FULL OUTER JOIN.
+    """
+    open_tasks = (
+        select(
+            Task.executor_uuid.label("executor_uuid"),
+            func.count().label("open_tasks"),
+            func.count().filter(Task.deadline_moment < now).label("overdue_tasks"),
+            func.sum(Task.planned_duration).label("planned"),
         )
+        # Условие записано литералами, чтобы совпадать с условием частичного индекса ix_tasks_open_executor_uuid.
+        # Задачи без статуса в него не попадают (NOT IN с NULL), как и в /task/read и сводке заказа
+        .where(Task.executor_uuid.is_not(None),
+               Task.status_id.notin_([literal_column(str(status_id)) for status_id in CLOSED_TASK_STATUSES]))
+        .group_by(Task.executor_uuid)
+        .subquery("open_tasks")
+    )
+    logged = (
+        select(Timing.executor_id.label("executor_uuid"), func.sum(Timing.time).label("logged"))
+        .where(Timing.executor_id.is_not(None), Timing.timing_date >= since)
+        .group_by(Timing.executor_id)
+        .subquery("logged")
+    )
+    return (
+        select(
+            func.coalesce(open_tasks.c.executor_uuid, logged.c.executor_uuid).label("executor_uuid"),
+            func.coalesce(open_tasks.c.open_tasks, 0).label("open_tasks"),
+            func.coalesce(open_tasks.c.overdue_tasks, 0).label("overdue_tasks"),
+            (func.coalesce(extract("epoch", open_tasks.c.planned), 0) / 3600).label("planned_hours"),
+            (func.coalesce(extract("epoch", logged.c.logged), 0) / 3600).label("logged_hours"),
+        )
+        .select_from(open_tasks.join(logged, open_tasks.c.executor_uuid == logged.c.executor_uuid, full=True))
+    )
+
+
+@router.get("/workload", response_model=List[PersonWorkload])
+async def get_workload(
+        days: int = Query(14, ge=1, le=366, description="Period for logged hours, days back from today"),
+        executor_uuid: Optional[List[UUID]] = Query(None, description="Only these people (repeat the parameter)"),
+        include_idle: bool = Query(False, description="Also include active people with any can_be_* role "
+                                                      "who have no open tasks and no timings"),
+        session: AsyncSession = Depends(get_async_db),
+        current_user: User = Depends(get_current_auth_user)
+):
+    """
+    Нагрузка исполнителей для назначения задач: число открытых и просроченных задач,
+    плановые часы открытых задач и часы по таймингам за последние days дней.
 
-    # Применяем остальные фильтры по отдельным возможностям
-    if can_be_scheme_developer is not None:
-        query = query.where(Person.can_be_scheme_developer == can_be_scheme_developer)
-
-    if can_be_assembler is not None:
-        query = query.where(Person.can_be_assembler == can_be_assembler)
-
-    if can_be_programmer is not None:
-        query = query.where(Person.can_be_programmer == can_be_programmer)
-
-    if can_be_tester is not None:
-        query = query.where(Person.can_be_tester == can_be_tester)
-
-    # Другие фильтры
-    if active is not None:
-        query = query.where(Person.active == active)
-
-    if counterparty_id is not None:
-        query = query.where(Person.counterparty_id == counterparty_id)
+    Считается одним сгруппированным запросом в базе; ФИО берутся из справочника людей.
+    Результат запроса кэшируется на settings.workload_cache_seconds секунд.
 
-    # Выполняем запрос
-    result = await session.execute(query)
-    people = result.scalars().all()
+    Параметры:
+    - days: за сколько последних дней (включая сегодня) суммировать тайминги
+    - executor_uuid: только эти люди
+    - include_idle: добавить свободных активных исполнителей с нулевой нагрузкой
 
-    return people
+    Возвращает: нагрузку по людям в порядке ФИО
+    """
+    today = date.today()
+    key = (days, today)
+    rows = workload_cache.get(key) if settings.workload_cache_seconds else None
+    if rows is None:
+        result = await session.execute(build_workload_query(today - timedelta(days=days - 1), datetime.now()))
+        rows = [dict(row) for row in result.mappings()]
+        if settings.workload_cache_seconds:
+            workload_cache.set(key, rows)
+
+    snapshot = await people_directory.snapshot(session)
+    workload = {row["executor_uuid"]: row for row in rows}
+    if include_idle:
+        for entry in snapshot.filter(any_role=True, active=True):
+            workload.setdefault(entry.uuid, {"executor_uuid": entry.uuid})
+    if executor_uuid:
+        wanted = set(executor_uuid)
+        workload = {uuid_: row for uuid_, row in workload.items() if uuid_ in wanted}
+
+    items = []
+    for uuid_, row in workload.items():
+        person = snapshot.by_uuid.get(uuid_)
+        items.append(PersonWorkload(
+            executor_uuid=uuid_,
+            fio=person.fio if person else None,
+            active=person.active if person else None,
+            open_tasks=row.get("open_tasks", 0),
+            overdue_tasks=row.get("overdue_tasks", 0),
+            planned_hours=round(float(row.get("planned_hours", 0)), 2),
+            logged_hours=round(float(row.get("logged_hours", 0)), 2),
+        ))
+    items.sort(key=lambda item: (item.fio is None, item.fio or "", str(item.executor_uuid)))
+    return items
 
 
 @router.get("/{uuid}", response_model=PersonResponse)
@@ -118,8 +197,5 @@ async def get_active_users(
 
     Возвращает: список пользователей с полями uuid, name, surname, patronymic.
     """
-    query = select(Person).join(User, User.id == Person.user_id).where(Person.active == True)
-    result = await session.execute(query)
-    people = result.scalars().all()
-
-    return people
\ No newline at end of file
+    snapshot = await people_directory.snapshot(session)
+    return snapshot.filter(active=True, has_user=True)
\ No newline at end of file
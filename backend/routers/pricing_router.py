@@ -0,0 +1,183 @@
+# routers/pricing_router.py
+"""
+Тут функции - роутеры для курсов валют и расчёта цен оборудования в базовой валюте
+"""
+from datetime import date
+from decimal import Decimal
+from typing import List, Optional
+
+from fastapi import APIRouter, Depends, Query, HTTPException
+from sqlalchemy import select, func, or_
+from sqlalchemy.dialects.postgresql import insert as pg_insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from loguru import logger
+
+from auth.jwt_auth import get_current_auth_user
+from config import settings
+from database import get_async_db
+from models import Currency, CurrencyRate
+from models import User as UserModel
+from schemas.pricing_schem import CurrencyRateIn, CurrencyRateRead, PriceListItem, PriceListResponse, \
+    BillRequest, BillLineRead, BillResponse
+from utils.data_versions import RATES, commit_and_bump, mark_changed
+from utils.pricing import PriceEntry, latest_rates, get_price_list, get_prices, invalidate_price_list, price_bill
+from utils.responses import ModelResponse
+
+router = APIRouter(
+    prefix="/pricing",
+    tags=["pricing"],
+)
+
+
+def _optional_float(value: Optional[Decimal]) -> Optional[float]:
+    return float(value) if value is not None else None
+
+
+def to_price_list_item(entry: PriceEntry) -> dict:
+    return {
+        "equipment_id": entry.equipment_id,
+        "price": entry.price,
+        "currency": entry.currency,
+        "rate": _optional_float(entry.rate),
+        "rate_date": entry.rate_date,
+        "base_price": _optional_float(entry.base_price),
+    }
+
+
+@router.get("/rates", response_model=List[CurrencyRateRead])
+async def get_rates(
+        as_of: Optional[date] = Query(None, description="Rates date, today by default"),
+        session: AsyncSession = Depends(get_async_db),
+        current_user: UserModel = Depends(get_current_auth_user)
+):
+    """
+    Действующие курсы валют на дату (последний курс не позже as_of).
+
+    Параметры:
+    - as_of: дата, по умолчанию сегодня
+
+    Возвращает: курсы валют, у которых есть курс на дату, и базовую валюту с курсом 1
+    """
+    rates = latest_rates(as_of or date.today())
+    result = await session.execute(
+        select(Currency.id, Currency.name, rates.c.rate, rates.c.rate_date)
+        .outerjoin(rates, rates.c.currency_id == Currency.id)
+        .where(or_(Currency.name == settings.base_currency, rates.c.rate.is_not(None)))
+        .order_by(Currency.name)
+    )
+    return [
+        CurrencyRateRead(currency_id=row.id, currency=row.name, rate=1.0, rate_date=None)
+        if row.name == settings.base_currency
+        else CurrencyRateRead(currency_id=row.id, currency=row.name, rate=float(row.rate), rate_date=row.rate_date)
+        for row in result
+    ]
+
+
+@router.put("/rates", response_model=List[CurrencyRateRead])
+async def set_rates(
+        rates: List[CurrencyRateIn],
+        session: AsyncSession = Depends(get_async_db),
+        current_user: UserModel = Depends(get_current_auth_user)
+):
+    """
+    Добавить или обновить курсы валют (один курс на валюту и дату) одним запросом.
+
+    После изменения версия курсов меняется, и прайс-листы пересчитываются во всех воркерах.
+
+    Параметры:
+    - rates: курсы; при повторе валюты и даты в запросе действует последний
+
+    Возвращает: сохранённые курсы
+    """
+    if not rates:
+        raise HTTPException(status_code=400, detail="No rates provided")
+    # ON CONFLICT DO UPDATE не может изменить одну строку дважды за запрос
+    unique_rates = {(rate.currency_id, rate.rate_date): rate for rate in rates}
+
+    currency_ids = {currency_id for currency_id, _ in unique_rates}
+    result = await session.execute(select(Currency.id, Currency.name).where(Currency.id.in_(currency_ids)))
+    currency_names = dict(result.all())
+    unknown = sorted(currency_ids - currency_names.keys())
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown currency ids: {unknown}")
+    if settings.base_currency in currency_names.values():
+        raise HTTPException(status_code=400, detail=f"Base currency {settings.base_currency} always has rate 1")
+
+    statement = pg_insert(CurrencyRate).values([
+        {"currency_id": rate.currency_id, "rate_date": rate.rate_date, "rate": rate.rate}
+        for rate in unique_rates.values()
+    ])
+    statement = statement.on_conflict_do_update(
+        constraint="uq_currency_rates_currency_id_rate_date",
+        set_={"rate": statement.excluded.rate, "updated_at": func.now()},
+    )
+    await session.execute(statement)
+    mark_changed(session, RATES)
+    await commit_and_bump(session)
+    invalidate_price_list()
+
+    logger.info(f"User {current_user.username} set {len(unique_rates)} currency rates")
+    return [
+        CurrencyRateRead(currency_id=rate.currency_id, currency=currency_names[rate.currency_id],
+                         rate=float(rate.rate), rate_date=rate.rate_date)
+        for rate in unique_rates.values()
+    ]
+
+
+@router.get("/price_list", response_model=PriceListResponse)
+async def get_price_list_endpoint(
+        as_of: Optional[date] = Query(None, description="Rates date, today by default"),
+        session: AsyncSession = Depends(get_async_db),
+        current_user: UserModel = Depends(get_current_auth_user)
+):
+    """
+    Прайс-лист всего оборудования в базовой валюте.
+
+    Считается одним запросом и кэшируется до изменения курсов или импорта оборудования.
+
+    Параметры:
+    - as_of: дата курсов, по умолчанию сегодня
+
+    Возвращает: цены в валюте оборудования, использованный курс и цену в базовой валюте
+    """
+    as_of = as_of or date.today()
+    version, price_list = await get_price_list(session, as_of)
+    return ModelResponse(PriceListResponse(
+        as_of=as_of,
+        base_currency=settings.base_currency,
+        price_version=version,
+        items=[PriceListItem(**to_price_list_item(entry)) for entry in price_list.values()],
+    ))
+
+
+@router.post("/bill", response_model=BillResponse)
+async def price_bill_endpoint(
+        bill: BillRequest,
+        session: AsyncSession = Depends(get_async_db),
+        current_user: UserModel = Depends(get_current_auth_user)
+):
+    """
+    Цена спецификации (коммерческого предложения) в базовой валюте одним запросом
+    только по позициям спецификации (WHERE id IN (...)), без прайс-листа всего каталога.
+
+    Параметры:
+    - bill: позиции оборудования с количеством и дата курсов
+
+    Возвращает: строки с ценой за единицу и суммой в базовой валюте, итог,
+    позиции без цены или курса (в итог не входят) и отсутствующие в каталоге ID
+    """
+    as_of = bill.as_of or date.today()
+    prices = await get_prices(session, (item.equipment_id for item in bill.items), as_of)
+    lines, total, unpriced, unknown = price_bill(prices, ((item.equipment_id, item.quantity) for item in bill.items))
+
+    logger.debug(f"User {current_user.username} priced a bill of {len(bill.items)} items")
+    return ModelResponse(BillResponse(
+        as_of=as_of,
+        base_currency=settings.base_currency,
+        lines=[BillLineRead(**to_price_list_item(line.entry), quantity=float(line.quantity),
+                            base_total=_optional_float(line.base_total))
+               for line in lines],
+        total=float(total),
+        unpriced=unpriced,
+        unknown=unknown,
+    ))
@@ -1,9 +1,11 @@
 # routers/task_router.py
 from fastapi import APIRouter, Depends, Query, HTTPException
 from sqlalchemy.ext.asyncio import AsyncSession
-from sqlalchemy import select, func, update
-from sqlalchemy.orm import selectinload
-from typing import Optional
+from sqlalchemy import select, func, update, values, column, case, Boolean, String, DateTime, Interval
+from sqlalchemy.dialects.postgresql import UUID as PG_UUID
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import selectinload, joinedload
+from typing import Optional, List, Dict, Any
 from uuid import UUID
 import logging
 from models import Person
@@ -13,6 +15,11 @@ from database import get_async_db
 from models import Task
 from schemas.task_schem import PaginatedTaskResponse
 from schemas.task_schem import TaskRead
+from schemas.task_schem import TaskBatchItem
+from utils.responses import ModelResponse
+from utils.order_tracking import touch_orders, refresh_order_summaries
+from utils.data_versions import commit_and_bump
+from utils.change_feed import publish_change, publish_changes, make_event
 from datetime import timedelta
 from datetime import datetime
 from isodate import parse_duration
@@ -28,6 +35,88 @@ router = APIRouter(
 )
 
 
+# Колонки, которые можно менять через пакетное обновление, и их типы для VALUES
+BATCH_UPDATABLE_COLUMNS = {
+    "status_id": Integer,
+    "name": String,
+    "description": String,
+    "executor_uuid": PG_UUID(as_uuid=True),
+    "planned_duration": Interval,
+    "start_moment": DateTime,
+    "deadline_moment": DateTime,
+}
+
+
+def parse_planned_duration(value: Optional[str]) -> Optional[timedelta]:
+    """
+    Преобразует длительность в формате ISO 8601 (например, P1D, P1DT2H30M) в timedelta.
+    Пустая строка или None дают None, неверный формат - HTTP 400.
+    """
+    if value is None or not value.strip():
+        return None
+    cleaned_duration = value.strip().strip('"\'')
+    try:
+        duration = parse_duration(cleaned_duration)  # Парсим ISO 8601
+        # Преобразуем в timedelta
+        return duration if isinstance(duration, timedelta) else timedelta(seconds=duration.total_seconds())
+    except Exception:
+        logger.warning(f"Invalid ISO 8601 duration format: {cleaned_duration}")
+        raise HTTPException(status_code=400, detail="Invalid ISO 8601 duration format")
+
+
+async def load_tasks_with_relations(session: AsyncSession, task_ids: List[int]) -> Dict[int, Task]:
+    """
+    Загружает задачи вместе со статусом оплаты, заказом и исполнителем одним запросом с JOIN.
+    populate_existing перезаписывает объекты, уже находящиеся в сессии, свежими данными.
+    """
+    query = (
+        select(Task)
+        .where(Task.id.in_(task_ids))
+        .options(
+            joinedload(Task.payment_status),
+            joinedload(Task.order),
+            joinedload(Task.executor)
+        )
+        .execution_options(populate_existing=True)
+    )
+    result = await session.execute(query)
+    return {task.id: task for task in result.scalars().unique().all()}
+
+
+async def apply_task_update(session: AsyncSession, task_id: int, **values) -> Task:
+    """
+    Обновляет поля одной задачи и возвращает её вместе со связями.
+
+    Выполняет UPDATE ... RETURNING (заодно проверяет существование задачи), увеличивает версию
+    заказа задачи (при смене статуса - пересчитывает и сводку заказа) и загружает задачу
+    одним SELECT с JOIN на статус оплаты, заказ и исполнителя.
+    Затем фиксирует транзакцию.
+    Если задача не найдена - HTTP 404.
+    """
+    update_query = (
+        update(Task)
+        .where(Task.id == task_id)
+        .values(**values)
+        .returning(Task.id, Task.order_serial)
+        .execution_options(synchronize_session=False)
+    )
+    result = await session.execute(update_query)
+    updated = result.one_or_none()
+    if updated is None:
+        await session.rollback()
+        logger.warning(f"Task with id {task_id} not found")
+        raise HTTPException(status_code=404, detail="Task not found")
+
+    await touch_orders(session, [updated.order_serial])
+    if "status_id" in values:
+        # Статус меняет число открытых задач в сводке заказа
+        await refresh_order_summaries(session, [updated.order_serial])
+    await publish_change(session, "task", "updated", task_id, updated.order_serial)
+    tasks = await load_tasks_with_relations(session, [task_id])
+    await commit_and_bump(session)
+    return tasks[task_id]
+
+
 def get_task_order_sort(ascending=True):
     direction_func = asc if ascending else desc
     return [
@@ -146,12 +235,12 @@ async def read_tasks(
         # Преобразуем ORM-объекты Task в Pydantic-объекты TaskRead
         tasks_data = [TaskRead.model_validate(task) for task in tasks]
 
-        return PaginatedTaskResponse(
+        return ModelResponse(PaginatedTaskResponse(
             total=total,
             limit=limit,
             skip=skip,
             data=tasks_data
-        )
+        ))
 
     except HTTPException as he:
         raise he
@@ -181,16 +270,8 @@ async def read_current_task(
         # Логируем входные параметры
         logger.info(f"Received request to get task with id={task_id}")
 
-        # Формируем запрос с подгрузкой связанных моделей
-        query = select(Task).where(Task.id == task_id).options(
-            selectinload(Task.payment_status),
-            selectinload(Task.order),
-            selectinload(Task.executor)
-        )
-
-        # Выполняем запрос
-        result = await session.execute(query)
-        task = result.scalars().first()
+        # Загружаем задачу вместе со связанными моделями одним запросом
+        task = (await load_tasks_with_relations(session, [task_id])).get(task_id)
 
         if not task:
             logger.warning(f"Task with id {task_id} not found")
@@ -233,26 +314,8 @@ async def update_task_status(
         if status_id not in [1, 2, 3, 4, 5]:
             raise HTTPException(status_code=400, detail="Invalid status_id. Must be between 1 and 5.")
 
-        # Ищем задачу по ID
-        query = select(Task).where(Task.id == task_id).options(
-            selectinload(Task.payment_status),
-            selectinload(Task.order),
-            selectinload(Task.executor)
-        )
-        result = await session.execute(query)
-        task = result.scalars().first()
-
-        if not task:
-            logger.warning(f"Task with id {task_id} not found")
-            raise HTTPException(status_code=404, detail="Task not found")
-
         # Обновляем статус задачи
-        update_query = update(Task).where(Task.id == task_id).values(status_id=status_id)
-        await session.execute(update_query)
-        await session.commit()
-
-        # Обновляем объект задачи для возврата актуальных данных
-        await session.refresh(task)
+        task = await apply_task_update(session, task_id, status_id=status_id)
 
         logger.info(f"Task {task_id} status updated to {status_id}")
         return TaskRead.model_validate(task)
@@ -290,26 +353,8 @@ async def update_task_name(
         if not new_name or new_name.strip() == "":
             raise HTTPException(status_code=400, detail="Task name cannot be empty")
 
-        # Ищем задачу по ID
-        query = select(Task).where(Task.id == task_id).options(
-            selectinload(Task.payment_status),
-            selectinload(Task.order),
-            selectinload(Task.executor)
-        )
-        result = await session.execute(query)
-        task = result.scalars().first()
-
-        if not task:
-            logger.warning(f"Task with id {task_id} not found")
-            raise HTTPException(status_code=404, detail="Task not found")
-
         # Обновляем имя задачи
-        update_query = update(Task).where(Task.id == task_id).values(name=new_name.strip())
-        await session.execute(update_query)
-        await session.commit()
-
-        # Обновляем объект задачи для возврата актуальных данных
-        await session.refresh(task)
+        task = await apply_task_update(session, task_id, name=new_name.strip())
 
         logger.info(f"Task {task_id} name updated to {new_name}")
         return TaskRead.model_validate(task)
@@ -347,29 +392,11 @@ async def update_task_description(
     try:
         logger.info(f"Received request to update task {task_id} with new description={new_description}")
 
-        # Ищем задачу по ID
-        query = select(Task).where(Task.id == task_id).options(
-            selectinload(Task.payment_status),
-            selectinload(Task.order),
-            selectinload(Task.executor)
-        )
-        result = await session.execute(query)
-        task = result.scalars().first()
-
-        if not task:
-            logger.warning(f"Task with id {task_id} not found")
-            raise HTTPException(status_code=404, detail="Task not found")
-
         # Преобразуем пустую строку или пробелы в None
         description_value = None if new_description is None or new_description.strip() == "" else new_description.strip()
 
         # Обновляем описание задачи
-        update_query = update(Task).where(Task.id == task_id).values(description=description_value)
-        await session.execute(update_query)
-        await session.commit()
-
-        # Обновляем объект задачи для возврата актуальных данных
-        await session.refresh(task)
+        task = await apply_task_update(session, task_id, description=description_value)
 
         logger.info(f"Task {task_id} description updated to {description_value}")
         return TaskRead.model_validate(task)
@@ -404,35 +431,14 @@ async def update_task_executor(
         # Логируем входные параметры
         logger.info(f"Received request to update task {task_id} with executor_uuid={executor_uuid}")
 
-        # Проверяем, существует ли указанный исполнитель, если UUID предоставлен
-        if executor_uuid is not None:
-            person_query = select(Person).where(Person.uuid == executor_uuid)  # type: ignore
-            person_result = await session.execute(person_query)
-            person = person_result.scalars().first()
-            if not person:
-                logger.warning(f"Person with uuid {executor_uuid} not found")
-                raise HTTPException(status_code=404, detail="Person not found")
-
-        # Ищем задачу по ID
-        query = select(Task).where(Task.id == task_id).options(
-            selectinload(Task.payment_status),
-            selectinload(Task.order),
-            selectinload(Task.executor)
-        )
-        result = await session.execute(query)
-        task = result.scalars().first()
-
-        if not task:
-            logger.warning(f"Task with id {task_id} not found")
-            raise HTTPException(status_code=404, detail="Task not found")
-
-        # Обновляем исполнителя задачи
-        update_query = update(Task).where(Task.id == task_id).values(executor_uuid=executor_uuid)
-        await session.execute(update_query)
-        await session.commit()
-
-        # Обновляем объект задачи для возврата актуальных данных
-        await session.refresh(task)
+        # Обновляем исполнителя задачи.
+        # Существование исполнителя проверяет внешний ключ, отдельный SELECT не нужен
+        try:
+            task = await apply_task_update(session, task_id, executor_uuid=executor_uuid)
+        except IntegrityError:
+            await session.rollback()
+            logger.warning(f"Person with uuid {executor_uuid} not found")
+            raise HTTPException(status_code=404, detail="Person not found")
 
         logger.info(f"Task {task_id} executor updated to {executor_uuid}")
         return TaskRead.model_validate(task)
@@ -470,38 +476,10 @@ async def update_task_planned_duration(
         logger.info(f"Received request to update task {task_id} with new planned_duration={new_planned_duration}")
 
         # Валидация и преобразование ISO 8601 в timedelta
-        duration_value = None
-        if new_planned_duration is not None and new_planned_duration.strip():
-            cleaned_duration = new_planned_duration.strip().strip('"\'')
-            try:
-                duration = parse_duration(cleaned_duration)  # Парсим ISO 8601
-                # Преобразуем в timedelta
-                duration_value = duration if isinstance(duration, timedelta) else timedelta(
-                    seconds=duration.total_seconds())
-            except Exception:
-                logger.warning(f"Invalid ISO 8601 duration format: {cleaned_duration}")
-                raise HTTPException(status_code=400, detail="Invalid ISO 8601 duration format")
-
-        # Ищем задачу по ID
-        query = select(Task).where(Task.id == task_id).options(
-            selectinload(Task.payment_status),
-            selectinload(Task.order),
-            selectinload(Task.executor)
-        )
-        result = await session.execute(query)
-        task = result.scalars().first()
-
-        if not task:
-            logger.warning(f"Task with id {task_id} not found")
-            raise HTTPException(status_code=404, detail="Task not found")
+        duration_value = parse_planned_duration(new_planned_duration)
 
         # Обновляем плановую длительность задачи
-        update_query = update(Task).where(Task.id == task_id).values(planned_duration=duration_value)
-        await session.execute(update_query)
-        await session.commit()
-
-        # Обновляем объект задачи для возврата актуальных данных
-        await session.refresh(task)
+        task = await apply_task_update(session, task_id, planned_duration=duration_value)
 
         logger.info(f"Task {task_id} planned duration updated to {duration_value}")
         return TaskRead.model_validate(task)
@@ -538,29 +516,11 @@ async def update_task_start_moment(
     try:
         logger.info(f"Received request to update task {task_id} with new start_moment={new_start_moment}")
 
-        # Ищем задачу по ID
-        query = select(Task).where(Task.id == task_id).options(
-            selectinload(Task.payment_status),
-            selectinload(Task.order),
-            selectinload(Task.executor)
-        )
-        result = await session.execute(query)
-        task = result.scalars().first()
-
-        if not task:
-            logger.warning(f"Task with id {task_id} not found")
-            raise HTTPException(status_code=404, detail="Task not found")
-
         # Преобразуем offset-aware datetime в offset-naive
         start_moment_value = new_start_moment.replace(tzinfo=None) if new_start_moment else None
 
         # Обновляем время начала задачи
-        update_query = update(Task).where(Task.id == task_id).values(start_moment=start_moment_value)
-        await session.execute(update_query)
-        await session.commit()
-
-        # Обновляем объект задачи для возврата актуальных данных
-        await session.refresh(task)
+        task = await apply_task_update(session, task_id, start_moment=start_moment_value)
 
         logger.info(f"Task {task_id} start moment updated to {new_start_moment}")
         return TaskRead.model_validate(task)
@@ -597,29 +557,11 @@ async def update_task_deadline_moment(
     try:
         logger.info(f"Received request to update task {task_id} with new deadline_moment={new_deadline_moment}")
 
-        # Ищем задачу по ID
-        query = select(Task).where(Task.id == task_id).options(
-            selectinload(Task.payment_status),
-            selectinload(Task.order),
-            selectinload(Task.executor)
-        )
-        result = await session.execute(query)
-        task = result.scalars().first()
-
-        if not task:
-            logger.warning(f"Task with id {task_id} not found")
-            raise HTTPException(status_code=404, detail="Task not found")
-
         # Преобразуем offset-aware datetime в offset-naive
         new_deadline_moment_value = new_deadline_moment.replace(tzinfo=None) if new_deadline_moment else None
 
         # Обновляем дедлайн задачи
-        update_query = update(Task).where(Task.id == task_id).values(deadline_moment=new_deadline_moment_value)
-        await session.execute(update_query)
-        await session.commit()
-
-        # Обновляем объект задачи для возврата актуальных данных
-        await session.refresh(task)
+        task = await apply_task_update(session, task_id, deadline_moment=new_deadline_moment_value)
 
         logger.info(f"Task {task_id} deadline moment updated to {new_deadline_moment}")
         return TaskRead.model_validate(task)
@@ -632,3 +574,125 @@ async def update_task_deadline_moment(
             status_code=500,
             detail=f"Ошибка при обновлении дедлайна задачи: {str(e)}"
         )
+
+
+@router.patch("/batch", response_model=List[TaskRead])
+async def batch_update_tasks(
+        items: List[TaskBatchItem] = Body(..., description="List of {task_id, changes} items"),
+        session: AsyncSession = Depends(get_async_db)
+):
+    """
+    Пакетно обновить несколько задач за одну транзакцию.
+
+    Все изменения проверяются вместе, затем применяются одним запросом
+    UPDATE ... FROM (VALUES ...) RETURNING, после чего задачи загружаются одним запросом со связями.
+
+    Параметры:
+    - items: список объектов {task_id, changes}, в changes передаются только изменяемые поля
+      (status_id, name, description, executor_uuid, planned_duration, start_moment, deadline_moment).
+
+    Возвращает:
+    - List[TaskRead]: Обновлённые задачи в порядке запроса.
+    """
+    try:
+        logger.info(f"Received batch update request for {len(items)} tasks")
+
+        if not items:
+            return []
+
+        task_ids = [item.task_id for item in items]
+        if len(set(task_ids)) != len(task_ids):
+            raise HTTPException(status_code=400, detail="Each task_id may appear only once in a batch")
+
+        # Нормализуем значения так же, как одиночные PATCH-эндпоинты
+        rows: List[Dict[str, Any]] = []
+        for item in items:
+            changes = item.changes
+            row: Dict[str, Any] = {}
+            for field in changes.model_fields_set:
+                value = getattr(changes, field)
+                if field in ("name", "status_id") and value is None:
+                    raise HTTPException(status_code=400, detail=f"Task {item.task_id}: {field} cannot be null")
+                if field == "name":
+                    value = value.strip()
+                    if not value:
+                        raise HTTPException(status_code=400, detail="Task name cannot be empty")
+                elif field == "description":
+                    value = None if value is None or value.strip() == "" else value.strip()
+                elif field == "planned_duration":
+                    value = parse_planned_duration(value)
+                elif field in ("start_moment", "deadline_moment"):
+                    # Преобразуем offset-aware datetime в offset-naive
+                    value = value.replace(tzinfo=None) if value else None
+                row[field] = value
+            rows.append(row)
+
+        changed_columns = [name for name in BATCH_UPDATABLE_COLUMNS if any(name in row for row in rows)]
+        if not changed_columns:
+            raise HTTPException(status_code=400, detail="No changes provided")
+
+        # Проверяем всех исполнителей одним запросом
+        executor_uuids = {row["executor_uuid"] for row in rows if row.get("executor_uuid") is not None}
+        if executor_uuids:
+            person_result = await session.execute(select(Person.uuid).where(Person.uuid.in_(executor_uuids)))
+            missing_executors = executor_uuids - set(person_result.scalars().all())
+            if missing_executors:
+                logger.warning(f"Persons not found: {missing_executors}")
+                raise HTTPException(status_code=404, detail=f"Person not found: {sorted(map(str, missing_executors))}")
+
+        # VALUES (task_id, <col>, <col>_set, ...) - флаг *_set отличает "не менять" от "установить NULL"
+        value_columns = [column("task_id", Integer)]
+        for name in changed_columns:
+            value_columns.append(column(name, BATCH_UPDATABLE_COLUMNS[name]))
+            value_columns.append(column(f"{name}_set", Boolean))
+        changes_values = values(*value_columns, name="changes").data([
+            (item.task_id, *[v for name in changed_columns for v in (row.get(name), name in row)])
+            for item, row in zip(items, rows)
+        ])
+
+        set_clause = {}
+        for name in changed_columns:
+            task_column = getattr(Task, name)
+            set_clause[task_column] = case(
+                (changes_values.c[f"{name}_set"], cast(changes_values.c[name], BATCH_UPDATABLE_COLUMNS[name])),
+                else_=task_column
+            )
+
+        update_query = (
+            update(Task)
+            .where(Task.id == changes_values.c.task_id)
+            .values(set_clause)
+            .returning(Task.id, Task.order_serial)
+            .execution_options(synchronize_session=False)
+        )
+        update_result = await session.execute(update_query)
+        updated_rows = update_result.all()
+        updated_ids = {row.id for row in updated_rows}
+
+        missing_tasks = set(task_ids) - updated_ids
+        if missing_tasks:
+            await session.rollback()
+            logger.warning(f"Tasks not found: {missing_tasks}")
+            raise HTTPException(status_code=404, detail=f"Task not found: {sorted(missing_tasks)}")
+
+        await touch_orders(session, [row.order_serial for row in updated_rows])
+        if "status_id" in changed_columns:
+            await refresh_order_summaries(session, [row.order_serial for row in updated_rows])
+        await publish_changes(session, [
+            make_event("task", "updated", row.id, row.order_serial) for row in updated_rows
+        ])
+        tasks = await load_tasks_with_relations(session, task_ids)
+        await commit_and_bump(session)
+
+        logger.info(f"Batch updated tasks {task_ids}, columns {changed_columns}")
+        return [TaskRead.model_validate(tasks[task_id]) for task_id in task_ids]
+
+    except HTTPException as he:
+        raise he
+    except Exception as e:
+        await session.rollback()
+        logger.error(f"Error in batch task update: {str(e)}", exc_info=True)
+        raise HTTPException(
+            status_code=500,
+            detail=f"Ошибка при пакетном обновлении задач: {str(e)}"
+        )
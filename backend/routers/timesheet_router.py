@@ -0,0 +1,190 @@
+# routers/timesheet_router.py
+"""
+Тут функции - роутеры для табеля: время исполнителей по таймингам за период
+"""
+from datetime import date
+from typing import Dict, List, Optional, Tuple
+from uuid import UUID
+
+from fastapi import APIRouter, Depends, Query, HTTPException
+from sqlalchemy import select, func, cast, extract, tuple_, literal_column, Date, DateTime
+from sqlalchemy.ext.asyncio import AsyncSession
+from loguru import logger
+
+from auth.jwt_auth import get_current_auth_user
+from database import get_async_db
+from models import Timing, Task
+from models import User as UserModel
+from schemas.timing_schem import TimesheetResponse, TimesheetRow, TimesheetTotal, TimesheetEntry, \
+    TimesheetEntriesPage
+from utils.cursor import encode_cursor, decode_cursor
+from utils.people_directory import people_directory
+from utils.responses import ModelResponse
+
+router = APIRouter(
+    prefix="/timesheet",
+    tags=["timesheet"],
+)
+
+# Единицы date_trunc; значение подставляется в SQL литералом, чтобы выражение в SELECT и GROUP BY совпадало
+GROUP_BY_UNITS = {"day": "'day'", "week": "'week'", "month": "'month'"}
+MAX_RANGE_DAYS = 400
+
+
+def check_range(date_from: date, date_to: date) -> None:
+    if date_from > date_to:
+        raise HTTPException(status_code=400, detail="date_from must not be later than date_to")
+    if (date_to - date_from).days >= MAX_RANGE_DAYS:
+        raise HTTPException(status_code=400, detail=f"Date range must be shorter than {MAX_RANGE_DAYS} days")
+
+
+def hours(interval):
+    """Интервал в часах"""
+    return extract("epoch", interval) / 3600
+
+
+def build_timesheet_query(date_from: date, date_to: date, group_by: str,
+                          executor_uuids: Optional[List[UUID]] = None, order_serial: Optional[str] = None):
+    """
+    Сумма времени и число таймингов по исполнителю и периоду.
+    Условие по timing_date отсекает секции timings вне диапазона, остальное читается
+    из покрывающего индекса (executor_id, timing_date) INCLUDE (time, ...).
+    """
+    period = cast(func.date_trunc(literal_column(GROUP_BY_UNITS[group_by]), cast(Timing.timing_date, DateTime)),
+                  Date)
+    query = (
+        select(
+            Timing.executor_id.label("executor_uuid"),
+            period.label("period_start"),
+            hours(func.sum(Timing.time)).label("hours"),
+            func.count().label("entries"),
+        )
+        .where(Timing.timing_date.between(date_from, date_to))
+        .group_by(Timing.executor_id, period)
+    )
+    if executor_uuids:
+        query = query.where(Timing.executor_id.in_(executor_uuids))
+    if order_serial:
+        query = query.where(Timing.order_serial == order_serial)
+    return query
+
+
+@router.get("", response_model=TimesheetResponse)
+async def get_timesheet(
+        date_from: date = Query(..., description="First day of the range"),
+        date_to: date = Query(..., description="Last day of the range (inclusive)"),
+        group_by: str = Query("day", pattern="^(day|week|month)$", description="'day', 'week' or 'month'"),
+        executor_uuid: Optional[List[UUID]] = Query(None, description="Only these people (repeat the parameter)"),
+        order_serial: Optional[str] = Query(None, description="Only timings of this order"),
+        session: AsyncSession = Depends(get_async_db),
+        current_user: UserModel = Depends(get_current_auth_user)
+):
+    """
+    Табель: часы по таймингам каждого исполнителя за день, неделю или месяц в диапазоне дат.
+
+    Агрегируется одним запросом в базе; читаются только секции timings за запрошенные месяцы.
+
+    Параметры:
+    - date_from, date_to: диапазон дат таймингов (включительно, короче MAX_RANGE_DAYS дней)
+    - group_by: период группировки (неделя начинается с понедельника)
+    - executor_uuid: только эти исполнители
+    - order_serial: только тайминги этого заказа
+
+    Возвращает: строки по исполнителю и периоду, итоги по исполнителям и общий итог
+    """
+    check_range(date_from, date_to)
+    result = await session.execute(build_timesheet_query(date_from, date_to, group_by, executor_uuid, order_serial))
+    snapshot = await people_directory.snapshot(session)
+
+    def fio(uuid_: Optional[UUID]) -> Optional[str]:
+        person = snapshot.by_uuid.get(uuid_) if uuid_ else None
+        return person.fio if person else None
+
+    rows = []
+    totals: Dict[Optional[UUID], Tuple[float, int]] = {}
+    for row in result:
+        row_hours = round(float(row.hours or 0), 2)
+        rows.append(TimesheetRow(executor_uuid=row.executor_uuid, fio=fio(row.executor_uuid),
+                                 period_start=row.period_start, hours=row_hours, entries=row.entries))
+        total_hours, total_entries = totals.get(row.executor_uuid, (0.0, 0))
+        totals[row.executor_uuid] = (total_hours + row_hours, total_entries + row.entries)
+    rows.sort(key=lambda item: (item.fio is None, item.fio or "", str(item.executor_uuid), item.period_start))
+
+    executor_totals = [
+        TimesheetTotal(executor_uuid=uuid_, fio=fio(uuid_), hours=round(total_hours, 2), entries=entries)
+        for uuid_, (total_hours, entries) in totals.items()
+    ]
+    executor_totals.sort(key=lambda item: (item.fio is None, item.fio or "", str(item.executor_uuid)))
+
+    logger.debug(f"User {current_user.username} requested timesheet {date_from}..{date_to} by {group_by}")
+    return ModelResponse(TimesheetResponse(
+        date_from=date_from,
+        date_to=date_to,
+        group_by=group_by,
+        rows=rows,
+        totals=executor_totals,
+        total_hours=round(sum(total.hours for total in executor_totals), 2),
+    ))
+
+
+@router.get("/entries", response_model=TimesheetEntriesPage)
+async def get_timesheet_entries(
+        date_from: date = Query(..., description="First day of the range"),
+        date_to: date = Query(..., description="Last day of the range (inclusive)"),
+        executor_uuid: Optional[List[UUID]] = Query(None, description="Only these people (repeat the parameter)"),
+        cursor: Optional[str] = Query(None, description="next_cursor from the previous page"),
+        limit: int = Query(200, ge=1, le=2000, description="Number of entries per page"),
+        session: AsyncSession = Depends(get_async_db),
+        current_user: UserModel = Depends(get_current_auth_user)
+):
+    """
+    Отдельные тайминги за диапазон дат (расшифровка табеля), по дате и id.
+
+    Keyset-пагинация по (timing_date, id); читаются только секции timings за запрошенные месяцы.
+
+    Параметры:
+    - date_from, date_to: диапазон дат таймингов (включительно)
+    - executor_uuid: только эти исполнители
+    - cursor, limit: курсор и размер страницы
+
+    Возвращает: страницу таймингов с названием задачи и курсор следующей страницы
+    """
+    check_range(date_from, date_to)
+    query = (
+        select(
+            Timing.id,
+            Timing.timing_date,
+            Timing.executor_id.label("executor_uuid"),
+            Timing.order_serial,
+            Timing.task_id,
+            Task.name.label("task_name"),
+            hours(Timing.time).label("hours"),
+        )
+        .outerjoin(Task, Task.id == Timing.task_id)
+        .where(Timing.timing_date.between(date_from, date_to))
+    )
+    if executor_uuid:
+        query = query.where(Timing.executor_id.in_(executor_uuid))
+    if cursor:
+        values = decode_cursor(cursor)
+        try:
+            after = (date.fromisoformat(values["date"]), int(values["id"]))
+        except (KeyError, TypeError, ValueError):
+            raise HTTPException(status_code=400, detail="Invalid cursor")
+        query = query.where(tuple_(Timing.timing_date, Timing.id) > tuple_(*after))
+    query = query.order_by(Timing.timing_date, Timing.id).limit(limit + 1)
+
+    result = await session.execute(query)
+    rows = result.all()
+    page = rows[:limit]
+    next_cursor = None
+    if len(rows) > limit:
+        next_cursor = encode_cursor({"date": page[-1].timing_date.isoformat(), "id": page[-1].id})
+
+    return ModelResponse(TimesheetEntriesPage(
+        items=[TimesheetEntry(id=row.id, timing_date=row.timing_date, executor_uuid=row.executor_uuid,
+                              order_serial=row.order_serial, task_id=row.task_id, task_name=row.task_name,
+                              hours=round(float(row.hours), 2))
+               for row in page],
+        next_cursor=next_cursor,
+    ))
@@ -0,0 +1,104 @@
+# routers/timing_router.py
+"""
+Тут функции - роутеры для таймингов (учёт потраченного на задачи времени)
+"""
+from fastapi import APIRouter, Depends, HTTPException
+from sqlalchemy import select, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from loguru import logger
+
+from auth.jwt_auth import get_current_auth_user
+from database import get_async_db
+from models import Timing, Task, Order, Person
+from models import User as UserModel
+from schemas.timing_schem import TimingBulkRequest, TimingBulkResponse, TimingRead, TaskActualDuration
+from utils.change_feed import publish_changes, make_event
+from utils.order_tracking import touch_orders, refresh_order_summaries
+from utils.data_versions import commit_and_bump
+from utils.responses import ModelResponse
+from utils.task_durations import timing_deltas, apply_duration_deltas
+
+router = APIRouter(
+    prefix="/timings",
+    tags=["timings"],
+)
+
+
+@router.post("/bulk", response_model=TimingBulkResponse)
+async def create_timings_bulk(
+        request: TimingBulkRequest,
+        session: AsyncSession = Depends(get_async_db),
+        current_user: UserModel = Depends(get_current_auth_user)
+):
+    """
+    Добавить пачку таймингов (например, неделю работы) за одну транзакцию.
+
+    Задачи, заказы и исполнители проверяются тремя запросами IN (...), все тайминги
+    вставляются одним многострочным INSERT ... RETURNING, затем добавленное время прибавляется
+    к actual_duration задач и их родительских задач одним UPDATE (см. utils.task_durations).
+    Если хоть одна строка не прошла проверку - не добавляется ничего.
+
+    Параметры:
+    - request: до 1000 таймингов (задача, заказ задачи или пусто, исполнитель, время, дата)
+
+    Возвращает: добавленные тайминги в порядке запроса и новую фактическую длительность задач
+    (включая родительские)
+    """
+    items = request.items
+    task_ids = {item.task_id for item in items}
+    executor_ids = {item.executor_id for item in items}
+
+    task_orders = dict((await session.execute(
+        select(Task.id, Task.order_serial).where(Task.id.in_(task_ids))
+    )).tuples().all())
+    missing_tasks = task_ids - task_orders.keys()
+    if missing_tasks:
+        raise HTTPException(status_code=404, detail=f"Task not found: {sorted(missing_tasks)}")
+
+    rows = []
+    for position, item in enumerate(items):
+        order_serial = item.order_serial or task_orders[item.task_id]
+        if order_serial != task_orders[item.task_id]:
+            raise HTTPException(status_code=400, detail=f"Item {position}: task {item.task_id} "
+                                                        f"does not belong to order {order_serial}")
+        rows.append({"order_serial": order_serial, "task_id": item.task_id, "executor_id": item.executor_id,
+                     "time": item.time, "timing_date": item.timing_date})
+
+    order_serials = {row["order_serial"] for row in rows}
+    found_orders = set((await session.execute(
+        select(Order.serial).where(Order.serial.in_(order_serials))
+    )).scalars())
+    missing_orders = order_serials - found_orders
+    if missing_orders:
+        raise HTTPException(status_code=404, detail=f"Order not found: {sorted(missing_orders)}")
+
+    found_executors = set((await session.execute(
+        select(Person.uuid).where(Person.uuid.in_(executor_ids))
+    )).scalars())
+    missing_executors = executor_ids - found_executors
+    if missing_executors:
+        raise HTTPException(status_code=404, detail=f"Person not found: {sorted(map(str, missing_executors))}")
+
+    # Пачка до 1000 строк уходит одним многострочным INSERT (insertmanyvalues),
+    # sort_by_parameter_order - строки RETURNING в порядке запроса
+    result = await session.execute(
+        insert(Timing).returning(Timing.id, Timing.order_serial, Timing.task_id, Timing.executor_id, Timing.time,
+                                 Timing.timing_date, sort_by_parameter_order=True),
+        rows,
+    )
+    created = [TimingRead.model_validate(row, from_attributes=True) for row in result]
+
+    deltas = timing_deltas((timing.task_id, timing.time) for timing in created)
+    updated_tasks = sorted(await apply_duration_deltas(session, deltas))
+    await touch_orders(session, order_serials | {task.order_serial for task in updated_tasks})
+    await refresh_order_summaries(session, order_serials)
+    await publish_changes(session, [
+        make_event("task", "updated", task.id, task.order_serial) for task in updated_tasks
+    ])
+    await commit_and_bump(session)
+
+    logger.info(f"User {current_user.username} added {len(created)} timings for tasks {sorted(task_ids)}")
+    return ModelResponse(TimingBulkResponse(
+        items=created,
+        tasks=[TaskActualDuration(task_id=task.id, actual_duration=task.actual_duration) for task in updated_tasks],
+    ))
@@ -0,0 +1,48 @@
+# schemas/analytics_schem.py
+"""
+Схемы для аналитики
+"""
+
+from pydantic import BaseModel
+from typing import List, Optional
+from datetime import datetime
+
+
+class FinanceTotals(BaseModel):
+    """
+    Финансовые итоги по группе заказов.
+    *_cost - плановая сумма, *_cost_fact - фактическая,
+    *_unpaid - плановая сумма по заказам, где флаг оплаты ещё не выставлен
+    """
+    orders_count: int = 0
+    materials_cost: int = 0
+    materials_cost_fact: int = 0
+    materials_unpaid: int = 0
+    products_cost: int = 0
+    products_cost_fact: int = 0
+    products_unpaid: int = 0
+    work_cost: int = 0
+    work_cost_fact: int = 0
+    work_unpaid: int = 0
+    debt: int = 0
+    debt_fact: int = 0
+    debt_unpaid: int = 0
+
+
+class FinanceByStatus(FinanceTotals):
+    status_id: int
+
+
+class FinanceByCustomer(FinanceTotals):
+    customer_id: int
+
+
+class FinanceByMonth(FinanceTotals):
+    month: Optional[datetime] = None  # Первое число месяца начала заказа, None - дата начала не указана
+
+
+class FinanceAnalyticsResponse(BaseModel):
+    total: FinanceTotals
+    by_status: List[FinanceByStatus] = []
+    by_customer: List[FinanceByCustomer] = []
+    by_month: List[FinanceByMonth] = []
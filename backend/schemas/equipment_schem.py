@@ -0,0 +1,92 @@
+# schemas/equipment_schem.py
+"""
+Схемы для каталога оборудования
+"""
+
+from pydantic import BaseModel, ConfigDict, Field
+from typing import Annotated, List, Literal, Optional, Union
+from datetime import date
+
+
+class EquipmentSearchItem(BaseModel):
+    """Строка каталога: колонки оборудования и имена справочников"""
+    id: int
+    name: str
+    model: Optional[str] = None
+    vendor_code: Optional[str] = None
+    description: Optional[str] = None
+    type_id: Optional[int] = None
+    type_name: Optional[str] = None
+    manufacturer_id: Optional[int] = None
+    manufacturer_name: Optional[str] = None
+    price: Optional[int] = None
+    currency_id: Optional[int] = None
+    currency_name: Optional[str] = None
+    relevance: Optional[bool] = None
+    price_date: Optional[date] = None
+    discriminator: Optional[str] = None  # "equipment", "control_cabinet", ...
+
+
+class FacetBucket(BaseModel):
+    id: Optional[int] = None  # None - значение не указано
+    name: Optional[str] = None
+    count: int
+
+
+class EquipmentFacets(BaseModel):
+    """
+    Количество найденного оборудования по типам и производителям.
+    Фасет не учитывает собственный фильтр (типы считаются с фильтром по производителям и наоборот),
+    чтобы клиент мог показать, сколько добавится при выборе ещё одного значения.
+    """
+    types: List[FacetBucket] = []
+    manufacturers: List[FacetBucket] = []
+
+
+class EquipmentSearchResponse(BaseModel):
+    items: List[EquipmentSearchItem]
+    next_cursor: Optional[str] = None  # None - это последняя страница
+    total: Optional[int] = None  # Только на первой странице, вместе с фасетами
+    facets: Optional[EquipmentFacets] = None
+
+
+class EquipmentRead(BaseModel):
+    """Оборудование без подкласса: только колонки таблицы equipment"""
+    model_config = ConfigDict(from_attributes=True)
+
+    discriminator: Literal["equipment"] = "equipment"
+    id: int
+    name: str
+    model: Optional[str] = None
+    vendor_code: Optional[str] = None
+    description: Optional[str] = None
+    type_id: Optional[int] = None
+    manufacturer_id: Optional[int] = None
+    price: Optional[int] = None
+    currency_id: Optional[int] = None
+    relevance: Optional[bool] = None
+    price_date: Optional[date] = None
+
+
+class ControlCabinetRead(EquipmentRead):
+    """Корпус шкафа автоматики: колонки equipment и control_cabinets"""
+    discriminator: Literal["control_cabinet"] = "control_cabinet"
+    material_id: int
+    ip_id: int
+    height: int
+    width: int
+    depth: int
+
+
+# Схема по значению discriminator; при добавлении подкласса Equipment добавить сюда его схему
+EQUIPMENT_READ_SCHEMAS = {
+    "equipment": EquipmentRead,
+    "control_cabinet": ControlCabinetRead,
+}
+
+EquipmentDetails = Annotated[Union[EquipmentRead, ControlCabinetRead], Field(discriminator="discriminator")]
+
+
+class EquipmentPage(BaseModel):
+    items: List[EquipmentDetails]
+    next_cursor: Optional[str] = None  # None - это последняя страница
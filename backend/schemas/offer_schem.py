@@ -0,0 +1,67 @@
+# schemas/offer_schem.py
+"""
+Схемы для расчёта коммерческого предложения
+"""
+
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import date
+from decimal import Decimal
+
+from schemas.pricing_schem import BillItem
+
+
+class OfferRequest(BaseModel):
+    """Спецификация: позиции оборудования с количеством (повторы позиции складываются)"""
+    items: List[BillItem] = Field(..., min_length=1, max_length=2000)
+    as_of: Optional[date] = None  # Дата курсов, по умолчанию сегодня
+
+
+class CabinetSpec(BaseModel):
+    """Параметры корпуса шкафа автоматики"""
+    material: Optional[str] = None
+    ip: Optional[str] = None
+    height: int
+    width: int
+    depth: int
+
+
+class OfferLine(BaseModel):
+    equipment_id: int
+    name: str
+    model: Optional[str] = None
+    vendor_code: Optional[str] = None
+    type_id: Optional[int] = None
+    type_name: Optional[str] = None
+    manufacturer_id: Optional[int] = None
+    manufacturer_name: Optional[str] = None
+    quantity: float
+    price: Optional[int] = None  # Цена за единицу в валюте оборудования
+    currency: Optional[str] = None
+    rate: Optional[float] = None
+    rate_date: Optional[date] = None
+    base_price: Optional[float] = None  # Цена за единицу в базовой валюте, None - нет цены или курса
+    base_total: Optional[float] = None
+    cabinet: Optional[CabinetSpec] = None  # Только для корпусов шкафов
+
+
+class OfferGroup(BaseModel):
+    """Итог по типу оборудования и производителю"""
+    type_id: Optional[int] = None
+    type_name: Optional[str] = None
+    manufacturer_id: Optional[int] = None
+    manufacturer_name: Optional[str] = None
+    lines: int
+    quantity: float
+    base_total: float  # Сумма строк группы с ценой
+
+
+class OfferResponse(BaseModel):
+    offer_hash: str  # sha256 состава, даты и версии цен; одинаковый хэш - одинаковый результат
+    as_of: date
+    base_currency: str
+    lines: List[OfferLine]  # По типу, производителю и имени
+    groups: List[OfferGroup]
+    total: float  # Сумма строк с ценой
+    unpriced: List[int] = []  # Оборудование без цены или без курса валюты на дату, в total не входит
+    unknown: List[int] = []  # ID, которых нет в каталоге
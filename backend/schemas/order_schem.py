@@ -11,7 +11,7 @@ from pydantic import ConfigDict
 
 from schemas.person_schem import PersonSchema
 from schemas.work_schem import WorkSchema
-from datetime import datetime
+from datetime import datetime, timedelta
 from schemas.task_schem import TaskRead
 from schemas.timing_schem import TimingSchema
 
@@ -99,6 +99,12 @@ class OrderRead(BaseModel):
     debt_fact: Optional[int] = None
     debt_paid: bool
     works: List[WorkSchema] = []  # Список работ, по умолчанию пустой
+    # Сводка по задачам, комментариям и таймингам (хранится в заказе)
+    task_count: Optional[int] = None
+    open_task_count: Optional[int] = None  # Не завершены и не отменены
+    comment_count: Optional[int] = None
+    logged_time: Optional[timedelta] = None  # Сумма таймингов
+    last_activity_at: Optional[datetime] = None  # Последний комментарий или дата последнего тайминга
 
     # Оставляем from_attributes, тк другие поля могут мапиться
     model_config = ConfigDict(from_attributes=True)
@@ -44,6 +44,8 @@ class PersonCanBe(BaseModel):
     can_be_assembler: bool = False
     can_be_programmer: bool = False
     can_be_tester: bool = False
+    fio: Optional[str] = None  # "Фамилия Имя Отчество" для отображения
+
     class Config:
         """
         Конфигурация модели
@@ -56,6 +58,17 @@ class PersonSchema(BaseModel):
     name: str
     surname: str
     patronymic: Optional[str] = None
+    fio: Optional[str] = None  # "Фамилия Имя Отчество" для отображения
 
     class Config:
-        from_attributes = True
\ No newline at end of file
+        from_attributes = True
+
+class PersonWorkload(BaseModel):
+    """Нагрузка исполнителя: открытые задачи и время по таймингам за период"""
+    executor_uuid: UUID
+    fio: Optional[str] = None  # None - человека нет в справочнике
+    active: Optional[bool] = None
+    open_tasks: int = 0  # Задачи не в статусах "Завершена" и "Отменена"
+    overdue_tasks: int = 0  # Открытые задачи с прошедшим дедлайном
+    planned_hours: float = 0.0  # Плановое время открытых задач
+    logged_hours: float = 0.0  # Время по таймингам за последние days дней
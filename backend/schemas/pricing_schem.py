@@ -0,0 +1,64 @@
+# schemas/pricing_schem.py
+"""
+Схемы для курсов валют и расчёта цен в базовой валюте
+"""
+
+from pydantic import BaseModel, Field
+from typing import List, Optional
+from datetime import date
+from decimal import Decimal
+
+
+class CurrencyRateIn(BaseModel):
+    """Курс валюты на дату: сколько единиц базовой валюты стоит одна единица валюты"""
+    currency_id: int
+    rate_date: date
+    rate: Decimal = Field(..., gt=0, max_digits=18, decimal_places=6)
+
+
+class CurrencyRateRead(BaseModel):
+    currency_id: int
+    currency: str
+    rate_date: Optional[date] = None  # None - базовая валюта
+    rate: float
+
+
+class PriceListItem(BaseModel):
+    equipment_id: int
+    price: Optional[int] = None  # Цена в валюте оборудования
+    currency: Optional[str] = None
+    rate: Optional[float] = None
+    rate_date: Optional[date] = None  # Дата использованного курса, None - базовая валюта или курса нет
+    base_price: Optional[float] = None  # Цена в базовой валюте, None - нет цены или курса
+
+
+class PriceListResponse(BaseModel):
+    as_of: date
+    base_currency: str
+    price_version: str  # Версия курсов и каталога (utils.pricing.price_version)
+    items: List[PriceListItem]
+
+
+class BillItem(BaseModel):
+    equipment_id: int
+    quantity: Decimal = Field(..., gt=0, max_digits=12, decimal_places=3)
+
+
+class BillRequest(BaseModel):
+    """Спецификация (коммерческое предложение): позиции оборудования и их количество"""
+    items: List[BillItem] = Field(..., min_length=1, max_length=1000)
+    as_of: Optional[date] = None  # Дата курсов, по умолчанию сегодня
+
+
+class BillLineRead(PriceListItem):
+    quantity: float
+    base_total: Optional[float] = None  # base_price * quantity, None - нет цены или курса
+
+
+class BillResponse(BaseModel):
+    as_of: date
+    base_currency: str
+    lines: List[BillLineRead]
+    total: float  # Сумма строк с ценой
+    unpriced: List[int] = []  # Оборудование без цены или без курса валюты на дату, в total не входит
+    unknown: List[int] = []  # ID, которых нет в каталоге
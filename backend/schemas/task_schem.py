@@ -3,9 +3,10 @@
 Схемы для заказов
 """
 
-from pydantic import BaseModel
+from pydantic import BaseModel, Field
 from typing import Optional, List
 from datetime import datetime, timedelta
+from uuid import UUID
 from schemas.person_schem import PersonSchema
 
 class TaskStatusSchema(BaseModel):
@@ -61,3 +62,22 @@ class PaginatedTaskResponse(BaseModel):
     limit: int
     skip: int
     data: List[TaskRead]
+
+
+class TaskChanges(BaseModel):
+    """
+    Изменения одной задачи для пакетного обновления.
+    Обновляются только переданные поля, явный null очищает поле (кроме name и status_id).
+    """
+    status_id: Optional[int] = Field(None, ge=1, le=5)
+    name: Optional[str] = Field(None, min_length=1, max_length=128)
+    description: Optional[str] = Field(None, max_length=1024)
+    executor_uuid: Optional[UUID] = None
+    planned_duration: Optional[str] = Field(None, description="ISO 8601, например P1DT2H30M")
+    start_moment: Optional[datetime] = None
+    deadline_moment: Optional[datetime] = None
+
+
+class TaskBatchItem(BaseModel):
+    task_id: int
+    changes: TaskChanges
@@ -3,9 +3,9 @@
 Схемы для таймингов
 """
 
-from pydantic import BaseModel, field_validator
-from typing import Optional
-from datetime import datetime, timedelta
+from pydantic import BaseModel, Field, field_validator
+from typing import List, Optional
+from datetime import date, datetime, timedelta
 import uuid
 
 
@@ -19,3 +19,86 @@ class TimingSchema(BaseModel):
 
     class Config:
         from_attributes = True
+
+
+class TimesheetRow(BaseModel):
+    """Время исполнителя за один день, неделю или месяц"""
+    executor_uuid: Optional[uuid.UUID] = None  # None - тайминги без исполнителя
+    fio: Optional[str] = None
+    period_start: date  # Первый день периода (для недели - понедельник)
+    hours: float
+    entries: int
+
+
+class TimesheetTotal(BaseModel):
+    """Время исполнителя за весь запрошенный диапазон"""
+    executor_uuid: Optional[uuid.UUID] = None
+    fio: Optional[str] = None
+    hours: float
+    entries: int
+
+
+class TimesheetResponse(BaseModel):
+    date_from: date
+    date_to: date
+    group_by: str  # "day", "week" или "month"
+    rows: List[TimesheetRow]  # По ФИО и периоду
+    totals: List[TimesheetTotal]  # По ФИО
+    total_hours: float
+
+
+class TimesheetEntry(BaseModel):
+    id: int
+    timing_date: date
+    executor_uuid: Optional[uuid.UUID] = None
+    order_serial: str
+    task_id: int
+    task_name: Optional[str] = None
+    hours: float
+
+
+class TimesheetEntriesPage(BaseModel):
+    items: List[TimesheetEntry]
+    next_cursor: Optional[str] = None  # None - это последняя страница
+
+
+class TimingCreate(BaseModel):
+    """Тайминг для пакетного добавления; order_serial можно не указывать - берётся заказ задачи"""
+    task_id: int
+    order_serial: Optional[str] = None
+    executor_id: uuid.UUID
+    time: timedelta  # ISO 8601 (PT2H30M) или число секунд
+    timing_date: date
+
+    @field_validator('time')
+    def validate_time(cls, v):  # noqa
+        """
+        проверка длительности: больше нуля и не больше суток
+        """
+        if v <= timedelta(0) or v > timedelta(days=1):
+            raise ValueError("Time must be positive and not longer than 24 hours")
+        return v
+
+
+class TimingBulkRequest(BaseModel):
+    items: List[TimingCreate] = Field(..., min_length=1, max_length=1000)
+
+
+class TimingRead(BaseModel):
+    id: int
+    order_serial: str
+    task_id: int
+    executor_id: Optional[uuid.UUID] = None
+    time: timedelta
+    timing_date: date
+
+
+class TaskActualDuration(BaseModel):
+    """Фактическая длительность задачи (сумма её таймингов) после добавления"""
+    task_id: int
+    actual_duration: Optional[timedelta] = None
+
+
+class TimingBulkResponse(BaseModel):
+    items: List[TimingRead]  # В порядке запроса
+    tasks: List[TaskActualDuration]
@@ -0,0 +1,64 @@
+# tests/test_order_list_etag.py
+"""
+ETag списка заказов (/order/read) меняется после создания заказа.
+
+Выполняется только на тестовой базе из TEST_DATABASE_URL (см. tests/conftest.py).
+Все строки, которые тест добавляет (заказ, контрагент, недостающий статус), он же и удаляет.
+"""
+import uuid
+
+import pytest
+
+from conftest import add_missing, require_test_database
+
+require_test_database()
+
+from fastapi.testclient import TestClient
+from sqlalchemy import delete
+
+from database import SyncSession
+from main import app
+from models import Counterparty, CounterpartyForm, DataVersion, Order, OrderStatus
+from utils.data_versions import ORDERS
+
+
+@pytest.fixture
+def customer_id():
+    """Контрагент для нового заказа; после теста удаляются он и созданные на нём заказы"""
+    suffix = uuid.uuid4().hex[:12]
+    created = []
+    with SyncSession() as session:
+        add_missing(session, OrderStatus, created, id=1, name=f"test-status-{suffix}")
+        had_list_version = session.get(DataVersion, ORDERS) is not None
+        form = CounterpartyForm(name=f"test-form-{suffix}")
+        customer = Counterparty(name=f"test-customer-{suffix}", form=form)
+        session.add(customer)
+        session.commit()
+        ids = customer.id, form.id
+
+    yield ids[0]
+
+    with SyncSession() as session:
+        session.execute(delete(Order).where(Order.customer_id == ids[0]))
+        session.execute(delete(Counterparty).where(Counterparty.id == ids[0]))
+        session.execute(delete(CounterpartyForm).where(CounterpartyForm.id == ids[1]))
+        for model, row_id in created:
+            session.execute(delete(model).where(model.id == row_id))
+        if not had_list_version:
+            session.execute(delete(DataVersion).where(DataVersion.name == ORDERS))
+        session.commit()
+
+
+def test_create_order_changes_list_etag(customer_id):
+    with TestClient(app) as client:
+        before = client.get("/order/read")
+        assert before.status_code == 200
+        etag = before.headers["etag"]
+        assert client.get("/order/read", headers={"If-None-Match": etag}).status_code == 304
+
+        created = client.post("/order/create", json={"name": "test-order", "customer_id": customer_id, "status_id": 1})
+        assert created.status_code == 201, created.text
+
+        after = client.get("/order/read", headers={"If-None-Match": etag})
+        assert after.status_code == 200
+        assert after.headers["etag"] != etag
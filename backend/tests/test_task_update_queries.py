@@ -0,0 +1,120 @@
+# tests/test_task_update_queries.py
+"""
+Число SQL-запросов при изменении одной задачи (routers.task_router.apply_task_update).
+
+Выполняется только на тестовой базе из TEST_DATABASE_URL (см. tests/conftest.py).
+Все строки, которые тест добавляет (заказ, задачи, контрагент, недостающие статусы), он же и удаляет.
+"""
+import asyncio
+import uuid
+
+import pytest
+
+from conftest import add_missing, require_test_database
+
+require_test_database()
+
+from sqlalchemy import delete, select, text
+
+from database import SyncSession, async_session_maker, get_async_engine, on_async_engine_created
+from models import Counterparty, CounterpartyForm, DataVersion, Order, OrderStatus, Task, TaskStatus
+from routers.task_router import apply_task_update
+from utils.data_versions import ORDERS
+from utils.instrumentation import RequestStats, current_request_stats, install_sqlalchemy_hooks
+from utils.order_tracking import refresh_order_summaries_sync
+
+# UPDATE задачи, версия заказа, сводка заказа (при смене статуса), NOTIFY, SELECT задачи со связями
+# и увеличение глобальной версии заказов после commit
+MAX_STATEMENTS = 6
+OPEN_STATUS, CLOSED_STATUS = 1, 4
+
+on_async_engine_created(install_sqlalchemy_hooks)
+
+
+@pytest.fixture(scope="module")
+def order_tasks():
+    """Заказ с двумя открытыми задачами: (номер заказа, [id задач])"""
+    suffix = uuid.uuid4().hex[:12]
+    serial = f"T-{suffix}"
+    created = []
+    with SyncSession() as session:
+        add_missing(session, OrderStatus, created, id=1, name=f"test-status-{suffix}")
+        add_missing(session, TaskStatus, created, id=OPEN_STATUS, name=f"test-open-{suffix[:6]}")
+        add_missing(session, TaskStatus, created, id=CLOSED_STATUS, name=f"test-closed-{suffix[:4]}")
+        had_list_version = session.get(DataVersion, ORDERS) is not None
+        form = CounterpartyForm(name=f"test-form-{suffix}")
+        customer = Counterparty(name=f"test-customer-{suffix}", form=form)
+        session.add(Order(serial=serial, name=f"test-order-{suffix}", customer=customer, status_id=1))
+        tasks = [Task(name=f"test-task-{n}", order_serial=serial, status_id=OPEN_STATUS) for n in range(2)]
+        session.add_all(tasks)
+        session.flush()
+        refresh_order_summaries_sync(session, [serial])
+        session.commit()
+        task_ids = [task.id for task in tasks]
+        customer_id, form_id = customer.id, form.id
+
+    yield serial, task_ids
+
+    with SyncSession() as session:
+        session.execute(delete(Task).where(Task.id.in_(task_ids)))
+        session.execute(delete(Order).where(Order.serial == serial))
+        session.execute(delete(Counterparty).where(Counterparty.id == customer_id))
+        session.execute(delete(CounterpartyForm).where(CounterpartyForm.id == form_id))
+        for model, row_id in created:
+            session.execute(delete(model).where(model.id == row_id))
+        if not had_list_version:
+            session.execute(delete(DataVersion).where(DataVersion.name == ORDERS))
+        session.commit()
+
+
+def _order_state(serial: str):
+    with SyncSession() as session:
+        order = session.execute(select(Order.version, Order.open_task_count).where(Order.serial == serial)).one()
+        list_version = session.execute(select(DataVersion.version).where(DataVersion.name == ORDERS)).scalar()
+    return order.version, order.open_task_count, list_version or 0
+
+
+def _update_task(task_id: int, **values):
+    """apply_task_update с подсчётом запросов, как в HTTP-запросе (utils.instrumentation)"""
+
+    async def run():
+        stats = RequestStats()
+        try:
+            async with async_session_maker() as session:
+                # Соединение и начало транзакции - вне подсчёта
+                await session.execute(text("SELECT 1"))
+                token = current_request_stats.set(stats)
+                try:
+                    task = await apply_task_update(session, task_id, **values)
+                finally:
+                    current_request_stats.reset(token)
+        finally:
+            # Соединения asyncpg привязаны к циклу событий asyncio.run
+            await get_async_engine().dispose()
+        return task, stats
+
+    return asyncio.run(run())
+
+
+def test_status_update_statement_budget(order_tasks):
+    serial, (task_id, _) = order_tasks
+    version, open_tasks, list_version = _order_state(serial)
+
+    task, stats = _update_task(task_id, status_id=CLOSED_STATUS)
+
+    assert stats.statements <= MAX_STATEMENTS, stats.slowest_statement
+    assert task.status_id == CLOSED_STATUS
+    assert task.order.serial == serial
+    # Версия заказа, глобальная версия заказов и число открытых задач
+    assert _order_state(serial) == (version + 1, open_tasks - 1, list_version + 1)
+
+
+def test_field_update_keeps_summary(order_tasks):
+    serial, (_, task_id) = order_tasks
+    version, open_tasks, list_version = _order_state(serial)
+
+    task, stats = _update_task(task_id, name="renamed")
+
+    assert stats.statements <= MAX_STATEMENTS, stats.slowest_statement
+    assert task.name == "renamed"
+    assert _order_state(serial) == (version + 1, open_tasks, list_version + 1)
@@ -0,0 +1,59 @@
+# utils/cache.py
+"""
+Простой кэш в памяти процесса для тяжёлых запросов чтения.
+Значения хранятся до истечения TTL или до явной инвалидации (например, после изменения курсов валют).
+"""
+import time
+from typing import Any, Dict, Hashable, List, Optional, Tuple
+
+
+class InMemoryCache:
+    """
+    Кэш "ключ -> значение" с ограничением по времени жизни и по количеству записей.
+    Ведёт счётчики попаданий и промахов, чтобы их можно было выводить в метриках.
+    """
+
+    def __init__(self, name: str, ttl_seconds: Optional[float] = None, max_items: int = 128):
+        self.name = name
+        self.ttl_seconds = ttl_seconds
+        self.max_items = max_items
+        self.hits = 0
+        self.misses = 0
+        self._items: Dict[Hashable, Tuple[float, Any]] = {}
+        CACHES.append(self)
+
+    def get(self, key: Hashable) -> Optional[Any]:
+        """Вернуть значение по ключу или None, если его нет или оно устарело"""
+        item = self._items.get(key)
+        if item is not None:
+            stored_at, value = item
+            if self.ttl_seconds is None or time.monotonic() - stored_at < self.ttl_seconds:
+                self.hits += 1
+                return value
+            self._items.pop(key, None)
+        self.misses += 1
+        return None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """Сохранить значение. При переполнении выбрасывается самая старая запись"""
+        if key not in self._items and len(self._items) >= self.max_items:
+            oldest_key = min(self._items, key=lambda k: self._items[k][0])
+            self._items.pop(oldest_key, None)
+        self._items[key] = (time.monotonic(), value)
+
+    def invalidate(self, key: Optional[Hashable] = None) -> None:
+        """Удалить одну запись или, если ключ не указан, очистить весь кэш"""
+        if key is None:
+            self._items.clear()
+        else:
+            self._items.pop(key, None)
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+# Все созданные кэши, нужно для вывода статистики
+CACHES: List[InMemoryCache] = []
+
+# Кэш финансовой аналитики по заказам с ключом (версия заказов utils.data_versions.ORDERS, show_ended)
+finance_cache = InMemoryCache("finance_analytics", ttl_seconds=300, max_items=16)
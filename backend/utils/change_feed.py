@@ -0,0 +1,176 @@
+# utils/change_feed.py
+"""
+Лента изменений: уведомления клиентов о создании и изменении заказов, задач и комментариев.
+
+Роутеры вызывают publish_change в той же транзакции, что и само изменение.
+Событие уходит подписчикам только после commit (при rollback - не уходит).
+
+Две реализации шины:
+- PostgresChangeBus: pg_notify внутри транзакции и LISTEN на отдельном соединении asyncpg,
+  события получают подписчики всех процессов (воркеров) приложения;
+- InProcessChangeBus: события рассылаются после commit только внутри текущего процесса,
+  без базы (тесты, запуск в один воркер).
+Выбирается настройкой change_feed_backend ("postgres" или "memory").
+"""
+import asyncio
+import logging
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Dict, List, Optional, Set
+
+import asyncpg
+import orjson
+from sqlalchemy import event, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from config import DB_HOST, DB_NAME, DB_PASS, DB_PORT, DB_USER, settings
+
+logger = logging.getLogger(__name__)
+
+# Канал LISTEN/NOTIFY
+CHANNEL = "kis3_changes"
+# Ключ в session.info для событий, ожидающих commit (InProcessChangeBus)
+PENDING_KEY = "change_feed_pending"
+
+NOTIFY_STATEMENT = text("SELECT pg_notify(:channel, payload) FROM unnest(CAST(:payloads AS text[])) AS payload")
+
+
+def make_event(entity: str, action: str, entity_id: Any, order_serial: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Событие ленты изменений.
+
+    Параметры:
+    - entity: "order", "task" или "comment"
+    - action: "created" или "updated"
+    - entity_id: идентификатор изменённого объекта
+    - order_serial: заказ, к которому относится объект (для заказа - он сам)
+    """
+    return {"entity": entity, "action": action, "id": entity_id, "order_serial": order_serial}
+
+
+class InProcessChangeBus:
+    """Шина внутри процесса: подписчик - asyncio.Queue, медленные подписчики теряют события"""
+
+    def __init__(self, queue_size: int = 256):
+        self.queue_size = queue_size
+        self._subscribers: Set[asyncio.Queue] = set()
+        self.dropped = 0  # Событий не доставлено из-за переполненной очереди подписчика
+
+    @property
+    def subscribers(self) -> int:
+        return len(self._subscribers)
+
+    async def start(self) -> None:
+        pass
+
+    async def stop(self) -> None:
+        pass
+
+    async def publish(self, session: AsyncSession, changes: List[Dict[str, Any]]) -> None:
+        """Отложить события до commit сессии (см. _dispatch_after_commit)"""
+        session.info.setdefault(PENDING_KEY, []).extend(changes)
+
+    def dispatch(self, change: Dict[str, Any]) -> None:
+        """Разослать событие всем подписчикам процесса"""
+        for queue in list(self._subscribers):
+            try:
+                queue.put_nowait(change)
+            except asyncio.QueueFull:
+                self.dropped += 1
+
+    @asynccontextmanager
+    async def subscribe(self) -> AsyncIterator[asyncio.Queue]:
+        """Подписаться на события; очередь удаляется при выходе из контекста"""
+        queue: asyncio.Queue = asyncio.Queue(maxsize=self.queue_size)
+        self._subscribers.add(queue)
+        try:
+            yield queue
+        finally:
+            self._subscribers.discard(queue)
+
+
+class PostgresChangeBus(InProcessChangeBus):
+    """Шина через LISTEN/NOTIFY: события видят все процессы, подключённые к той же базе"""
+
+    def __init__(self, queue_size: int = 256, reconnect_delay: float = 5.0):
+        super().__init__(queue_size)
+        self.reconnect_delay = reconnect_delay
+        self._listener_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._listener_task = asyncio.create_task(self._listen_forever())
+
+    async def stop(self) -> None:
+        if self._listener_task:
+            self._listener_task.cancel()
+            await asyncio.gather(self._listener_task, return_exceptions=True)
+            self._listener_task = None
+
+    async def publish(self, session: AsyncSession, changes: List[Dict[str, Any]]) -> None:
+        """NOTIFY внутри транзакции (один запрос на все события): Postgres доставит их только после commit"""
+        payloads = [orjson.dumps(change).decode("utf-8") for change in changes]
+        await session.execute(NOTIFY_STATEMENT, {"channel": CHANNEL, "payloads": payloads})
+
+    def _on_notification(self, _connection, _pid, _channel, payload: str) -> None:
+        try:
+            self.dispatch(orjson.loads(payload))
+        except orjson.JSONDecodeError:
+            logger.warning(f"Invalid change feed payload: {payload!r}")
+
+    async def _listen_forever(self) -> None:
+        """Держит отдельное соединение с LISTEN, при обрыве переподключается"""
+        while True:
+            connection = None
+            try:
+                connection = await asyncpg.connect(host=DB_HOST, port=int(DB_PORT), user=DB_USER,
+                                                   password=DB_PASS, database=DB_NAME)
+                lost = asyncio.Event()
+                connection.add_termination_listener(lambda _: lost.set())
+                await connection.add_listener(CHANNEL, self._on_notification)
+                logger.info(f"Change feed is listening on channel {CHANNEL}")
+                await lost.wait()
+                logger.warning("Change feed connection lost, reconnecting")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Change feed listener failed: {e}")
+            finally:
+                if connection is not None and not connection.is_closed():
+                    await connection.close()
+            await asyncio.sleep(self.reconnect_delay)
+
+
+def create_change_bus(backend: str) -> InProcessChangeBus:
+    if backend == "memory":
+        return InProcessChangeBus()
+    if backend == "postgres":
+        return PostgresChangeBus()
+    raise ValueError(f"Unknown change feed backend: {backend}")
+
+
+change_bus = create_change_bus(settings.change_feed_backend)
+
+
+async def publish_change(session: AsyncSession, entity: str, action: str, entity_id: Any,
+                         order_serial: Optional[str] = None) -> None:
+    """Опубликовать изменение; вызывать до commit в той же сессии"""
+    await change_bus.publish(session, [make_event(entity, action, entity_id, order_serial)])
+
+
+async def publish_changes(session: AsyncSession, changes: List[Dict[str, Any]]) -> None:
+    """Опубликовать несколько изменений (события из make_event); вызывать до commit в той же сессии"""
+    if changes:
+        await change_bus.publish(session, changes)
+
+
+@event.listens_for(Session, "after_commit")
+def _dispatch_after_commit(session: Session) -> None:
+    for change in session.info.pop(PENDING_KEY, ()):
+        change_bus.dispatch(change)
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session: Session, _previous_transaction) -> None:
+    # Откат вложенной транзакции (SAVEPOINT) не отменяет события внешней
+    if not session.in_transaction():
+        session.info.pop(PENDING_KEY, None)
@@ -0,0 +1,27 @@
+# utils/cursor.py
+"""
+Курсоры keyset-пагинации: значения ключа сортировки последней отданной строки,
+упакованные в непрозрачную для клиента строку (JSON в base64url без '=').
+"""
+import base64
+import binascii
+from typing import Any, Dict
+
+import orjson
+from fastapi import HTTPException
+
+
+def encode_cursor(values: Dict[str, Any]) -> str:
+    """Упаковать значения ключа сортировки (только JSON-типы) в курсор"""
+    return base64.urlsafe_b64encode(orjson.dumps(values)).decode("ascii").rstrip("=")
+
+
+def decode_cursor(cursor: str) -> Dict[str, Any]:
+    """Распаковать курсор; при неверном формате - HTTP 400"""
+    try:
+        values = orjson.loads(base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)))
+    except (binascii.Error, ValueError):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    if not isinstance(values, dict):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
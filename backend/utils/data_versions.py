@@ -0,0 +1,97 @@
+# utils/data_versions.py
+"""
+Глобальные версии данных для ключей кэшей и ETag (таблица data_versions).
+
+Версия - счётчик в отдельной строке. Запись данных не трогает его в своей транзакции
+(иначе блокировка одной строки выстроила бы все записи в очередь до commit), а только
+отмечает в сессии (mark_changed), какие версии устарели. commit_and_bump фиксирует данные
+и затем короткой отдельной транзакцией увеличивает отмеченные счётчики. Поэтому версия
+меняется уже после того, как новые данные видны, и кэш по новой версии не может сохранить
+старые данные; в отличие от max(updated_at) с now() (время начала транзакции) счётчик растёт
+при каждом commit. Счётчик общий для всех воркеров, так что изменение в одном воркере видят
+кэши остальных.
+"""
+import logging
+from typing import Iterable, Union
+
+from sqlalchemy import event, select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models import DataVersion
+
+logger = logging.getLogger(__name__)
+
+# Оборудование и справочники, видимые в прайс-листе и КП: типы, производители, валюты
+EQUIPMENT = "equipment"
+# Курсы валют для пересчёта цен (увеличивает PUT /pricing/rates)
+RATES = "rates"
+# Любое изменение, видимое в списке или карточке заказа (отмечает utils.order_tracking.touch_orders)
+ORDERS = "orders"
+
+# Ключ в session.info для версий, которые нужно увеличить после commit
+PENDING_KEY = "data_versions_pending"
+
+
+def bump_statement(names: Iterable[str]):
+    """INSERT ... ON CONFLICT: увеличить счётчики (строка создаётся при первом увеличении)"""
+    statement = insert(DataVersion).values([{"name": name, "version": 1} for name in sorted(names)])
+    return statement.on_conflict_do_update(
+        index_elements=[DataVersion.name],
+        set_={"version": DataVersion.version + 1},
+    )
+
+
+def version_query(name: str):
+    """Скалярный подзапрос: текущая версия (0, если её ещё ни разу не увеличивали)"""
+    return select(DataVersion.version).where(DataVersion.name == name).scalar_subquery()
+
+
+def mark_changed(session: Union[AsyncSession, Session], name: str) -> None:
+    """Отметить версию для увеличения после commit (см. commit_and_bump)"""
+    session.info.setdefault(PENDING_KEY, set()).add(name)
+
+
+async def commit_and_bump(session: AsyncSession) -> None:
+    """
+    Зафиксировать транзакцию и увеличить отмеченные в ней версии.
+    Ошибка увеличения только логируется: данные уже сохранены, и повтор запроса записал бы их второй раз
+    """
+    await session.commit()
+    names = session.info.pop(PENDING_KEY, None)
+    if not names:
+        return
+    try:
+        await session.execute(bump_statement(names))
+        await session.commit()
+    except Exception:
+        logger.exception("Failed to bump data versions %s", sorted(names))
+        await session.rollback()
+
+
+def commit_and_bump_sync(session: Session) -> None:
+    """Синхронный вариант для импорта"""
+    session.commit()
+    names = session.info.pop(PENDING_KEY, None)
+    if not names:
+        return
+    try:
+        session.execute(bump_statement(names))
+        session.commit()
+    except Exception:
+        logger.exception("Failed to bump data versions %s", sorted(names))
+        session.rollback()
+
+
+async def read_version(session: AsyncSession, name: str) -> int:
+    """Текущая версия"""
+    result = await session.execute(select(version_query(name)))
+    return result.scalar_one_or_none() or 0
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session: Session, _previous_transaction) -> None:
+    # Откат вложенной транзакции (SAVEPOINT) не отменяет отметки внешней
+    if not session.in_transaction():
+        session.info.pop(PENDING_KEY, None)
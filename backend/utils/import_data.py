@@ -41,6 +41,8 @@ from models import Currency  # noqa: E402
 from models import Person  # noqa: E402
 from models import Work  # noqa: E402
 from models import Order  # noqa: E402
+from utils.people_directory import format_fio  # noqa: E402
+from utils.task_durations import timing_deltas, apply_duration_deltas_sync  # noqa: E402
 
 # Инициализируем colorama
 init(autoreset=True)
@@ -828,9 +830,7 @@ def import_box_accounting_from_kis2() -> Dict[str, any]:
                 # Создаем вспомогательный словарь для поиска людей
                 persons_by_name = {}
                 for person in session.query(Person).all():
-                    full_name = f"{person.surname} {person.name}"
-                    if person.patronymic:
-                        full_name += f" {person.patronymic}"
+                    full_name = format_fio(person.surname, person.name, person.patronymic)
                     persons_by_name[full_name] = person.uuid
 
                 # Проходим по списку шкафов из КИС2
@@ -1018,9 +1018,7 @@ def import_tasks_from_kis2() -> Dict[str, any]:
                 # Получаем словарь персон для связи с исполнителями задач
                 persons_by_name = {}
                 for person in session.query(Person).all():
-                    full_name = f"{person.surname} {person.name}"
-                    if person.patronymic:
-                        full_name += f" {person.patronymic}"
+                    full_name = format_fio(person.surname, person.name, person.patronymic)
                     persons_by_name[full_name] = person.uuid
 
                 # Обрабатываем каждую задачу из КИС2
@@ -1065,7 +1063,7 @@ def import_tasks_from_kis2() -> Dict[str, any]:
                     # Преобразование длительностей из строки в timedelta
                     planned_duration = parse_iso_duration(task_data.get('planned_duration'))
                     print(task_data.get('planned_duration'), planned_duration)
-                    actual_duration = parse_iso_duration(task_data.get('actual_duration'))
+                    # actual_duration из КИС2 не переносим: колонку ведут тайминги (utils.task_durations)
 
                     # Получаем ссылки на родительскую и корневую задачи
                     parent_task_id = task_data.get('parent_task_id')
@@ -1102,10 +1100,6 @@ def import_tasks_from_kis2() -> Dict[str, any]:
                             task.planned_duration = planned_duration
                             needs_update = True
                             update_details.append("планируемая длительность")
-                        if task.actual_duration != actual_duration:
-                            task.actual_duration = actual_duration
-                            needs_update = True
-                            update_details.append("фактическая длительность")
                         if task.creation_moment != creation_moment:
                             task.creation_moment = creation_moment
                             needs_update = True
@@ -1150,7 +1144,6 @@ def import_tasks_from_kis2() -> Dict[str, any]:
                             status_id=status_id,
                             payment_status_id=payment_status_id,
                             planned_duration=planned_duration,
-                            actual_duration=actual_duration,
                             creation_moment=creation_moment,
                             start_moment=start_moment,
                             deadline_moment=end_moment,
@@ -1239,9 +1232,7 @@ def import_order_comments_from_kis2() -> Dict[str, any]:
                 # Создаем словарь для поиска людей по полному имени
                 persons_by_name = {}
                 for person in session.query(Person).all():
-                    full_name = f"{person.surname} {person.name}"
-                    if person.patronymic:
-                        full_name += f" {person.patronymic}"
+                    full_name = format_fio(person.surname, person.name, person.patronymic)
                     persons_by_name[full_name] = person.uuid
 
                 # Получаем все записи из таблицы OrderComment
@@ -1547,14 +1538,18 @@ def import_timings_from_kis2() -> Dict[str, any]:
                 # Создаем словарь для поиска людей по полному имени
                 persons_by_name = {}
                 for person in session.query(Person).all():
-                    full_name = f"{person.surname} {person.name}"
-                    if person.patronymic:
-                        full_name += f" {person.patronymic}"
+                    full_name = format_fio(person.surname, person.name, person.patronymic)
                     persons_by_name[full_name] = person.uuid
 
                 # Проверяем существование заказов и задач
-                existing_orders = set(serial[0] for serial in session.query(Order.serial).all())
-                existing_tasks = set(id[0] for id in session.query(Task.id).all())
+                # Заказы и задачи с их датами: из них берётся дата тайминга, если в КИС2 её нет
+                existing_orders = dict(session.query(Order.serial, Order.start_moment).all())
+                existing_tasks = {
+                    task_id: (end_moment, start_moment, creation_moment)
+                    for task_id, end_moment, start_moment, creation_moment in session.query(
+                        Task.id, Task.end_moment, Task.start_moment, Task.creation_moment
+                    ).all()
+                }
 
                 # Получаем существующие тайминги для проверки дубликатов
                 existing_timings = []
@@ -1566,6 +1561,9 @@ def import_timings_from_kis2() -> Dict[str, any]:
                         'timing_date': timing[3]
                     })
 
+                # (задача, время) добавленных таймингов для actual_duration
+                added_times = []
+
                 # Обрабатываем каждый тайминг из КИС2
                 for timing_data in kis2_timings_list:
                     order_serial = timing_data.get('order_serial')
@@ -1609,7 +1607,17 @@ def import_timings_from_kis2() -> Dict[str, any]:
                         try:
                             timing_date = datetime.strptime(date_str, "%Y-%m-%d").date()
                         except ValueError:
-                            print(Fore.YELLOW + f"Неверный формат даты '{date_str}' для тайминга. Используем None.")
+                            print(Fore.YELLOW + f"Неверный формат даты '{date_str}' для тайминга.")
+                    if timing_date is None:
+                        # Дата обязательна (ключ секционирования timings): берём завершение, начало или создание
+                        # задачи, иначе начало заказа. Без них тайминг пропускается: дата "сегодня" менялась бы
+                        # при каждом повторном импорте, и тайминг добавлялся бы заново
+                        moments = (*existing_tasks[task_id], existing_orders[order_serial])
+                        timing_date = next((moment.date() for moment in moments if moment), None)
+                        if timing_date is None:
+                            print(Fore.YELLOW + f"Тайминг без даты, у задачи {task_id} и заказа нет дат. Пропуск.")
+                            continue
+                        print(Fore.YELLOW + f"Тайминг без даты: используем {timing_date}.")
 
                     # Проверяем, существует ли тайминг с такими же параметрами
                     is_duplicate = False
@@ -1632,10 +1640,12 @@ def import_timings_from_kis2() -> Dict[str, any]:
                             timing_date=timing_date
                         )
                         session.add(new_timing)
+                        added_times.append((task_id, time_delta))
                         result['added'] += 1
                         print(Fore.GREEN + f"Добавлен новый тайминг: Заказ {order_serial}, Задача {task_id}, "
                                            f"Исполнитель {executor_name}, Время {time_str}, Дата {date_str}")
 
+                apply_duration_deltas_sync(session, timing_deltas(added_times))
                 return commit_and_summarize_import(session, result, "записей о затраченном времени")
             except Exception as e:
                 session.rollback()
@@ -0,0 +1,146 @@
+# utils/instrumentation.py
+"""
+Инструментирование запросов: сколько SQL-запросов выполняет эндпоинт и куда уходит время.
+
+- события SQLAlchemy before_cursor_execute / after_cursor_execute считают запросы и их длительность;
+- ASGI-middleware собирает статистику на каждый HTTP-запрос, отдаёт её в заголовке Server-Timing
+  и складывает в гистограммы utils.metrics;
+- при settings.debug_n_plus_one в лог пишутся предупреждения о повторяющихся запросах (N+1).
+"""
+import logging
+import time
+from collections import Counter
+from contextvars import ContextVar
+from typing import Optional
+
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from config import settings
+from utils.metrics import http_request_duration, http_request_db_statements, http_request_db_duration, \
+    http_response_serialization_duration
+
+logger = logging.getLogger(__name__)
+
+
+class RequestStats:
+    """Статистика одного HTTP-запроса"""
+
+    __slots__ = ("statements", "db_time", "slowest_statement", "slowest_time", "serialization_time",
+                 "statement_counts")
+
+    def __init__(self):
+        self.statements = 0
+        self.db_time = 0.0
+        self.slowest_statement: Optional[str] = None
+        self.slowest_time = 0.0
+        self.serialization_time = 0.0
+        self.statement_counts: Optional[Counter] = Counter() if settings.debug_n_plus_one else None
+
+    def add_statement(self, statement: str, duration: float) -> None:
+        self.statements += 1
+        self.db_time += duration
+        if duration > self.slowest_time:
+            self.slowest_time = duration
+            self.slowest_statement = statement
+        if self.statement_counts is not None:
+            self.statement_counts[statement] += 1
+
+    def server_timing(self, total: float) -> str:
+        """Значение заголовка Server-Timing, длительности в миллисекундах"""
+        parts = [
+            f'db;dur={self.db_time * 1000:.2f};desc="{self.statements} queries"',
+            f"db-slowest;dur={self.slowest_time * 1000:.2f}",
+            f"serialize;dur={self.serialization_time * 1000:.2f}",
+            f"total;dur={total * 1000:.2f}",
+        ]
+        return ", ".join(parts)
+
+
+# Статистика текущего HTTP-запроса, None вне запроса (фоновые задачи, импорт)
+current_request_stats: ContextVar[Optional[RequestStats]] = ContextVar("current_request_stats", default=None)
+
+
+def record_serialization(duration: float) -> None:
+    """Добавить время сериализации ответа к статистике текущего запроса"""
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.serialization_time += duration
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa
+    context.query_start_time = time.perf_counter()
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):  # noqa
+    stats = current_request_stats.get()
+    if stats is not None:
+        stats.add_statement(statement, time.perf_counter() - context.query_start_time)
+
+
+def install_sqlalchemy_hooks(engine: AsyncEngine) -> None:
+    """Подключить подсчёт SQL-запросов к движку (один раз при старте приложения)"""
+    sync_engine = engine.sync_engine
+    if not event.contains(sync_engine, "before_cursor_execute", _before_cursor_execute):
+        event.listen(sync_engine, "before_cursor_execute", _before_cursor_execute)
+        event.listen(sync_engine, "after_cursor_execute", _after_cursor_execute)
+
+
+class RequestMetricsMiddleware:
+    """
+    ASGI-middleware: заводит RequestStats на каждый HTTP-запрос,
+    добавляет заголовок Server-Timing и обновляет гистограммы.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        stats = RequestStats()
+        token = current_request_stats.set(stats)
+        started = time.perf_counter()
+        status_code = 500
+
+        async def send_wrapper(message):
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                headers = list(message.get("headers", []))
+                headers.append((b"server-timing", stats.server_timing(time.perf_counter() - started).encode()))
+                message["headers"] = headers
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            current_request_stats.reset(token)
+            self._observe(scope, stats, status_code, time.perf_counter() - started)
+
+    @staticmethod
+    def _observe(scope, stats: RequestStats, status_code: int, total: float) -> None:
+        route = scope.get("route")
+        # Шаблон пути (/order/detail/{serial}), чтобы не плодить метки на каждый serial
+        route_path = getattr(route, "path", None) or "unmatched"
+        method = scope.get("method", "")
+
+        http_request_duration.observe(total, method=method, route=route_path, status=status_code)
+        http_request_db_statements.observe(stats.statements, method=method, route=route_path)
+        http_request_db_duration.observe(stats.db_time, method=method, route=route_path)
+        http_response_serialization_duration.observe(stats.serialization_time, method=method, route=route_path)
+
+        if stats.statement_counts:
+            for statement, count in stats.statement_counts.items():
+                if count >= settings.n_plus_one_threshold:
+                    logger.warning(
+                        f"Possible N+1 in {method} {route_path}: statement executed {count} times: "
+                        f"{' '.join(statement.split())[:300]}"
+                    )
+        if stats.slowest_statement is not None:
+            logger.debug(
+                f"{method} {route_path}: {stats.statements} statements, db {stats.db_time * 1000:.1f} ms, "
+                f"slowest {stats.slowest_time * 1000:.1f} ms: {' '.join(stats.slowest_statement.split())[:300]}"
+            )
@@ -0,0 +1,244 @@
+# utils/metrics.py
+"""
+Метрики приложения, которые копятся в памяти процесса.
+"""
+import asyncio
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# Границы корзин по умолчанию для длительностей, секунды
+DEFAULT_TIME_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+# Границы корзин для количества SQL-запросов за один HTTP-запрос
+STATEMENT_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21, 34, 55, 100)
+
+
+class Histogram:
+    """
+    Гистограмма с метками в стиле Prometheus: для каждой комбинации меток
+    хранится количество наблюдений по корзинам, их сумма и общее количество.
+    """
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str] = (),
+                 buckets: Sequence[float] = DEFAULT_TIME_BUCKETS):
+        self.name = name
+        self.description = description
+        self.label_names = tuple(label_names)
+        self.buckets = tuple(sorted(buckets))
+        self._series: Dict[Tuple[str, ...], List] = {}
+        self._lock = threading.Lock()
+        REGISTRY.append(self)
+
+    def observe(self, value: float, **labels: str) -> None:
+        """Добавить наблюдение"""
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            series = self._series.get(key)
+            if series is None:
+                # [счётчики по корзинам (+Inf последней), сумма, количество]
+                series = [[0] * (len(self.buckets) + 1), 0.0, 0]
+                self._series[key] = series
+            series[0][index] += 1
+            series[1] += value
+            series[2] += 1
+
+    def snapshot(self) -> List[dict]:
+        """Текущее состояние: по одной записи на комбинацию меток, корзины накопительные"""
+        with self._lock:
+            items = [(key, list(series[0]), series[1], series[2]) for key, series in self._series.items()]
+
+        snapshot = []
+        for key, counts, total_sum, total_count in items:
+            cumulative, running = [], 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                running += count
+                cumulative.append((bound, running))
+            snapshot.append({
+                "labels": dict(zip(self.label_names, key)),
+                "buckets": cumulative,
+                "sum": total_sum,
+                "count": total_count,
+            })
+        return snapshot
+
+    def reset(self) -> None:
+        with self._lock:
+            self._series.clear()
+
+
+class Gauge:
+    """
+    Значение "в моменте" с метками (например, текущая задержка цикла событий).
+    С metric_type="counter" используется как счётчик, который только растёт через inc().
+    """
+
+    def __init__(self, name: str, description: str, label_names: Sequence[str] = (), metric_type: str = "gauge"):
+        self.name = name
+        self.description = description
+        self.metric_type = metric_type
+        self.label_names = tuple(label_names)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        REGISTRY.append(self)
+
+    def set(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        self._values[key] = value
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels.get(name, "")) for name in self.label_names)
+        self._values[key] = self._values.get(key, 0) + amount
+
+    def samples(self) -> List[Tuple[Dict[str, str], float]]:
+        return [(dict(zip(self.label_names, key)), value) for key, value in list(self._values.items())]
+
+
+# Все созданные метрики
+REGISTRY: List[Any] = []
+
+# --- Метрики HTTP-запросов ---
+http_request_duration = Histogram(
+    "http_request_duration_seconds", "Время обработки HTTP-запроса",
+    label_names=("method", "route", "status"),
+)
+http_request_db_statements = Histogram(
+    "http_request_db_statements", "Количество SQL-запросов за один HTTP-запрос",
+    label_names=("method", "route"), buckets=STATEMENT_COUNT_BUCKETS,
+)
+http_request_db_duration = Histogram(
+    "http_request_db_duration_seconds", "Суммарное время SQL-запросов за один HTTP-запрос",
+    label_names=("method", "route"),
+)
+http_response_serialization_duration = Histogram(
+    "http_response_serialization_seconds", "Время сериализации тела ответа",
+    label_names=("method", "route"),
+)
+
+# --- Цикл событий ---
+event_loop_lag = Histogram(
+    "event_loop_lag_seconds", "Насколько позже запланированного просыпается цикл событий",
+)
+event_loop_lag_last = Gauge("event_loop_lag_last_seconds", "Последняя измеренная задержка цикла событий")
+
+# --- Запуск приложения ---
+app_startup_duration = Gauge(
+    "app_startup_seconds", "Длительность этапов запуска приложения (import, openapi, lifespan)",
+    label_names=("phase",),
+)
+app_routes = Gauge("app_routes", "Зарегистрированных маршрутов (метод + путь)")
+app_duplicate_routes = Gauge("app_duplicate_routes", "Пар метод + путь, зарегистрированных больше одного раза")
+
+
+async def monitor_event_loop_lag(interval_seconds: float = 0.5):
+    """
+    Фоновая задача: засыпает на interval_seconds и замеряет, насколько позже она проснулась.
+    Большая задержка означает, что цикл событий блокируется синхронным кодом.
+    """
+    while True:
+        started = time.perf_counter()
+        try:
+            await asyncio.sleep(interval_seconds)
+        except asyncio.CancelledError:
+            break
+        lag = max(0.0, time.perf_counter() - started - interval_seconds)
+        event_loop_lag.observe(lag)
+        event_loop_lag_last.set(lag)
+
+
+# --- Импорт данных из КИС2 ---
+class ImportJobTracker:
+    """Состояние заданий импорта: какие сейчас выполняются и чем закончились последние запуски"""
+
+    def __init__(self):
+        self.running = Gauge("import_job_running", "Выполняется ли сейчас импорт сущности", ("entity",))
+        self.runs = Gauge("import_job_runs_total", "Количество запусков импорта", ("entity", "status"),
+                          metric_type="counter")
+        self.records = Gauge("import_job_last_records", "Записей в последнем импорте", ("entity", "result"))
+        self.duration = Gauge("import_job_last_duration_seconds", "Длительность последнего импорта", ("entity",))
+        self.finished_at = Gauge("import_job_last_finished_timestamp", "Время окончания последнего импорта (unix)",
+                                 ("entity",))
+
+    @contextmanager
+    def track(self, entity: str):
+        """
+        Оборачивает один запуск импорта. Внутри блока нужно вызвать job.finish(result),
+        где result - словарь импорта вида {"status": ..., "added": ..., "updated": ..., "unchanged": ...}
+        """
+        job = _ImportJob()
+        started = time.perf_counter()
+        self.running.set(1, entity=entity)
+        try:
+            yield job
+        except Exception:
+            job.status = "error"
+            raise
+        finally:
+            self.running.set(0, entity=entity)
+            self.runs.inc(entity=entity, status=job.status)
+            self.duration.set(time.perf_counter() - started, entity=entity)
+            self.finished_at.set(time.time(), entity=entity)
+            for key in ("added", "updated", "unchanged"):
+                self.records.set(job.result.get(key, 0), entity=entity, result=key)
+
+
+class _ImportJob:
+    def __init__(self):
+        self.status = "error"
+        self.result: Dict[str, Any] = {}
+
+    def finish(self, result: Optional[Dict[str, Any]]) -> None:
+        self.result = result or {}
+        self.status = self.result.get("status", "success")
+
+
+import_jobs = ImportJobTracker()
+
+
+# --- Вывод в текстовом формате Prometheus ---
+def _format_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    escaped = []
+    for key, value in labels.items():
+        value = str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+        escaped.append(f'{key}="{value}"')
+    return "{" + ",".join(escaped) + "}"
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(extra: Iterable[Tuple[str, str, str, List[Tuple[Dict[str, Any], float]]]] = ()) -> str:
+    """
+    Сформировать текст для Prometheus из всех метрик REGISTRY и дополнительных значений,
+    которые вычисляются в момент запроса: (имя, описание, тип, [(метки, значение), ...]).
+    """
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines.append(f"# HELP {metric.name} {metric.description}")
+        if isinstance(metric, Histogram):
+            lines.append(f"# TYPE {metric.name} histogram")
+            for series in metric.snapshot():
+                for bound, count in series["buckets"]:
+                    labels = dict(series["labels"], le=_format_value(bound))
+                    lines.append(f"{metric.name}_bucket{_format_labels(labels)} {count}")
+                lines.append(f"{metric.name}_sum{_format_labels(series['labels'])} {_format_value(series['sum'])}")
+                lines.append(f"{metric.name}_count{_format_labels(series['labels'])} {series['count']}")
+        else:
+            lines.append(f"# TYPE {metric.name} {metric.metric_type}")
+            for labels, value in metric.samples():
+                lines.append(f"{metric.name}{_format_labels(labels)} {_format_value(value)}")
+
+    for name, description, metric_type, samples in extra:
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} {metric_type}")
+        for labels, value in samples:
+            lines.append(f"{name}{_format_labels(labels)} {_format_value(value)}")
+
+    return "\n".join(lines) + "\n"
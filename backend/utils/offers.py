@@ -0,0 +1,78 @@
+# utils/offers.py
+"""
+Расчёт коммерческого предложения (спецификации) в базовой валюте.
+
+Все позиции читаются одним запросом WHERE id IN (...) вместе с типом, производителем,
+курсом валюты на дату и параметрами шкафа (материал, IP, габариты).
+Готовый ответ кэшируется по sha256 от содержимого запроса: одинаковые спецификации
+(с тем же набором позиций и количеств, датой и версией цен - курсов и каталога) отдаются из кэша без расчёта.
+"""
+import hashlib
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Tuple
+
+import orjson
+from sqlalchemy import select
+
+from models import Equipment, EquipmentType, Manufacturer, Currency, ControlCabinet, ControlCabinetMaterial, Ip
+from utils.cache import InMemoryCache
+from utils.pricing import latest_rates, base_rate_columns, base_price_column
+
+# Сериализованные ответы /offers/compute по хэшу содержимого запроса
+offer_cache = InMemoryCache("offers", ttl_seconds=600, max_items=256)
+
+
+def normalize_items(items: Iterable[Tuple[int, Decimal]]) -> Dict[int, Decimal]:
+    """Сложить количества повторяющихся позиций и упорядочить по ID: одинаковый состав - одинаковый хэш"""
+    quantities: Dict[int, Decimal] = {}
+    for equipment_id, quantity in items:
+        quantities[equipment_id] = quantities.get(equipment_id, Decimal(0)) + quantity
+    return dict(sorted(quantities.items()))
+
+
+def offer_hash(quantities: Dict[int, Decimal], as_of: date, price_version: str) -> str:
+    """sha256 от нормализованного состава, даты курсов и версии цен (utils.pricing.price_version)"""
+    payload = orjson.dumps({
+        "items": [[equipment_id, str(quantity.normalize())] for equipment_id, quantity in quantities.items()],
+        "as_of": as_of.isoformat(),
+        "price_version": price_version,
+    })
+    return hashlib.sha256(payload).hexdigest()
+
+
+def build_offer_query(equipment_ids: List[int], as_of: date):
+    """Позиции спецификации с именами справочников, ценой в базовой валюте и параметрами шкафов"""
+    rates = latest_rates(as_of)
+    rate, rate_date = base_rate_columns(rates)
+    cabinets = ControlCabinet.__table__
+    return (
+        select(
+            Equipment.id,
+            Equipment.name,
+            Equipment.model,
+            Equipment.vendor_code,
+            Equipment.type_id,
+            EquipmentType.name.label("type_name"),
+            Equipment.manufacturer_id,
+            Manufacturer.name.label("manufacturer_name"),
+            Equipment.price,
+            Currency.name.label("currency"),
+            rate.label("rate"),
+            rate_date.label("rate_date"),
+            base_price_column(rate).label("base_price"),
+            cabinets.c.height,
+            cabinets.c.width,
+            cabinets.c.depth,
+            ControlCabinetMaterial.name.label("material"),
+            Ip.name.label("ip"),
+        )
+        .outerjoin(EquipmentType, EquipmentType.id == Equipment.type_id)
+        .outerjoin(Manufacturer, Manufacturer.id == Equipment.manufacturer_id)
+        .outerjoin(Currency, Currency.id == Equipment.currency_id)
+        .outerjoin(rates, rates.c.currency_id == Equipment.currency_id)
+        .outerjoin(cabinets, cabinets.c.id == Equipment.id)
+        .outerjoin(ControlCabinetMaterial, ControlCabinetMaterial.id == cabinets.c.material_id)
+        .outerjoin(Ip, Ip.id == cabinets.c.ip_id)
+        .where(Equipment.id.in_(equipment_ids))
+    )
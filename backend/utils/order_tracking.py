@@ -0,0 +1,131 @@
+# utils/order_tracking.py
+"""
+Версии заказов для условных GET-запросов (ETag / If-None-Match).
+
+У каждого заказа есть счётчик version и момент последнего изменения updated_at.
+Их увеличивают все записи, которые меняют то, что видно в карточке заказа:
+сам заказ, комментарии, задачи и тайминги, а также импорт заказчиков, людей и работ,
+чьи названия выводятся в списке и карточке. Вызывать touch_orders нужно в той же транзакции,
+что и основное изменение, до commit. Кроме того, touch_orders отмечает в сессии глобальную версию
+заказов (utils.data_versions.ORDERS), по ней строится ETag списка; фиксировать такую транзакцию
+нужно через utils.data_versions.commit_and_bump, который увеличит версию уже после commit.
+
+Там же хранится сводка для списка заказов (число задач, открытых задач и комментариев,
+время по таймингам, момент последней активности), чтобы /order/read показывал и сортировал
+её без агрегатов по tasks, comments_on_orders и timings. Записи задач, комментариев и таймингов
+пересчитывают сводку своих заказов вызовом refresh_order_summaries в той же транзакции.
+"""
+import hashlib
+from typing import Iterable, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import select, update, func, cast, DateTime
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from models import Order, Task, OrderComment, Timing
+from utils.data_versions import ORDERS, mark_changed
+
+# Завершённые и отменённые задачи не считаются открытыми (сводка заказа, нагрузка исполнителей).
+# Открытыми считаются задачи с status_id NOT IN (...), поэтому задачи без статуса (NULL) не считаются
+# ни открытыми, ни закрытыми - как и в фильтре /task/read. API не очищает статус, а импорт
+# из КИС2 ставит "Не начата", так что без статуса остаются только старые строки
+CLOSED_TASK_STATUSES = (4, 5)
+
+
+def _touch_statement(serials: Optional[Iterable[str]]):
+    statement = update(Order).values(version=Order.version + 1, updated_at=func.now())
+    if serials is not None:
+        statement = statement.where(Order.serial.in_(serials))
+    return statement.execution_options(synchronize_session=False)
+
+
+async def touch_orders(session: AsyncSession, serials: Iterable[Optional[str]]) -> None:
+    """Увеличить версию указанных заказов (None и повторы пропускаются)"""
+    unique_serials = {serial for serial in serials if serial}
+    if unique_serials:
+        await session.execute(_touch_statement(unique_serials))
+        mark_changed(session, ORDERS)
+
+
+def touch_orders_sync(session: Session, serials: Optional[Iterable[str]] = None) -> None:
+    """Синхронный вариант для импорта; serials=None - увеличить версию всех заказов"""
+    if serials is not None:
+        serials = {serial for serial in serials if serial}
+        if not serials:
+            return
+    session.execute(_touch_statement(serials))
+    mark_changed(session, ORDERS)
+
+
+def _summary_statement(serials: Optional[Iterable[str]]):
+    """UPDATE orders: пересчитать сводку коррелированными подзапросами (по индексам order_serial / order_id)"""
+    last_comment = select(func.max(OrderComment.moment_of_creation)).where(OrderComment.order_id == Order.serial)
+    last_timing = select(cast(func.max(Timing.timing_date), DateTime)).where(Timing.order_serial == Order.serial)
+    statement = update(Order).values(
+        task_count=select(func.count()).where(Task.order_serial == Order.serial).scalar_subquery(),
+        open_task_count=select(func.count()).where(
+            Task.order_serial == Order.serial, Task.status_id.notin_(CLOSED_TASK_STATUSES)
+        ).scalar_subquery(),
+        comment_count=select(func.count()).where(OrderComment.order_id == Order.serial).scalar_subquery(),
+        logged_time=select(func.sum(Timing.time)).where(Timing.order_serial == Order.serial).scalar_subquery(),
+        # greatest в Postgres пропускает NULL
+        last_activity_at=func.greatest(last_comment.scalar_subquery(), last_timing.scalar_subquery()),
+    )
+    if serials is not None:
+        statement = statement.where(Order.serial.in_(serials))
+    return statement.execution_options(synchronize_session=False)
+
+
+async def refresh_order_summaries(session: AsyncSession, serials: Iterable[Optional[str]]) -> None:
+    """Пересчитать сводку указанных заказов (None и повторы пропускаются)"""
+    unique_serials = {serial for serial in serials if serial}
+    if unique_serials:
+        await session.execute(_summary_statement(unique_serials))
+
+
+def refresh_order_summaries_sync(session: Session, serials: Optional[Iterable[str]] = None) -> None:
+    """Синхронный вариант для импорта; serials=None - пересчитать сводку всех заказов"""
+    if serials is not None:
+        serials = {serial for serial in serials if serial}
+        if not serials:
+            return
+    session.execute(_summary_statement(serials))
+
+
+def order_etag(serial: str, version: int, include_comments: bool = True) -> str:
+    """ETag карточки заказа (с комментариями и без - разные представления)"""
+    suffix = "" if include_comments else "-nc"
+    return f'"order-{serial}-{version}{suffix}"'
+
+
+def order_list_etag(request: Request, list_version: int) -> str:
+    """
+    ETag списка заказов: глобальная версия заказов (utils.data_versions.ORDERS) плюс параметры запроса
+    (фильтры, сортировка, страница), чтобы разные страницы не совпадали между собой.
+    """
+    params = "&".join(f"{key}={value}" for key, value in sorted(request.query_params.multi_items()))
+    digest = hashlib.sha1(f"{list_version}|{params}".encode("utf-8")).hexdigest()[:20]
+    return f'"orders-{digest}"'
+
+
+def etag_matches(request: Request, etag: str) -> bool:
+    """Совпадает ли ETag с заголовком If-None-Match (список через запятую, W/-префикс, *)"""
+    header = request.headers.get("if-none-match")
+    if not header:
+        return False
+    for candidate in header.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def etag_headers(etag: str) -> dict:
+    """Заголовки ответа с ETag: клиент хранит ответ, но каждый раз перепроверяет его у сервера"""
+    return {"ETag": etag, "Cache-Control": "private, no-cache"}
+
+
+def not_modified(etag: str) -> Response:
+    """Ответ 304 без тела"""
+    return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=etag_headers(etag))
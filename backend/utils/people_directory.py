@@ -0,0 +1,180 @@
+# utils/people_directory.py
+"""
+Справочник людей в памяти процесса.
+
+Людей немного, а читают их постоянно (списки исполнителей по ролям, ФИО в карточке заказа),
+поэтому справочник целиком загружается одним запросом и хранится снимком:
+- ФИО для отображения считается один раз при загрузке (format_fio);
+- для каждой роли can_be_*, активности и наличия пользователя хранится битовая маска по позициям
+  в снимке, фильтр по любому сочетанию ролей - несколько операций над целыми числами без базы.
+
+Снимок сбрасывается после commit сессии, в которой добавлялись, изменялись или удалялись люди
+(события маппера Person и ORM-запросы insert/update/delete по Person),
+а в остальных воркерах устаревает через SNAPSHOT_TTL_SECONDS.
+"""
+from dataclasses import dataclass, field
+from typing import Dict, Iterator, List, Optional
+from uuid import UUID
+
+from sqlalchemy import event, select
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session, object_session
+
+from models import Person
+from utils.cache import InMemoryCache
+
+# Ключ в session.info: в сессии менялись люди, после commit снимок нужно сбросить
+DIRTY_KEY = "people_directory_dirty"
+# Люди меняются редко и только импортом, другие воркеры увидят изменения не позже чем через минуту
+SNAPSHOT_TTL_SECONDS = 60
+
+# Роли (колонки Person.can_be_*) в порядке битов маски ролей
+ROLES = ("can_be_scheme_developer", "can_be_assembler", "can_be_programmer", "can_be_tester")
+
+
+def format_fio(surname: Optional[str], name: Optional[str], patronymic: Optional[str] = None) -> str:
+    """ФИО для отображения: "Фамилия Имя Отчество" (пустые части пропускаются)"""
+    return " ".join(part for part in (surname, name, patronymic) if part)
+
+
+@dataclass(slots=True)
+class DirectoryEntry:
+    """Человек из снимка справочника: колонки для списков и готовое ФИО"""
+    uuid: UUID
+    name: str
+    patronymic: Optional[str]
+    surname: str
+    active: bool
+    counterparty_id: Optional[int]
+    user_id: Optional[int]
+    can_be_scheme_developer: bool
+    can_be_assembler: bool
+    can_be_programmer: bool
+    can_be_tester: bool
+    fio: str = ""
+
+    def __post_init__(self):
+        self.fio = format_fio(self.surname, self.name, self.patronymic)
+
+
+@dataclass
+class PeopleSnapshot:
+    """Снимок справочника: люди по ФИО и битовые маски по их позициям в списке"""
+    entries: List[DirectoryEntry]
+    by_uuid: Dict[UUID, DirectoryEntry] = field(default_factory=dict)
+    role_masks: Dict[str, int] = field(default_factory=dict)
+    active_mask: int = 0
+    user_mask: int = 0  # У человека есть учётная запись
+    all_mask: int = 0
+
+    def __post_init__(self):
+        self.by_uuid = {entry.uuid: entry for entry in self.entries}
+        self.role_masks = {role: 0 for role in ROLES}
+        for position, entry in enumerate(self.entries):
+            bit = 1 << position
+            for role in ROLES:
+                if getattr(entry, role):
+                    self.role_masks[role] |= bit
+            if entry.active:
+                self.active_mask |= bit
+            if entry.user_id is not None:
+                self.user_mask |= bit
+        self.all_mask = (1 << len(self.entries)) - 1
+
+    def _select(self, mask: int) -> Iterator[DirectoryEntry]:
+        """Люди, чьи биты установлены в маске, в порядке снимка"""
+        while mask:
+            low_bit = mask & -mask
+            yield self.entries[low_bit.bit_length() - 1]
+            mask ^= low_bit
+
+    def filter(self, roles: Optional[Dict[str, bool]] = None, any_role: bool = False,
+               active: Optional[bool] = None, has_user: Optional[bool] = None,
+               counterparty_id: Optional[int] = None) -> List[DirectoryEntry]:
+        """
+        Отфильтровать людей без запроса к базе.
+
+        Параметры:
+        - roles: {роль из ROLES: True/False} - роль должна быть или отсутствовать
+        - any_role: есть хотя бы одна роль
+        - active, has_user: фильтр по активности и наличию учётной записи (None - не фильтровать)
+        - counterparty_id: только представители этого контрагента
+
+        Возвращает: людей в порядке ФИО
+        """
+        mask = self.all_mask
+        for role, required in (roles or {}).items():
+            mask &= self.role_masks[role] if required else ~self.role_masks[role]
+        if any_role:
+            any_mask = 0
+            for role_mask in self.role_masks.values():
+                any_mask |= role_mask
+            mask &= any_mask
+        if active is not None:
+            mask &= self.active_mask if active else ~self.active_mask
+        if has_user is not None:
+            mask &= self.user_mask if has_user else ~self.user_mask
+        people = self._select(mask & self.all_mask)
+        if counterparty_id is not None:
+            return [entry for entry in people if entry.counterparty_id == counterparty_id]
+        return list(people)
+
+
+class PeopleDirectory:
+    """Загружает снимок при первом обращении и хранит его до сброса или истечения TTL"""
+
+    def __init__(self, ttl_seconds: float = SNAPSHOT_TTL_SECONDS):
+        self._cache = InMemoryCache("people_directory", ttl_seconds=ttl_seconds, max_items=1)
+        # Растёт при каждом сбросе: снимок, загрузка которого началась до сброса, не сохраняется
+        self._generation = 0
+
+    async def snapshot(self, session: AsyncSession) -> PeopleSnapshot:
+        snapshot = self._cache.get("snapshot")
+        if snapshot is None:
+            generation = self._generation
+            result = await session.execute(
+                select(Person.uuid, Person.name, Person.patronymic, Person.surname, Person.active,
+                       Person.counterparty_id, Person.user_id, *(getattr(Person, role) for role in ROLES))
+                .order_by(Person.surname, Person.name, Person.patronymic, Person.uuid)
+            )
+            snapshot = PeopleSnapshot([DirectoryEntry(**row) for row in result.mappings()])
+            if generation == self._generation:
+                self._cache.set("snapshot", snapshot)
+        return snapshot
+
+    def invalidate(self) -> None:
+        self._generation += 1
+        self._cache.invalidate()
+
+
+people_directory = PeopleDirectory()
+
+
+@event.listens_for(Person, "after_insert")
+@event.listens_for(Person, "after_update")
+@event.listens_for(Person, "after_delete")
+def _mark_people_changed(_mapper, _connection, target: Person) -> None:
+    session = object_session(target)
+    if session is not None:
+        session.info[DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "do_orm_execute")
+def _mark_bulk_people_changes(orm_execute_state) -> None:
+    # insert(Person) / update(Person) / delete(Person) через session.execute не вызывают события маппера
+    state = orm_execute_state
+    if (state.is_insert or state.is_update or state.is_delete) and state.bind_mapper is not None \
+            and state.bind_mapper.class_ is Person:
+        state.session.info[DIRTY_KEY] = True
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session: Session) -> None:
+    if session.info.pop(DIRTY_KEY, False):
+        people_directory.invalidate()
+
+
+@event.listens_for(Session, "after_soft_rollback")
+def _discard_after_rollback(session: Session, _previous_transaction) -> None:
+    if not session.in_transaction():
+        session.info.pop(DIRTY_KEY, None)
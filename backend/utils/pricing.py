@@ -0,0 +1,193 @@
+# utils/pricing.py
+"""
+Пересчёт цен оборудования в базовую валюту (settings.base_currency).
+
+Цена оборудования хранится в валюте currency_id. Для пересчёта на дату as_of берётся
+последний курс валюты не позже этой даты, курс базовой валюты всегда 1.
+Прайс-лист в базовой валюте считается одним запросом (оборудование, валюта и последние курсы)
+и кэшируется с ключом (версия цен, дата). Версия цен складывается из версии курсов (её увеличивает
+PUT /pricing/rates) и версии оборудования (её увеличивает импорт оборудования и справочников),
+см. utils.data_versions: после изменения курсов или каталога в любом воркере версия меняется,
+и следующий запрос пересчитывает прайс-лист.
+Спецификация (get_prices) считается без прайс-листа: одним запросом только по своим позициям.
+"""
+from dataclasses import dataclass
+from datetime import date
+from decimal import Decimal
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, func, case, literal, Numeric
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from models import Equipment, Currency, CurrencyRate
+from utils.cache import InMemoryCache
+from utils.data_versions import EQUIPMENT, RATES, version_query
+
+CENT = Decimal("0.01")
+
+# Прайс-листы в базовой валюте по ключу (версия цен, дата); время жизни ограничено,
+# чтобы прайс-листы за прошедшие даты не занимали память
+price_list_cache = InMemoryCache("price_list", ttl_seconds=600, max_items=8)
+
+
+@dataclass(frozen=True)
+class PriceEntry:
+    """Цена одной позиции оборудования в исходной и в базовой валюте"""
+    equipment_id: int
+    price: Optional[int]
+    currency: Optional[str]
+    rate: Optional[Decimal]
+    rate_date: Optional[date]
+    base_price: Optional[Decimal]  # None - нет цены, валюты или курса на дату
+
+
+@dataclass(frozen=True)
+class BillLine:
+    """Строка спецификации с ценой в базовой валюте"""
+    entry: PriceEntry
+    quantity: Decimal
+    base_total: Optional[Decimal]
+
+
+def latest_rates(as_of: date):
+    """Подзапрос: последний курс каждой валюты не позже as_of (DISTINCT ON по индексу (currency_id, rate_date))"""
+    return (
+        select(CurrencyRate.currency_id, CurrencyRate.rate, CurrencyRate.rate_date)
+        .where(CurrencyRate.rate_date <= as_of)
+        .order_by(CurrencyRate.currency_id, CurrencyRate.rate_date.desc())
+        .distinct(CurrencyRate.currency_id)
+        .subquery("latest_rates")
+    )
+
+
+def base_rate_columns(rates):
+    """
+    Курс и дата курса для валюты оборудования с учётом базовой валюты (курс 1, без даты).
+    Запрос должен содержать outer join currencies по Equipment.currency_id и подзапроса rates.
+    """
+    is_base = Currency.name == settings.base_currency
+    rate = case((is_base, literal(Decimal(1), Numeric(18, 6))), else_=rates.c.rate)
+    rate_date = case((is_base, None), else_=rates.c.rate_date)
+    return rate, rate_date
+
+
+def base_price_column(rate):
+    """Цена в базовой валюте, округлённая до копеек (None, если нет цены или курса)"""
+    return func.round(Equipment.price * rate, 2)
+
+
+def build_price_list_query(as_of: date, ids: Optional[Iterable[int]] = None):
+    """
+    Оборудование (все или только ids) с курсом валюты на дату и ценой в базовой валюте,
+    округлённой до копеек
+    """
+    rates = latest_rates(as_of)
+    rate, rate_date = base_rate_columns(rates)
+    query = (
+        select(
+            Equipment.id,
+            Equipment.price,
+            Currency.name.label("currency"),
+            rate.label("rate"),
+            rate_date.label("rate_date"),
+            base_price_column(rate).label("base_price"),
+        )
+        .outerjoin(Currency, Currency.id == Equipment.currency_id)
+        .outerjoin(rates, rates.c.currency_id == Equipment.currency_id)
+    )
+    if ids is not None:
+        query = query.where(Equipment.id.in_(ids))
+    return query
+
+
+def _price_entries(result) -> Dict[int, PriceEntry]:
+    return {
+        row.id: PriceEntry(equipment_id=row.id, price=row.price, currency=row.currency, rate=row.rate,
+                           rate_date=row.rate_date, base_price=row.base_price)
+        for row in result
+    }
+
+
+async def price_version(session: AsyncSession) -> str:
+    """
+    Версия цен одним запросом: меняется при сохранении курсов
+    и при импорте оборудования, его типов, производителей и валют
+    """
+    result = await session.execute(select(version_query(RATES), version_query(EQUIPMENT)))
+    rates_version, equipment_version = result.one()
+    return f"{rates_version or 0}:{equipment_version or 0}"
+
+
+async def get_price_list(session: AsyncSession, as_of: Optional[date] = None) -> Tuple[str, Dict[int, PriceEntry]]:
+    """
+    Прайс-лист в базовой валюте.
+
+    Параметры:
+    - session: сессия базы
+    - as_of: дата курсов (по умолчанию сегодня)
+
+    Возвращает: (версия цен, {equipment_id: PriceEntry})
+    """
+    as_of = as_of or date.today()
+    version = await price_version(session)
+    key = (version, as_of)
+    price_list = price_list_cache.get(key)
+    if price_list is None:
+        price_list = _price_entries(await session.execute(build_price_list_query(as_of)))
+        price_list_cache.set(key, price_list)
+    return version, price_list
+
+
+async def get_prices(session: AsyncSession, ids: Iterable[int], as_of: Optional[date] = None) -> Dict[int, PriceEntry]:
+    """
+    Цены только указанных позиций одним запросом WHERE id IN (...), без кэша:
+    для спецификации не нужно строить прайс-лист всего каталога.
+
+    Параметры:
+    - session: сессия базы
+    - ids: ID оборудования (повторы допустимы)
+    - as_of: дата курсов (по умолчанию сегодня)
+
+    Возвращает: {equipment_id: PriceEntry} для найденных позиций
+    """
+    unique_ids = set(ids)
+    if not unique_ids:
+        return {}
+    return _price_entries(await session.execute(build_price_list_query(as_of or date.today(), unique_ids)))
+
+
+def invalidate_price_list() -> None:
+    """Сбросить прайс-листы этого процесса (после импорта оборудования или изменения курсов)"""
+    price_list_cache.invalidate()
+
+
+def price_bill(price_list: Dict[int, PriceEntry],
+               items: Iterable[Tuple[int, Decimal]]) -> Tuple[List[BillLine], Decimal, List[int], List[int]]:
+    """
+    Посчитать спецификацию по прайс-листу.
+
+    Параметры:
+    - price_list: результат get_price_list или get_prices
+    - items: пары (equipment_id, количество)
+
+    Возвращает: (строки, итог в базовой валюте по строкам с ценой,
+    ID без цены или курса, ID, которых нет в каталоге)
+    """
+    lines: List[BillLine] = []
+    total = Decimal(0)
+    unpriced: List[int] = []
+    unknown: List[int] = []
+    for equipment_id, quantity in items:
+        entry = price_list.get(equipment_id)
+        if entry is None:
+            unknown.append(equipment_id)
+            continue
+        base_total = None
+        if entry.base_price is None:
+            unpriced.append(equipment_id)
+        else:
+            base_total = (entry.base_price * quantity).quantize(CENT)
+            total += base_total
+        lines.append(BillLine(entry=entry, quantity=quantity, base_total=base_total))
+    return lines, total, unpriced, unknown
@@ -0,0 +1,66 @@
+# utils/responses.py
+"""
+Быстрые JSON-ответы.
+
+- ORJSONResponse - класс ответа по умолчанию для приложения, сериализует через orjson;
+- ModelResponse - ответ из уже собранной Pydantic-модели через model_dump_json.
+
+Если эндпоинт возвращает экземпляр Response, FastAPI не прогоняет результат повторно
+через валидацию response_model и jsonable_encoder. response_model при этом остаётся
+в декораторе и нужен только для документации OpenAPI.
+"""
+import time
+from datetime import timedelta
+from decimal import Decimal
+from typing import Any
+
+import orjson
+from pydantic import BaseModel
+from starlette.responses import JSONResponse, Response
+
+from utils.instrumentation import record_serialization
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS
+
+
+def _orjson_default(obj: Any) -> Any:
+    """Типы, которые orjson не умеет сериализовать сам (так же, как их кодирует jsonable_encoder)"""
+    if isinstance(obj, BaseModel):
+        return obj.model_dump(mode="json")
+    if isinstance(obj, timedelta):
+        return obj.total_seconds()
+    if isinstance(obj, Decimal):
+        return float(obj)
+    if isinstance(obj, (set, frozenset)):
+        return list(obj)
+    raise TypeError(f"Type is not JSON serializable: {type(obj).__name__}")
+
+
+class ORJSONResponse(JSONResponse):
+    """JSON-ответ через orjson, время сериализации учитывается в статистике запроса"""
+
+    def render(self, content: Any) -> bytes:
+        started = time.perf_counter()
+        body = orjson.dumps(content, default=_orjson_default, option=ORJSON_OPTIONS)
+        record_serialization(time.perf_counter() - started)
+        return body
+
+
+class ModelResponse(Response):
+    """
+    Ответ из готовой Pydantic-модели: сериализуется один раз через model_dump_json,
+    без повторной валидации по response_model.
+    """
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        started = time.perf_counter()
+        if isinstance(content, bytes):
+            # Уже сериализованный ответ (например, из кэша)
+            body = content
+        elif isinstance(content, BaseModel):
+            body = content.model_dump_json().encode("utf-8")
+        else:
+            body = orjson.dumps(content, default=_orjson_default, option=ORJSON_OPTIONS)
+        record_serialization(time.perf_counter() - started)
+        return body
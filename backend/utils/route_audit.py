@@ -0,0 +1,96 @@
+# utils/route_audit.py
+"""
+Проверка таблицы маршрутов при запуске приложения.
+
+- ищет пары метод + путь, зарегистрированные больше одного раза (например, два одинаковых
+  декоратора @router.post над одной функцией): такой маршрут дублируется в OpenAPI,
+  а второй экземпляр никогда не вызывается;
+- заранее собирает схему OpenAPI, чтобы первый запрос к /docs не платил за её построение;
+- выставляет метрики app_routes, app_duplicate_routes и app_startup_seconds{phase="openapi"}.
+
+Проверка без запуска сервера (код возврата 1, если есть дубликаты):
+    python -m utils.route_audit
+"""
+import logging
+import sys
+import time
+from dataclasses import dataclass, field
+from typing import Dict, List, Tuple
+
+from fastapi import FastAPI
+
+from utils.metrics import app_startup_duration, app_routes, app_duplicate_routes
+
+logger = logging.getLogger(__name__)
+
+RouteKey = Tuple[str, str]  # (метод, путь)
+
+
+@dataclass
+class RouteAudit:
+    """Итог проверки маршрутов"""
+    routes: int
+    duplicates: Dict[RouteKey, List[str]] = field(default_factory=dict)  # (метод, путь) -> имена обработчиков
+    openapi_seconds: float = 0.0
+
+
+def route_table(app: FastAPI) -> List[Tuple[str, str, str]]:
+    """Таблица маршрутов: (метод, путь, имя обработчика); у WebSocket метод WS"""
+    table = []
+    for route in app.routes:
+        path = getattr(route, "path", None)
+        if path is None:
+            continue
+        name = getattr(route, "name", "") or ""
+        methods = getattr(route, "methods", None)
+        if methods is None:
+            table.append(("WS", path, name))
+            continue
+        for method in sorted(methods):
+            # HEAD Starlette сам добавляет к GET, отдельным маршрутом его не считаем
+            if method == "HEAD" and "GET" in methods:
+                continue
+            table.append((method, path, name))
+    return table
+
+
+def find_duplicate_routes(app: FastAPI) -> Dict[RouteKey, List[str]]:
+    """Пары метод + путь, которые зарегистрированы больше одного раза"""
+    registrations: Dict[RouteKey, List[str]] = {}
+    for method, path, name in route_table(app):
+        registrations.setdefault((method, path), []).append(name)
+    return {key: names for key, names in registrations.items() if len(names) > 1}
+
+
+def audit_routes(app: FastAPI) -> RouteAudit:
+    """Проверить маршруты, собрать OpenAPI и записать результат в лог и метрики"""
+    table = route_table(app)
+    duplicates = find_duplicate_routes(app)
+    for (method, path), names in duplicates.items():
+        logger.error(f"Route {method} {path} is registered {len(names)} times: {', '.join(names)}")
+
+    started = time.perf_counter()
+    app.openapi()  # FastAPI кэширует схему в app.openapi_schema
+    openapi_seconds = time.perf_counter() - started
+
+    app_routes.set(len(table))
+    app_duplicate_routes.set(len(duplicates))
+    app_startup_duration.set(openapi_seconds, phase="openapi")
+    logger.info(f"Route table: {len(table)} routes, {len(duplicates)} duplicates, "
+                f"OpenAPI schema built in {openapi_seconds * 1000:.1f} ms")
+    return RouteAudit(routes=len(table), duplicates=duplicates, openapi_seconds=openapi_seconds)
+
+
+if __name__ == "__main__":
+    import_started = time.perf_counter()
+    from main import app as main_app
+    import_seconds = time.perf_counter() - import_started
+
+    for route_method, route_path, route_name in route_table(main_app):
+        print(f"{route_method:<7} {route_path:<55} {route_name}")
+    result = audit_routes(main_app)
+    print(f"\nimport main: {import_seconds * 1000:.1f} ms, openapi: {result.openapi_seconds * 1000:.1f} ms, "
+          f"routes: {result.routes}, duplicates: {len(result.duplicates)}")
+    for (route_method, route_path), route_names in result.duplicates.items():
+        print(f"DUPLICATE {route_method} {route_path}: {', '.join(route_names)}")
+    sys.exit(1 if result.duplicates else 0)
@@ -0,0 +1,164 @@
+# utils/task_durations.py
+"""
+Фактическая длительность задач (Task.actual_duration) по таймингам.
+
+actual_duration задачи - сумма времени её таймингов и таймингов всех её подзадач
+(по цепочке parent_task_id до корневой задачи root_task_id); NULL - таймингов нет.
+Колонка поддерживается инкрементально: каждая запись таймингов в той же транзакции вызывает
+apply_duration_deltas с изменением времени по задачам, и одним запросом (рекурсивный CTE по
+предкам) это изменение прибавляется к задаче и всем её предкам. Пересчитывать суммы
+по всем таймингам задачи при каждой записи не нужно.
+
+Сверка и полный пересчёт одним проходом (для аудита и после ручных правок в базе):
+    python -m utils.task_durations          # только показать расхождения
+    python -m utils.task_durations --fix    # исправить
+"""
+import argparse
+import asyncio
+import logging
+from datetime import timedelta
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from sqlalchemy import select, update, values, column, func, literal, Integer, Interval
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from database import async_session_maker, dispose_engines
+from models import Task, Timing
+
+logger = logging.getLogger(__name__)
+
+# Ограничение глубины обхода предков: защита от циклов в parent_task_id
+MAX_DEPTH = 32
+ZERO = timedelta(0)
+
+
+def timing_deltas(timings: Iterable[Tuple[int, timedelta]]) -> Dict[int, timedelta]:
+    """
+    Сложить время таймингов по задачам: {task_id: изменение}.
+    Время удалённых таймингов передаётся со знаком минус, изменённых - разностью нового и старого.
+    """
+    deltas: Dict[int, timedelta] = {}
+    for task_id, time in timings:
+        deltas[task_id] = deltas.get(task_id, ZERO) + time
+    return deltas
+
+
+def _ancestor_totals(source):
+    """
+    Разнести изменения из source (task_id, delta) на сами задачи и всех их предков.
+
+    Возвращает: подзапрос (id, delta) - суммарное изменение для каждой затронутой задачи
+    """
+    ancestors = (
+        select(source.c.task_id.label("id"), source.c.delta, literal(0).label("depth"))
+        .cte("ancestors", recursive=True)
+    )
+    ancestors = ancestors.union_all(
+        select(Task.parent_task_id, ancestors.c.delta, ancestors.c.depth + 1)
+        .where(Task.id == ancestors.c.id, Task.parent_task_id.isnot(None), ancestors.c.depth < MAX_DEPTH)
+    )
+    return (
+        select(ancestors.c.id, func.sum(ancestors.c.delta).label("delta"))
+        .group_by(ancestors.c.id)
+        .subquery("totals")
+    )
+
+
+def build_apply_deltas_statement(deltas: Dict[int, timedelta]):
+    """UPDATE tasks: прибавить изменения к задачам и их предкам (ноль превращается в NULL)"""
+    source = values(column("task_id", Integer), column("delta", Interval), name="deltas").data(
+        list(deltas.items())
+    )
+    totals = _ancestor_totals(select(source.c.task_id, source.c.delta).subquery("changes"))
+    zero = literal(ZERO, Interval)
+    return (
+        update(Task)
+        .where(Task.id == totals.c.id)
+        .values(actual_duration=func.nullif(func.coalesce(Task.actual_duration, zero) + totals.c.delta, zero))
+        .returning(Task.id, Task.order_serial, Task.actual_duration)
+        .execution_options(synchronize_session=False)
+    )
+
+
+async def apply_duration_deltas(session: AsyncSession, deltas: Dict[int, timedelta]) -> List:
+    """
+    Учесть изменение таймингов в actual_duration задач и их предков. Вызывать в той же транзакции,
+    что и запись таймингов, до commit.
+
+    Параметры:
+    - deltas: {task_id: изменение суммарного времени} (см. timing_deltas)
+
+    Возвращает: строки (id, order_serial, actual_duration) изменённых задач
+    """
+    deltas = {task_id: delta for task_id, delta in deltas.items() if delta != ZERO}
+    if not deltas:
+        return []
+    result = await session.execute(build_apply_deltas_statement(deltas))
+    return result.all()
+
+
+def apply_duration_deltas_sync(session: Session, deltas: Dict[int, timedelta]) -> None:
+    """Синхронный вариант для импорта"""
+    deltas = {task_id: delta for task_id, delta in deltas.items() if delta != ZERO}
+    if deltas:
+        session.execute(build_apply_deltas_statement(deltas))
+
+
+def build_mismatch_query():
+    """
+    Задачи, у которых actual_duration не совпадает с суммой таймингов задачи и подзадач,
+    посчитанной заново одним проходом по timings: (id, actual_duration, expected)
+    """
+    own = (
+        select(Timing.task_id, func.sum(Timing.time).label("delta"))
+        .group_by(Timing.task_id)
+        .subquery("own")
+    )
+    totals = _ancestor_totals(own)
+    expected = func.nullif(totals.c.delta, literal(ZERO, Interval))
+    return (
+        select(Task.id, Task.actual_duration, expected.label("expected"))
+        .outerjoin(totals, totals.c.id == Task.id)
+        .where(Task.actual_duration.is_distinct_from(expected))
+    )
+
+
+async def verify_actual_durations(session: AsyncSession, fix: bool = False) -> List:
+    """
+    Сверить actual_duration всех задач с таймингами.
+
+    Параметры:
+    - fix: записать правильные значения (изменения фиксируются здесь же)
+
+    Возвращает: строки (id, actual_duration, expected) с расхождениями
+    """
+    mismatches = (await session.execute(build_mismatch_query())).all()
+    if fix and mismatches:
+        fixes = build_mismatch_query().subquery("fixes")
+        await session.execute(
+            update(Task)
+            .where(Task.id == fixes.c.id)
+            .values(actual_duration=fixes.c.expected)
+            .execution_options(synchronize_session=False)
+        )
+        await session.commit()
+        logger.info(f"Fixed actual_duration of {len(mismatches)} tasks")
+    return mismatches
+
+
+async def _main(fix: bool, show: Optional[int]) -> None:
+    async with async_session_maker() as session:
+        mismatches = await verify_actual_durations(session, fix)
+    await dispose_engines()
+    for row in mismatches[:show]:
+        print(f"Task {row.id}: stored {row.actual_duration}, expected {row.expected}")
+    print(f"{len(mismatches)} tasks with wrong actual_duration" + (" (fixed)" if fix and mismatches else ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Сверить Task.actual_duration с таймингами")
+    parser.add_argument("--fix", action="store_true", help="Исправить расхождения")
+    parser.add_argument("--show", type=int, default=20, help="Сколько расхождений вывести")
+    args = parser.parse_args()
+    asyncio.run(_main(args.fix, args.show))
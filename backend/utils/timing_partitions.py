@@ -0,0 +1,117 @@
+# utils/timing_partitions.py
+"""
+Помесячные секции таблицы timings (секционирование RANGE по timing_date).
+
+Каждая секция timings_YYYY_MM хранит тайминги одного месяца, поэтому запросы за период
+(табель, нагрузка исполнителей) читают только секции этого периода, и рост истории
+не замедляет запросы за текущий месяц. Строки за месяцы без секции попадают в секцию timings_default;
+если расписание отстало и такие строки уже есть, при создании секции они переносятся в неё
+в той же транзакции.
+
+Секции создаёт не приложение, а отдельная команда под ролью с правами DDL - по расписанию
+(например, cron раз в месяц) и при развёртывании:
+    python -m utils.timing_partitions --months-ahead 12
+Так воркеры не держат прав на CREATE TABLE и не берут блокировки timings при перезапуске.
+"""
+import argparse
+import asyncio
+import logging
+from datetime import date
+from typing import List, Optional
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config import settings
+from database import async_session_maker, dispose_engines
+
+logger = logging.getLogger(__name__)
+
+PARENT_TABLE = "timings"
+DEFAULT_PARTITION = f"{PARENT_TABLE}_default"
+# Временная таблица для строк месяца, переносимых из DEFAULT_PARTITION в новую секцию
+MOVED_TABLE = "timings_moved"
+
+EXISTING_PARTITIONS = text(
+    "SELECT child.relname FROM pg_inherits "
+    "JOIN pg_class child ON child.oid = pg_inherits.inhrelid "
+    "WHERE pg_inherits.inhparent = CAST(:parent AS regclass)"
+)
+
+
+def month_start(day: date) -> date:
+    return day.replace(day=1)
+
+
+def add_months(month: date, months: int) -> date:
+    """Первое число месяца, отстоящего от month на months месяцев"""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{PARENT_TABLE}_{month:%Y_%m}"
+
+
+def partition_ddl(month: date) -> str:
+    """CREATE TABLE для секции месяца (имя и границы формируются из даты, без пользовательского ввода)"""
+    return (f"CREATE TABLE IF NOT EXISTS {partition_name(month)} PARTITION OF {PARENT_TABLE} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{add_months(month, 1).isoformat()}')")
+
+
+def move_from_default_ddl(month: date) -> str:
+    """Перенести строки месяца из секции по умолчанию во временную таблицу (DELETE ... RETURNING)"""
+    return (f"CREATE TEMP TABLE {MOVED_TABLE} ON COMMIT DROP AS "
+            f"WITH moved AS (DELETE FROM {DEFAULT_PARTITION} WHERE timing_date >= '{month.isoformat()}' "
+            f"AND timing_date < '{add_months(month, 1).isoformat()}' RETURNING *) SELECT * FROM moved")
+
+
+async def ensure_timing_partitions(session: AsyncSession, months_ahead: Optional[int] = None,
+                                   today: Optional[date] = None) -> List[str]:
+    """
+    Создать недостающие секции с текущего месяца на months_ahead месяцев вперёд.
+    Строки этих месяцев, уже попавшие в секцию по умолчанию, переносятся в новые секции
+    (Postgres не создаст секцию, пока такие строки остаются в timings_default).
+
+    Параметры:
+    - session: сессия базы (изменения фиксируются здесь же)
+    - months_ahead: на сколько месяцев вперёд (по умолчанию settings.timing_partitions_months_ahead)
+    - today: текущая дата (для тестов)
+
+    Возвращает: имена созданных секций
+    """
+    if months_ahead is None:
+        months_ahead = settings.timing_partitions_months_ahead
+    current = month_start(today or date.today())
+    existing = set((await session.execute(EXISTING_PARTITIONS, {"parent": PARENT_TABLE})).scalars())
+    created = []
+    for offset in range(months_ahead + 1):
+        month = add_months(current, offset)
+        if partition_name(month) in existing:
+            continue
+        moved = (await session.execute(text(move_from_default_ddl(month)))).rowcount
+        await session.execute(text(partition_ddl(month)))
+        if moved:
+            await session.execute(text(f"INSERT INTO {PARENT_TABLE} SELECT * FROM {MOVED_TABLE}"))
+            logger.warning(f"Moved {moved} rows from {DEFAULT_PARTITION} to {partition_name(month)}")
+        await session.execute(text(f"DROP TABLE {MOVED_TABLE}"))
+        created.append(partition_name(month))
+    await session.commit()
+    if created:
+        logger.info(f"Created timing partitions: {', '.join(created)}")
+    return created
+
+
+async def _main(months_ahead: int) -> None:
+    async with async_session_maker() as session:
+        created = await ensure_timing_partitions(session, months_ahead)
+    await dispose_engines()
+    print(f"Created {len(created)} partitions" + (f": {', '.join(created)}" if created else ""))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Создать помесячные секции таблицы timings")
+    parser.add_argument("--months-ahead", type=int, default=settings.timing_partitions_months_ahead,
+                        help="На сколько месяцев вперёд создать секции")
+    args = parser.parse_args()
+    asyncio.run(_main(args.months_ahead))